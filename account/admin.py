@@ -1,11 +1,15 @@
+from collections import Counter
+
 from django import forms
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import ReadOnlyPasswordHashField
 
 from .models import User, OutgoingEmail, DomesticWorker, DomesticJob
+from .outbox import RESEND_INLINE_LIMIT, requeue, resend
+from django.contrib import messages
+from django.urls import reverse
 from django.utils.html import format_html
-from django.core.mail import send_mail
 
 
 class AddUserForm(forms.ModelForm):
@@ -93,10 +97,13 @@ admin.site.register(DomesticJob)
 # Register OutgoingEmail so sent emails can be viewed in the admin
 @admin.register(OutgoingEmail)
 class OutgoingEmailAdmin(admin.ModelAdmin):
-    list_display = ('subject', 'to_emails', 'from_email', 'sent', 'created_at')
+    list_display = ('subject', 'to_emails', 'from_email', 'sent', 'attempts', 'created_at')
     list_filter = ('sent', 'created_at')
     search_fields = ('subject', 'to_emails')
-    readonly_fields = ('subject', 'body_preview', 'to_emails', 'from_email', 'created_at')
+    readonly_fields = (
+        'subject', 'body_preview', 'to_emails', 'from_email', 'created_at',
+        'sent_at', 'attempts', 'next_attempt_at', 'last_error',
+    )
     actions = ['resend_selected_emails']
 
     def body_preview(self, obj):
@@ -105,23 +112,26 @@ class OutgoingEmailAdmin(admin.ModelAdmin):
     body_preview.short_description = 'Body (preview)'
 
     def resend_selected_emails(self, request, queryset):
-        """Admin action to resend selected stored emails using Django's send_mail.
-        Marks the original message `sent=True` if sending succeeds.
+        """Admin action to resend selected stored emails.
+        Messages go out through a small thread pool, one connection per
+        thread; sent rows are marked `sent=True` with a single update and
+        failed rows keep their error in `last_error`. Selections above
+        RESEND_INLINE_LIMIT are put back in the outbox for drain_outbox,
+        and the unsent emails list shows how far it got.
         """
-        sent_count = 0
-        for email in queryset:
-            to_list = [e.strip() for e in (email.to_emails or '').split(',') if e.strip()]
-            if not to_list:
-                continue
-            try:
-                res = send_mail(email.subject, email.body, email.from_email or None, to_list)
-                if res:
-                    email.sent = True
-                    email.save(update_fields=['sent'])
-                    sent_count += 1
-            except Exception:
-                # ignore per-email failures; admin will see error in logs
-                pass
-
-        self.message_user(request, f"Resent {sent_count} emails.")
-    resend_selected_emails.short_description = 'Resend selected outgoing emails'
\ No newline at end of file
+        total = queryset.count()
+        if total > RESEND_INLINE_LIMIT:
+            queued = requeue(queryset)
+            self.message_user(request, format_html(
+                'Queued {} emails for the outbox worker. <a href="{}">Unsent emails</a> lists those still to go.',
+                queued, reverse('admin:account_outgoingemail_changelist') + '?sent__exact=0',
+            ))
+            return
+
+        sent, failed = resend(queryset.order_by('id').iterator())
+        self.message_user(request, f"Resent {len(sent)} of {total} emails.")
+        if failed:
+            reasons = Counter(str(error) for _, error in failed)
+            summary = '; '.join(f'{reason} ({count})' for reason, count in reasons.most_common(3))
+            self.message_user(request, f"{len(failed)} emails failed: {summary}", level=messages.WARNING)
+    resend_selected_emails.short_description = 'Resend selected outgoing emails'
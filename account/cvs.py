@@ -0,0 +1,158 @@
+"""
+CV ingestion.
+
+CVUploadHandler (first in FILE_UPLOAD_HANDLERS) streams the "cv" field of
+multipart requests to a temporary file while checking its type and size
+and hashing it, so nothing over CV_MAX_UPLOAD_SIZE is ever kept. Forms
+then store it with store_cv(): the file is saved as cvs/<sha256><ext>
+and described by one CVDocument row, so a CV uploaded again, by anyone,
+is neither written nor extracted twice. The extract_cvs command fills in
+CVDocument.text for pending rows on a process pool.
+"""
+import hashlib
+import os
+import zipfile
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+
+from account.models import CVDocument
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    # PDFs stay pending until pypdf is installed
+    PdfReader = None
+
+CV_MAX_UPLOAD_SIZE = getattr(settings, 'CV_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+# Extension: the bytes every such file starts with
+CV_FORMATS = {
+    '.pdf': b'%PDF-',
+    '.docx': b'PK\x03\x04',
+    '.doc': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',
+}
+CV_UPLOAD_FIELDS = ('cv',)
+CV_DIR = 'cvs'
+# Longer texts are cut; a CV rarely has more than a few thousand words
+CV_TEXT_MAX_LENGTH = 100000
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def cv_extension(name):
+    return os.path.splitext(name or '')[1].lower()
+
+
+class RejectedUpload(SimpleUploadedFile):
+    """Stands in for a CV the upload handler refused, carrying the reason to the form."""
+
+    def __init__(self, name, error):
+        super().__init__(name, b'')
+        self.cv_error = error
+
+
+class CVUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams CV fields to a temporary file, hashing each chunk and
+    rejecting the file as soon as its first bytes or its size rule it out.
+    Other files are passed on to the next handler.
+    """
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        self.active = field_name in CV_UPLOAD_FIELDS
+        if not self.active:
+            return
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.sha256 = hashlib.sha256()
+        self.error = None
+        if cv_extension(file_name) not in CV_FORMATS:
+            self.error = 'Upload your CV as a PDF, DOC or DOCX file.'
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+        if self.error:
+            return None
+        if start == 0 and not raw_data.startswith(CV_FORMATS[cv_extension(self.file_name)]):
+            self.error = f'This file is not a valid {cv_extension(self.file_name)[1:].upper()} document.'
+        elif start + len(raw_data) > CV_MAX_UPLOAD_SIZE:
+            self.error = f'CVs can be at most {filesizeformat(CV_MAX_UPLOAD_SIZE)}.'
+        else:
+            self.sha256.update(raw_data)
+            super().receive_data_chunk(raw_data, start)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        self.active = False
+        if self.error:
+            self.file.close()
+            return RejectedUpload(self.file_name, self.error)
+        upload = super().file_complete(file_size)
+        upload.sha256 = self.sha256.hexdigest()
+        return upload
+
+
+def file_sha256(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_cv(upload):
+    """The CVDocument of ``upload``, storing the file only if its content is new."""
+    digest = getattr(upload, 'sha256', None) or file_sha256(upload)
+    document = CVDocument.objects.filter(sha256=digest).first()
+    if document is not None:
+        return document
+    name = f'{CV_DIR}/{digest}{cv_extension(upload.name)}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, upload)
+    document, _ = CVDocument.objects.get_or_create(sha256=digest, defaults={'file': name, 'size': upload.size})
+    return document
+
+
+def register_cv(name):
+    """The CVDocument of a CV already in storage under ``name`` (uploaded before CVDocument existed)."""
+    with default_storage.open(name) as file:
+        digest = file_sha256(file)
+        size = file.size
+    document, _ = CVDocument.objects.get_or_create(sha256=digest, defaults={'file': name, 'size': size})
+    return document
+
+
+def docx_text(file):
+    with zipfile.ZipFile(file) as docx:
+        root = ElementTree.fromstring(docx.read('word/document.xml'))
+    return '\n'.join(
+        ''.join(node.text or '' for node in paragraph.iter(WORD_NAMESPACE + 't'))
+        for paragraph in root.iter(WORD_NAMESPACE + 'p')
+    )
+
+
+def pdf_text(file):
+    return '\n'.join(page.extract_text() or '' for page in PdfReader(file).pages)
+
+
+def extract_text(document_id, name):
+    """
+    Runs in extract_cvs worker processes; returns (document id, status,
+    text, error) without touching the database.
+    """
+    extension = cv_extension(name)
+    if extension == '.pdf' and PdfReader is None:
+        return document_id, CVDocument.Status.PENDING, '', ''
+    if extension not in ('.pdf', '.docx'):
+        return document_id, CVDocument.Status.UNSUPPORTED, '', ''
+    try:
+        with default_storage.open(name) as file:
+            text = docx_text(file) if extension == '.docx' else pdf_text(file)
+    except Exception as error:
+        return document_id, CVDocument.Status.FAILED, '', f'{type(error).__name__}: {error}'
+    text = '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+    return document_id, CVDocument.Status.EXTRACTED, text[:CV_TEXT_MAX_LENGTH], ''
@@ -1,13 +1,31 @@
 from django.core.mail.backends.base import BaseEmailBackend
 from django.core.mail.backends.console import EmailBackend as ConsoleBackend
+from django.utils import timezone
+
 from account.models import OutgoingEmail
+from account.outbox import enqueue, outgoing_email
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Email backend that only queues messages as OutgoingEmail rows.
+
+    Delivery happens outside the request in the drain_outbox command, so
+    views that send mail (e.g. password reset) don't wait on SMTP.
+    """
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        return enqueue(email_messages)
+
 
 class DBAndConsoleEmailBackend(BaseEmailBackend):
     """Email backend that records outgoing emails to the database (OutgoingEmail)
     and forwards the message to the console backend for development visibility.
 
     This avoids SMTP connection errors while keeping a persistent record of
-    sent emails (so you can copy reset links from the DB).
+    sent emails (so you can copy reset links from the DB). Rows are stored
+    as already sent so the outbox worker doesn't deliver them again.
     """
 
     def __init__(self, *args, **kwargs):
@@ -17,31 +35,19 @@ class DBAndConsoleEmailBackend(BaseEmailBackend):
     def send_messages(self, email_messages):
         if not email_messages:
             return 0
-        sent_count = 0
-        for message in email_messages:
-            try:
-                # Save to DB
-                to_emails = ','.join(message.to or [])
-                body = message.body or ''
-                subject = message.subject or ''
-                from_email = message.from_email or ''
-                OutgoingEmail.objects.create(
-                    subject=subject,
-                    body=body,
-                    to_emails=to_emails,
-                    from_email=from_email,
-                    sent=False,
-                )
-            except Exception:
-                # Avoid failing send because of DB issues in dev; continue
-                pass
-
-            # Also write to console for visibility
-            try:
-                self.console.send_messages([message])
-                sent_count += 1
-            except Exception:
-                # ignore console backend failures
-                sent_count += 0
-
-        return sent_count
+        try:
+            # Save to DB
+            now = timezone.now()
+            OutgoingEmail.objects.bulk_create([
+                outgoing_email(message, sent=True, sent_at=now, attempts=1) for message in email_messages
+            ])
+        except Exception:
+            # Avoid failing send because of DB issues in dev; continue
+            pass
+
+        # Also write to console for visibility
+        try:
+            return self.console.send_messages(email_messages)
+        except Exception:
+            # ignore console backend failures
+            return 0
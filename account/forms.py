@@ -1,7 +1,36 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
+
+from .cvs import store_cv
 from .models import User, DomesticWorker, DomesticJob
 
 
+class CVField(forms.FileField):
+    """Reports why account.cvs.CVUploadHandler refused the file."""
+
+    def to_python(self, data):
+        if getattr(data, 'cv_error', None):
+            raise forms.ValidationError(data.cv_error, code='invalid')
+        return super().to_python(data)
+
+
+class CVUploadMixin:
+    """Saves an uploaded CV content-addressed, reusing an identical one already stored."""
+
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        cv = self.cleaned_data.get('cv')
+        if isinstance(cv, UploadedFile):
+            user.cv_document = store_cv(cv)
+            user.cv = user.cv_document.file.name
+        elif not cv:
+            user.cv_document = None
+        if commit:
+            user.save()
+            self.save_m2m()
+        return user
+
+
 class BaseRegistrationForm(forms.ModelForm):
     """Base form for user registration, handles password confirmation."""
     password = forms.CharField(widget=forms.PasswordInput)
@@ -21,7 +50,7 @@ class BaseRegistrationForm(forms.ModelForm):
         return user
 
 
-class EmployeeRegistrationForm(BaseRegistrationForm):
+class EmployeeRegistrationForm(CVUploadMixin, BaseRegistrationForm):
     class Meta:
         model = User
         fields = ('email', 'first_name', 'last_name', 'gender', 'phone_number', 'location', 'preferred_job_title', 'bio', 'cv', 'skills', 'years_of_experience')
@@ -33,6 +62,9 @@ class EmployeeRegistrationForm(BaseRegistrationForm):
         labels = {
             'cv': 'Upload your CV/Resume',
         }
+        field_classes = {
+            'cv': CVField,
+        }
 
     def save(self, commit=True):
         user = super().save(commit=False)
@@ -74,13 +106,16 @@ class CompanyRegistrationForm(BaseRegistrationForm):
         return user
 
 
-class EmployeeProfileEditForm(forms.ModelForm):
+class EmployeeProfileEditForm(CVUploadMixin, forms.ModelForm):
     class Meta:
         model = User
         fields = [
             'first_name', 'last_name', 'phone_number', 'location',
             'bio', 'cv', 'skills', 'years_of_experience', 'preferred_job_title'
         ]
+        field_classes = {
+            'cv': CVField,
+        }
         # You can add widgets here for better UI, e.g., for 'bio' or 'skills'
 
 
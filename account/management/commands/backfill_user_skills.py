@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from account.models import UserSkill
+from account.skills import parse_skills, recount_skills, skill_ids
+
+
+class Command(BaseCommand):
+    help = 'Parse the free-text skills of existing users into the Skill and UserSkill tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = get_user_model().objects.order_by('id').values_list('id', 'skills')
+
+        last_id, seen, postings = 0, 0, 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            skills = {user_id: parse_skills(text) for user_id, text in batch}
+            ids = skill_ids(sorted({name for names in skills.values() for name in names}))
+            with transaction.atomic():
+                UserSkill.objects.filter(user_id__in=list(skills)).delete()
+                created = UserSkill.objects.bulk_create([
+                    UserSkill(user_id=user_id, skill_id=ids[name])
+                    for user_id, names in skills.items() for name in names
+                ], batch_size=1000)
+            last_id = batch[-1][0]
+            seen += len(batch)
+            postings += len(created)
+            self.stdout.write(f'{seen} users processed')
+
+        # The per-user updates of set_user_skills were skipped
+        recount_skills()
+        self.stdout.write(self.style.SUCCESS(f'Stored {postings} skills of {seen} users.'))
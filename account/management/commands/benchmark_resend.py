@@ -0,0 +1,102 @@
+import socketserver
+import threading
+import time
+
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from account import outbox
+from account.models import OutgoingEmail
+from jobapp.benchmarks import rolled_back
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+class SMTPStandIn(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept messages, taking ``server.latency`` seconds for each."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.reply('220 benchmark')
+        for line in self.rfile:
+            command = line.decode(errors='replace').strip().upper()
+            if command == 'DATA':
+                self.reply('354 go ahead')
+                for data in self.rfile:
+                    if data == b'.\r\n':
+                        break
+                time.sleep(self.server.latency)
+                self.reply('250 queued')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(('127.0.0.1', 0), SMTPStandIn)
+        self.latency = latency
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the admin\'s resend action against a local SMTP stand-in, one send_mail() per row '
+        'as it used to be and outbox.resend() with each number of workers. The emails are created '
+        'in a transaction that is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=500)
+        parser.add_argument('--latency', type=float, default=0.02, help='Seconds the stand-in takes per message.')
+        parser.add_argument('--workers', type=int, nargs='+', default=[4, 8])
+
+    def handle(self, *args, **options):
+        server = SMTPServer(options['latency'])
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        smtp = override_settings(
+            EMAIL_BACKEND=SMTP_BACKEND, EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.server_address[1],
+            EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='', EMAIL_USE_TLS=False, EMAIL_USE_SSL=False,
+        )
+        try:
+            with smtp, rolled_back():
+                self.benchmark(options)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def benchmark(self, options):
+        OutgoingEmail.objects.bulk_create([
+            OutgoingEmail(
+                subject='Benchmark', body='Body', to_emails=f'user{i}@example.invalid',
+                from_email='benchmark@example.invalid',
+            )
+            for i in range(options['emails'])
+        ])
+        rows = list(OutgoingEmail.objects.filter(from_email='benchmark@example.invalid').order_by('id'))
+
+        # What the resend action did before the outbox
+        start = time.perf_counter()
+        for email in rows:
+            if send_mail(email.subject, email.body, email.from_email or None, [email.to_emails]):
+                email.sent = True
+                email.save(update_fields=['sent'])
+        self.stdout.write(f'send_mail per row: {time.perf_counter() - start:.1f} s')
+
+        for workers in options['workers']:
+            start = time.perf_counter()
+            sent, failed = outbox.resend(rows, workers=workers, backend=SMTP_BACKEND)
+            self.stdout.write(
+                f'resend, {workers} workers: {time.perf_counter() - start:.1f} s '
+                f'({len(sent)} sent, {len(failed)} failed)'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(rows)} emails at {options["latency"] * 1000:.0f} ms each (rolled back).'
+        ))
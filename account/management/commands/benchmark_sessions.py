@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from account.middleware import visit_buffer
+from account.models import User
+from jobapp.benchmarks import rolled_back, view_client
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+)
+URL_NAMES = ('jobapp:job-list', 'jobapp:about')
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure logged-in page throughput and queries per request with each session engine. '
+        'The user is created in a transaction that is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300)
+        parser.add_argument('--warmup', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            with rolled_back():
+                user = User.objects.create_user('session-benchmark@example.invalid', 'pass12345', role='employee')
+                for engine in ENGINES:
+                    with override_settings(SESSION_ENGINE=engine, DEBUG=False), view_client() as client:
+                        client.force_login(user)
+                        for url_name in URL_NAMES:
+                            self.benchmark(client, engine, reverse(url_name), options)
+        finally:
+            # Drop the rolled-back user's visits instead of writing them
+            visit_buffer.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["requests"]} requests per engine and page (rolled back).'
+        ))
+
+    def benchmark(self, client, engine, url, options):
+        for _ in range(options['warmup']):
+            client.get(url)
+        with CaptureQueriesContext(connection) as captured:
+            client.get(url)
+        queries = len(captured)
+        start = time.perf_counter()
+        for _ in range(options['requests']):
+            client.get(url)
+        rate = options['requests'] / (time.perf_counter() - start)
+        self.stdout.write(f'{url} {engine.rsplit(".", 1)[-1]}: {rate:.0f} req/s, {queries} queries per request')
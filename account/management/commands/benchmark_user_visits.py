@@ -0,0 +1,80 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+from user_visit.models import UserVisit
+
+from account.middleware import visit_buffer
+
+MIDDLEWARES = (
+    ('stock', 'user_visit.middleware.UserVisitMiddleware'),
+    ('buffered', 'account.middleware.BufferedUserVisitMiddleware'),
+)
+
+
+def _init_worker():
+    django.setup()
+    # Never share the parent's database connections across processes
+    connections.close_all()
+
+
+def _requests_per_second(middleware_path, user_id, requests, new_visits):
+    """Pass ``requests`` requests of ``user_id`` through the middleware alone."""
+    middleware = import_string(middleware_path)(lambda request: HttpResponse())
+    user = get_user_model().objects.get(id=user_id)
+    session = SimpleNamespace(session_key=f'visit-benchmark-{user_id}')
+    factory = RequestFactory()
+    visit_buffer.clear()
+    start = time.perf_counter()
+    for i in range(requests):
+        # A new user agent makes every request a new visit
+        request = factory.get('/', HTTP_USER_AGENT=f'agent {i}' if new_visits else 'agent')
+        request.user, request.session = user, session
+        middleware(request)
+    visit_buffer.flush()
+    return requests / (time.perf_counter() - start)
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the UserVisit middleware alone, user_visit\'s own and the buffered one, with '
+        'each process sending requests of its own user. The users and their visits are deleted '
+        'at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per process.')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = [
+            User.objects.create(email=f'visit-benchmark-{n}@example.invalid', role='employee').id
+            for n in range(options['processes'])
+        ]
+        try:
+            for name, path in MIDDLEWARES:
+                rates = [self.run(path, users, options['requests'], new_visits) for new_visits in (False, True)]
+                self.stdout.write(f'{name}: same visit {rates[0]:.0f} req/s, new visit every request {rates[1]:.0f} req/s')
+        finally:
+            # Visits go with their users
+            User.objects.filter(id__in=users).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["processes"]} processes x {options["requests"]} requests.'
+        ))
+
+    def run(self, path, users, requests, new_visits):
+        UserVisit.objects.filter(user_id__in=users).delete()
+        args = ([path] * len(users), users, [requests] * len(users), [new_visits] * len(users))
+        if len(users) == 1:
+            return _requests_per_second(*(arg[0] for arg in args))
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=len(users), initializer=_init_worker) as pool:
+            return sum(pool.map(_requests_per_second, *args))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from account.outbox import drain
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued OutgoingEmail rows, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running as a worker, polling the outbox every --interval seconds.',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain(options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(f'{sent} sent, {failed} failed')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,82 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from account.cvs import extract_text, register_cv
+from account.models import CVDocument, User
+
+
+def _init_worker():
+    django.setup()
+    # Never share the parent's database connections across processes
+    connections.close_all()
+
+
+def _extract(row):
+    return extract_text(*row)
+
+
+class Command(BaseCommand):
+    help = (
+        'Extract the plain text of pending CVs, registering CVs uploaded '
+        'before CVDocument existed first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Number of worker processes extracting text in parallel (0 = one per CPU).',
+        )
+
+    def handle(self, *args, **options):
+        registered = unreadable = 0
+        for user in User.objects.filter(cv_document__isnull=True).exclude(cv='').exclude(cv__isnull=True).only('cv'):
+            try:
+                document = register_cv(user.cv.name)
+            except OSError as error:
+                # e.g. a file lost with an ephemeral filesystem; the user is retried on the next run
+                self.stderr.write(f'Could not read the CV of user {user.pk} ({user.cv.name}): {error}')
+                unreadable += 1
+                continue
+            User.objects.filter(pk=user.pk).update(cv_document=document)
+            registered += 1
+
+        rows = list(
+            CVDocument.objects.filter(status=CVDocument.Status.PENDING).order_by('id').values_list('id', 'file')
+        )
+        if options['workers'] == 1:
+            counts = self._store(map(_extract, rows), options['batch_size'])
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'] or None, initializer=_init_worker) as pool:
+                counts = self._store(pool.map(_extract, rows, chunksize=8), options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Registered {registered} existing CVs ({unreadable} unreadable). Of {len(rows)} pending: '
+            f'{counts["extracted"]} extracted, {counts["unsupported"]} unsupported, {counts["failed"]} failed, '
+            f'{counts["pending"]} left pending (PDFs need pypdf).'
+        ))
+
+    def _store(self, results, batch_size):
+        counts, batch = Counter(), []
+        for result in results:
+            counts[result[1]] += 1
+            batch.append(result)
+            if len(batch) >= batch_size:
+                self._update(batch)
+                batch = []
+        self._update(batch)
+        return counts
+
+    def _update(self, batch):
+        now = timezone.now()
+        documents = [
+            CVDocument(id=document_id, status=status, text=text, error=error, extracted_at=now)
+            for document_id, status, text, error in batch if status != CVDocument.Status.PENDING
+        ]
+        CVDocument.objects.bulk_update(documents, ['status', 'text', 'error', 'extracted_at'])
@@ -0,0 +1,99 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError
+from django.utils import timezone
+from user_visit.models import UserVisit
+from user_visit.settings import RECORDING_DISABLED
+
+logger = logging.getLogger(__name__)
+
+# Buffered visits are written once this many have piled up...
+USER_VISIT_BUFFER_SIZE = getattr(settings, 'USER_VISIT_BUFFER_SIZE', 100)
+# ...or once the oldest of them has waited this many seconds
+USER_VISIT_FLUSH_INTERVAL = getattr(settings, 'USER_VISIT_FLUSH_INTERVAL', 30)
+# Bound on the per-day set of visit hashes already recorded by this process
+USER_VISIT_SEEN_LIMIT = 100000
+
+
+class VisitBuffer:
+    """
+    Per-process buffer of UserVisit rows. A visit hash covers the user,
+    day, session, address and user agent, so each one is buffered once a
+    day and written with bulk_create; rows another process already wrote
+    are skipped by the unique hash.
+    """
+
+    def __init__(self, size=USER_VISIT_BUFFER_SIZE, interval=USER_VISIT_FLUSH_INTERVAL):
+        self.size = size
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.visits = []
+        self.seen = set()
+        self.day = None
+        self.oldest = None
+
+    def add(self, visit):
+        """Buffer ``visit`` unless it was seen today; True when it is time to flush."""
+        with self.lock:
+            day = visit.timestamp.date()
+            if day != self.day or len(self.seen) >= USER_VISIT_SEEN_LIMIT:
+                self.day = day
+                self.seen = set()
+            if visit.hash not in self.seen:
+                self.seen.add(visit.hash)
+                self.visits.append(visit)
+                if self.oldest is None:
+                    self.oldest = time.monotonic()
+            return self.due()
+
+    def due(self):
+        return bool(self.visits) and (
+            len(self.visits) >= self.size or time.monotonic() - self.oldest >= self.interval
+        )
+
+    def flush(self):
+        with self.lock:
+            visits, self.visits, self.oldest = self.visits, [], None
+        if not visits:
+            return 0
+        try:
+            UserVisit.objects.bulk_create(visits, ignore_conflicts=True)
+        except DatabaseError:
+            logger.warning('Error saving %d user visits', len(visits), exc_info=True)
+            return 0
+        return len(visits)
+
+
+visit_buffer = VisitBuffer()
+atexit.register(visit_buffer.flush)
+
+
+class BufferedUserVisitMiddleware:
+    """
+    Drop-in replacement for user_visit's UserVisitMiddleware that keeps
+    page views free of database access: visits are deduplicated in memory
+    and written in batches by visit_buffer.
+    """
+
+    def __init__(self, get_response):
+        if RECORDING_DISABLED:
+            raise MiddlewareNotUsed('UserVisit recording has been disabled')
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.user.is_anonymous:
+            return self.get_response(request)
+
+        flush = visit_buffer.add(UserVisit.objects.build(request, timezone.now()))
+        response = self.get_response(request)
+        if flush:
+            visit_buffer.flush()
+        return response
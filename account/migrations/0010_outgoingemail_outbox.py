@@ -0,0 +1,51 @@
+# Generated by Django 3.2.16 on 2026-10-17 22:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def mark_existing_rows_sent(apps, schema_editor):
+    # Rows stored before the outbox existed record mail already handed to the
+    # console backend; they are a log, not a queue for drain_outbox to send
+    OutgoingEmail = apps.get_model('account', 'OutgoingEmail')
+    OutgoingEmail.objects.update(sent=True, sent_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_remove_domesticworker_phone_number'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='html_body',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(condition=models.Q(('sent', False)), fields=['next_attempt_at', 'id'], name='outgoingemail_pending_idx'),
+        ),
+        migrations.RunPython(mark_existing_rows_sent, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 22:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0010_outgoingemail_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='company_logo_digest',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-17 22:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0011_user_company_logo_digest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(upload_to='cvs/')),
+                ('size', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('extracted', 'Extracted'), ('unsupported', 'Unsupported format'), ('failed', 'Failed')], default='pending', max_length=12)),
+                ('text', models.TextField(blank=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('extracted_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='cvdocument',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['id'], name='cvdocument_pending_idx'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='cv_document',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='account.cvdocument'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-17 23:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.expressions
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0012_cvdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('user_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('location'), django.db.models.expressions.F('id'), name='user_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('preferred_job_title'), django.db.models.expressions.F('id'), name='user_job_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['years_of_experience', 'id'], name='user_experience_idx'),
+        ),
+        migrations.AddField(
+            model_name='userskill',
+            name='skill',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='account.skill'),
+        ),
+        migrations.AddField(
+            model_name='userskill',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_skills', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='users', through='account.UserSkill', to='account.Skill'),
+        ),
+        migrations.AddConstraint(
+            model_name='userskill',
+            constraint=models.UniqueConstraint(fields=('skill', 'user'), name='userskill_unique_posting'),
+        ),
+    ]
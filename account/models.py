@@ -1,5 +1,8 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from account.managers import CustomUserManager
@@ -28,6 +31,8 @@ class User(AbstractUser):
     gender = models.CharField(max_length=1, choices=Gender.choices, blank=True, null=True) # Made gender optional
     company_name = models.CharField(max_length=100, blank=True, null=True)
     company_logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
+    # sha256 of company_logo once its thumbnails exist (see jobapp.thumbnails)
+    company_logo_digest = models.CharField(max_length=64, blank=True, default='', editable=False)
     company_website = models.URLField(blank=True, null=True)
     # Changed to string reference to avoid circular import
     hiring_categories = models.ManyToManyField('jobapp.Category', blank=True, help_text=_('Categories of workers you typically hire'))
@@ -35,11 +40,14 @@ class User(AbstractUser):
     # Employee profile fields
     phone_number = models.CharField(max_length=20, blank=True, null=True, help_text=_('Contact phone number'))
     cv = models.FileField(upload_to='cvs/', blank=True, null=True, help_text=_('Upload your CV/Resume (PDF, DOC, DOCX)'))
+    cv_document = models.ForeignKey('CVDocument', on_delete=models.SET_NULL, blank=True, null=True, editable=False, related_name='users')
     skills = models.TextField(blank=True, null=True, help_text=_('Comma-separated list of skills (e.g., Python, Django, JavaScript)'))
     years_of_experience = models.IntegerField(blank=True, null=True, help_text=_('Years of professional experience'))
     preferred_job_title = models.CharField(max_length=100, blank=True, null=True, help_text=_('e.g., Software Engineer, Data Analyst'))
     location = models.CharField(max_length=100, blank=True, null=True, help_text=_('City/Region where you are located'))
     bio = models.TextField(blank=True, null=True, help_text=_('Brief professional bio or about you'))
+    # skills parsed into one row per skill (see account.skills)
+    skill_tags = models.ManyToManyField('Skill', through='UserSkill', blank=True, related_name='users')
 
 
     USERNAME_FIELD = "email"
@@ -47,6 +55,14 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Prefix searches of the employer candidate search, newest first
+            models.Index(Lower('location'), 'id', name='user_location_idx'),
+            models.Index(Lower('preferred_job_title'), 'id', name='user_job_title_idx'),
+            models.Index(fields=['years_of_experience', 'id'], name='user_experience_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -54,21 +70,84 @@ class User(AbstractUser):
 class OutgoingEmail(models.Model):
     """Simple model to store outgoing emails for auditing and retrieval.
     The password-reset flow will send emails using a backend that saves here.
+    Unsent rows form the outbox that the drain_outbox command delivers.
     """
     subject = models.CharField(max_length=255)
     body = models.TextField()
+    html_body = models.TextField(blank=True)
     to_emails = models.TextField(help_text='Comma-separated recipient emails')
     from_email = models.CharField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     sent = models.BooleanField(default=False)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Earliest time the outbox worker may (re)try; also pushed forward while a worker holds the row
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['next_attempt_at', 'id'], condition=Q(sent=False), name='outgoingemail_pending_idx'),
+        ]
 
     def __str__(self):
         return f"Email to {self.to_emails} - {self.subject}"
 
 
+class CVDocument(models.Model):
+    """An uploaded CV, stored once per distinct content (see account.cvs),
+    and the plain text the extract_cvs command pulls out of it.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        EXTRACTED = 'extracted', _('Extracted')
+        UNSUPPORTED = 'unsupported', _('Unsupported format')
+        FAILED = 'failed', _('Failed')
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='cvs/')
+    size = models.PositiveIntegerField()
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.PENDING)
+    text = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    extracted_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=Q(status='pending'), name='cvdocument_pending_idx'),
+        ]
+
+    def __str__(self):
+        return self.file.name
+
+
+class Skill(models.Model):
+    """A normalised skill name; user_count is the length of its postings list."""
+    name = models.CharField(max_length=100, unique=True)
+    user_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+
+class UserSkill(models.Model):
+    """One employee having one skill. The unique (skill, user) index is each
+    skill's postings list, sorted by user id.
+    """
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='postings', db_index=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_skills')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['skill', 'user'], name='userskill_unique_posting'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.skill_id}'
+
+
 class DomesticWorker(models.Model):
     """
     Model for domestic service workers.
@@ -0,0 +1,185 @@
+"""
+The email outbox.
+
+OutboxEmailBackend only stores messages as OutgoingEmail rows, so sending
+mail from a request costs one INSERT. The drain_outbox command delivers
+them: it claims a batch of due rows, sends the batch over one connection
+of EMAIL_OUTBOX_DELIVERY_BACKEND and records the outcome with two bulk
+writes. Failed rows are retried with exponential backoff until
+EMAIL_OUTBOX_MAX_ATTEMPTS is reached. The admin's resend action sends a
+small selection itself and puts a larger one back in the outbox.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from account.models import OutgoingEmail
+
+DELIVERY_BACKEND = getattr(settings, 'EMAIL_OUTBOX_DELIVERY_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+MAX_ATTEMPTS = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+# Seconds before the first retry; doubled after every further failure
+RETRY_DELAY = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60)
+MAX_RETRY_DELAY = getattr(settings, 'EMAIL_OUTBOX_MAX_RETRY_DELAY', 6 * 60 * 60)
+# How long a claimed batch stays invisible to other workers
+CLAIM_TIMEOUT = getattr(settings, 'EMAIL_OUTBOX_CLAIM_TIMEOUT', 10 * 60)
+# Threads, each with its own connection, used by the admin's resend action
+RESEND_WORKERS = getattr(settings, 'EMAIL_OUTBOX_RESEND_WORKERS', 4)
+# Larger selections are requeued for drain_outbox rather than sent within the admin request
+RESEND_INLINE_LIMIT = getattr(settings, 'EMAIL_OUTBOX_RESEND_INLINE_LIMIT', 200)
+
+
+def outgoing_email(message, **fields):
+    """An unsaved OutgoingEmail for an EmailMessage."""
+    html_body = ''
+    for content, mimetype in getattr(message, 'alternatives', []):
+        if mimetype == 'text/html':
+            html_body = content
+    return OutgoingEmail(
+        subject=message.subject or '',
+        body=message.body or '',
+        html_body=html_body,
+        to_emails=','.join(message.to or []),
+        from_email=message.from_email or '',
+        **fields,
+    )
+
+
+def enqueue(email_messages):
+    """Store ``email_messages`` in the outbox with a single INSERT."""
+    rows = OutgoingEmail.objects.bulk_create([outgoing_email(message) for message in email_messages])
+    return len(rows)
+
+
+def email_message(row, connection=None):
+    message = EmailMultiAlternatives(
+        row.subject, row.body, row.from_email or None,
+        [address.strip() for address in row.to_emails.split(',') if address.strip()],
+        connection=connection,
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, 'text/html')
+    return message
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def pending():
+    return OutgoingEmail.objects.filter(sent=False, attempts__lt=MAX_ATTEMPTS)
+
+
+def claim_batch(batch_size):
+    """
+    Lock up to ``batch_size`` due rows, skipping rows other workers hold, and
+    lease them by moving next_attempt_at past the claim timeout.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=CLAIM_TIMEOUT)
+    with transaction.atomic():
+        ids = list(
+            pending().filter(next_attempt_at__lte=now)
+            .select_for_update(skip_locked=True)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+        # On databases without row locks (SQLite) the lease decides who owns a row
+        OutgoingEmail.objects.filter(id__in=ids, next_attempt_at__lte=now).update(next_attempt_at=lease)
+    return list(OutgoingEmail.objects.filter(id__in=ids, next_attempt_at=lease).order_by('id'))
+
+
+def send_rows(rows, connection=None):
+    """
+    Send ``rows`` over one connection without touching the database;
+    returns (sent rows, [(row, error), ...]).
+    """
+    connection = connection or get_connection(DELIVERY_BACKEND)
+    sent, failed = [], []
+    try:
+        connection.open()
+    except Exception as error:
+        return [], [(row, error) for row in rows]
+    try:
+        for row in rows:
+            try:
+                if connection.send_messages([email_message(row, connection)]):
+                    sent.append(row)
+                else:
+                    failed.append((row, 'the backend did not send the message'))
+            except Exception as error:
+                failed.append((row, error))
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def record_results(sent, failed):
+    """Store the outcome of a delivery with one UPDATE and one bulk_update."""
+    now = timezone.now()
+    if sent:
+        OutgoingEmail.objects.filter(id__in=[row.id for row in sent]).update(
+            sent=True, sent_at=now, attempts=F('attempts') + 1, last_error='',
+        )
+    for row, error in failed:
+        row.attempts += 1
+        row.next_attempt_at = now + retry_delay(row.attempts)
+        row.last_error = str(error)
+    if failed:
+        OutgoingEmail.objects.bulk_update([row for row, _ in failed], ['attempts', 'next_attempt_at', 'last_error'])
+
+
+def deliver_batch(rows, connection=None):
+    """Send ``rows`` over one connection and record the outcome; returns (sent, failed)."""
+    sent, failed = send_rows(rows, connection)
+    record_results(sent, failed)
+    return len(sent), len(failed)
+
+
+def drain(batch_size=100, connection=None):
+    """Deliver every due message; returns (sent, failed)."""
+    total_sent = total_failed = 0
+    while True:
+        rows = claim_batch(batch_size)
+        if not rows:
+            return total_sent, total_failed
+        sent, failed = deliver_batch(rows, connection)
+        total_sent += sent
+        total_failed += failed
+
+
+def resend(rows, workers=RESEND_WORKERS, backend=None):
+    """
+    Send ``rows`` again whatever their state, split across ``workers``
+    threads that each hold one connection of ``backend`` (by default
+    EMAIL_OUTBOX_DELIVERY_BACKEND), then record the outcome.
+    Returns (sent rows, [(row, error), ...]).
+    """
+    rows = list(rows)
+    if not rows:
+        return [], []
+    workers = max(1, min(workers, len(rows)))
+    size = -(-len(rows) // workers)
+    chunks = [rows[i:i + size] for i in range(0, len(rows), size)]
+
+    def send_chunk(chunk):
+        return send_rows(chunk, get_connection(backend or DELIVERY_BACKEND))
+
+    sent, failed = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk_sent, chunk_failed in pool.map(send_chunk, chunks):
+            sent += chunk_sent
+            failed += chunk_failed
+    record_results(sent, failed)
+    return sent, failed
+
+
+def requeue(queryset):
+    """Make the rows of ``queryset`` due again for drain_outbox, as if never sent; returns their number."""
+    return queryset.update(sent=False, sent_at=None, attempts=0, next_attempt_at=timezone.now(), last_error='')
@@ -0,0 +1,69 @@
+"""
+Employee skills as a tag table.
+
+User.skills stays the free text employees type; parse_skills() turns it
+into normalised names, and one UserSkill row links the user to each
+Skill. The unique (skill, user) index makes every skill a postings list
+of user ids, which the employer candidate search (jobapp.candidates)
+intersects, shortest list first, using Skill.user_count. The
+backfill_user_skills command parses the skills saved before this table
+existed.
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from account.models import Skill, UserSkill
+
+SKILL_SEPARATORS_RE = re.compile(r'[,;\n]')
+SKILL_MAX_LENGTH = Skill._meta.get_field('name').max_length
+
+
+def normalize_skill(name):
+    return ' '.join(name.split()).lower()[:SKILL_MAX_LENGTH]
+
+
+def parse_skills(text):
+    """Distinct normalised skill names in ``text``, in order ("Python, django" -> ['python', 'django'])."""
+    names = (normalize_skill(part) for part in SKILL_SEPARATORS_RE.split(text or ''))
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def skill_ids(names):
+    """{name: Skill id} for ``names``, creating the skills seen for the first time."""
+    ids = dict(Skill.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = [name for name in names if name not in ids]
+    if missing:
+        Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+        ids.update(Skill.objects.filter(name__in=missing).values_list('name', 'id'))
+    return ids
+
+
+def set_user_skills(user_id, text):
+    """Make the UserSkill rows of a user match the skills in ``text``."""
+    wanted = set(skill_ids(parse_skills(text)).values())
+    with transaction.atomic():
+        current = set(UserSkill.objects.filter(user_id=user_id).values_list('skill_id', flat=True))
+        removed, added = current - wanted, wanted - current
+        if removed:
+            UserSkill.objects.filter(user_id=user_id, skill_id__in=removed).delete()
+            Skill.objects.filter(id__in=removed).update(user_count=F('user_count') - 1)
+        if added:
+            UserSkill.objects.bulk_create([UserSkill(user_id=user_id, skill_id=skill_id) for skill_id in added])
+            Skill.objects.filter(id__in=added).update(user_count=F('user_count') + 1)
+
+
+def release_user_skills(user_id):
+    """Take a user about to be deleted out of Skill.user_count; the UserSkill rows go with the user."""
+    Skill.objects.filter(postings__user_id=user_id).update(user_count=F('user_count') - 1)
+
+
+def recount_skills():
+    """Recompute every Skill.user_count from the postings (after bulk writes)."""
+    postings = (
+        UserSkill.objects.filter(skill=OuterRef('pk')).order_by()
+        .values('skill').annotate(count=Count('id')).values('count')
+    )
+    Skill.objects.update(user_count=Coalesce(Subquery(postings), 0))
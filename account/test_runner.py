@@ -0,0 +1,11 @@
+from django.test.runner import DiscoverRunner
+
+from account.middleware import visit_buffer
+
+
+class TestRunner(DiscoverRunner):
+
+    def teardown_databases(self, old_config, **kwargs):
+        # Buffered visits would otherwise be flushed at exit, after the test database is gone
+        visit_buffer.clear()
+        super().teardown_databases(old_config, **kwargs)
@@ -1,3 +1,328 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management import call_command
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from user_visit.models import UserVisit
+
+from account import outbox
+from account.middleware import visit_buffer
+from account.models import CVDocument, OutgoingEmail, User
+
+
+class FailingBackend:
+    """Delivery stand-in whose messages to broken@ addresses fail."""
+
+    def __init__(self):
+        self.locmem = get_connection('django.core.mail.backends.locmem.EmailBackend')
+        self.opened = 0
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        if any('broken@example.com' in message.to for message in messages):
+            raise ConnectionError('mailbox unavailable')
+        return self.locmem.send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='account.email_backends.OutboxEmailBackend')
+class OutboxTests(TestCase):
+
+    def test_password_reset_only_queues_the_email(self):
+        User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        with self.assertNumQueries(2):
+            # user lookup, outbox insert
+            response = self.client.post(reverse('account:password_reset'), {'email': 'seeker@example.com'})
+        self.assertRedirects(response, reverse('account:password_reset_done'))
+        self.assertEqual(mail.outbox, [])
+        queued = OutgoingEmail.objects.get()
+        self.assertFalse(queued.sent)
+        self.assertEqual(queued.to_emails, 'seeker@example.com')
+
+    def test_drain_delivers_over_one_connection_and_retries_failures(self):
+        message = EmailMultiAlternatives('Hello', 'Plain', 'jobs@example.com', ['a@example.com'])
+        message.attach_alternative('<p>Hello</p>', 'text/html')
+        mail.get_connection().send_messages([
+            message,
+            EmailMultiAlternatives('Hello', 'Plain', 'jobs@example.com', ['broken@example.com']),
+            EmailMultiAlternatives('Hello', 'Plain', 'jobs@example.com', ['b@example.com']),
+        ])
+
+        connection = FailingBackend()
+        self.assertEqual(outbox.drain(batch_size=10, connection=connection), (2, 1))
+        self.assertEqual(connection.opened, 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['a@example.com', 'b@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Hello</p>', 'text/html')])
+
+        failed = OutgoingEmail.objects.get(to_emails='broken@example.com')
+        self.assertFalse(failed.sent)
+        self.assertEqual(failed.attempts, 1)
+        self.assertEqual(failed.last_error, 'mailbox unavailable')
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        self.assertEqual(OutgoingEmail.objects.filter(sent=True, sent_at__isnull=False).count(), 2)
+
+        # not due yet, so nothing is claimed
+        self.assertEqual(outbox.drain(connection=connection), (0, 0))
+        OutgoingEmail.objects.filter(id=failed.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.drain(connection=connection), (0, 1))
+        self.assertEqual(outbox.retry_delay(2), 2 * outbox.retry_delay(1))
+
+    def test_rows_stop_retrying_after_max_attempts(self):
+        mail.get_connection().send_messages([
+            EmailMultiAlternatives('Hello', 'Plain', 'jobs@example.com', ['broken@example.com']),
+        ])
+        OutgoingEmail.objects.update(attempts=outbox.MAX_ATTEMPTS)
+        self.assertEqual(outbox.claim_batch(10), [])
+
+    def test_drain_outbox_command(self):
+        mail.get_connection().send_messages([
+            EmailMultiAlternatives('Hello', 'Plain', 'jobs@example.com', ['a@example.com']),
+        ])
+        out = StringIO()
+        with mock.patch.object(outbox, 'DELIVERY_BACKEND', 'django.core.mail.backends.locmem.EmailBackend'):
+            call_command('drain_outbox', stdout=out)
+        self.assertIn('1 sent, 0 failed', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class ResendActionTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin@example.com', 'pass12345')
+        self.client.force_login(self.admin)
+        OutgoingEmail.objects.bulk_create([
+            OutgoingEmail(subject='Hi', body='Body', to_emails=f'user{i}@example.com', from_email='jobs@example.com')
+            for i in range(9)
+        ] + [OutgoingEmail(subject='Hi', body='Body', to_emails='broken@example.com')])
+
+    def test_resend_uses_one_connection_per_worker_and_bulk_updates(self):
+        connections = []
+
+        def connection_factory(*args, **kwargs):
+            connections.append(FailingBackend())
+            return connections[-1]
+
+        with mock.patch.object(outbox, 'get_connection', connection_factory), \
+                self.assertNumQueries(3):
+            # rows, sent update, failure bulk_update
+            sent, failed = outbox.resend(OutgoingEmail.objects.all(), workers=3)
+        self.assertEqual((len(sent), len(failed)), (9, 1))
+        self.assertEqual(len(connections), 3)
+        self.assertTrue(all(connection.opened == 1 for connection in connections))
+        self.assertEqual(len(mail.outbox), 9)
+        self.assertEqual(OutgoingEmail.objects.filter(sent=True).count(), 9)
+        self.assertEqual(OutgoingEmail.objects.get(sent=False).last_error, 'mailbox unavailable')
+
+    def test_admin_action_reports_failures(self):
+        with mock.patch.object(outbox, 'get_connection', lambda *args, **kwargs: FailingBackend()):
+            response = self.client.post(reverse('admin:account_outgoingemail_changelist'), {
+                'action': 'resend_selected_emails',
+                '_selected_action': list(OutgoingEmail.objects.values_list('id', flat=True)),
+            }, follow=True)
+        self.assertContains(response, 'Resent 9 of 10 emails.')
+        self.assertContains(response, '1 emails failed: mailbox unavailable (1)')
+
+    def test_large_selection_is_requeued(self):
+        OutgoingEmail.objects.update(sent=True, attempts=2, last_error='old')
+        with mock.patch('account.admin.RESEND_INLINE_LIMIT', 5), \
+                mock.patch.object(outbox, 'get_connection') as get_connection:
+            response = self.client.post(reverse('admin:account_outgoingemail_changelist'), {
+                'action': 'resend_selected_emails',
+                '_selected_action': list(OutgoingEmail.objects.values_list('id', flat=True)),
+            }, follow=True)
+        get_connection.assert_not_called()
+        self.assertContains(response, 'Queued 10 emails for the outbox worker.')
+        self.assertContains(response, '?sent__exact=0')
+        self.assertEqual(outbox.claim_batch(100), list(OutgoingEmail.objects.order_by('id')))
+        self.assertEqual(OutgoingEmail.objects.filter(attempts=0, last_error='').count(), 10)
+
+    def test_benchmark_command_rolls_back(self):
+        out = StringIO()
+        call_command('benchmark_resend', emails=6, latency=0, workers=[2], stdout=out)
+        self.assertIn('resend, 2 workers', out.getvalue())
+        self.assertIn('(6 sent, 0 failed)', out.getvalue())
+        self.assertEqual(OutgoingEmail.objects.count(), 10)
+        self.assertFalse(OutgoingEmail.objects.filter(sent=True).exists())
+
+
+class BufferedUserVisitTests(TestCase):
+
+    def setUp(self):
+        visit_buffer.clear()
+        self.user = User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        visit_buffer.clear()
+
+    def test_page_views_do_not_touch_the_visit_table(self):
+        url = reverse('jobapp:about')
+        with self.assertNumQueries(2):
+            # session, user
+            self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(UserVisit.objects.count(), 0)
+        self.assertEqual(len(visit_buffer.visits), 1)
+        self.assertEqual(visit_buffer.flush(), 1)
+        self.assertEqual(UserVisit.objects.get().user, self.user)
+
+    def test_flushes_on_size_and_skips_rows_already_written(self):
+        with mock.patch.object(visit_buffer, 'size', 2):
+            self.client.get(reverse('jobapp:about'))
+            self.client.get(reverse('jobapp:about'), HTTP_USER_AGENT='other browser')
+        self.assertEqual(UserVisit.objects.count(), 2)
+        # another process buffering the same visit
+        visit_buffer.clear()
+        self.client.get(reverse('jobapp:about'))
+        visit_buffer.flush()
+        self.assertEqual(UserVisit.objects.count(), 2)
+
+    def test_benchmark_command_cleans_up(self):
+        out = StringIO()
+        call_command('benchmark_user_visits', processes=1, requests=5, stdout=out)
+        self.assertIn('stock: same visit', out.getvalue())
+        self.assertIn('buffered: same visit', out.getvalue())
+        self.assertFalse(User.objects.filter(email__startswith='visit-benchmark-').exists())
+        self.assertEqual(UserVisit.objects.count(), 0)
+
+    def test_flushes_on_age(self):
+        with mock.patch.object(visit_buffer, 'interval', 0):
+            self.client.get(reverse('jobapp:about'))
+        self.assertEqual(UserVisit.objects.count(), 1)
+
+
+class PruneSessionsTests(TestCase):
+
+    def test_deletes_expired_sessions_in_chunks(self):
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'old{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)]
+            + [Session(session_key='live', session_data='', expire_date=now + timedelta(days=1))]
+        )
+        out = StringIO()
+        # per chunk: select keys, delete; then the empty select
+        with self.assertNumQueries(3 * 2 + 1):
+            call_command('prune_sessions', chunk_size=2, stdout=out)
+        self.assertIn('Deleted 5 expired sessions.', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+    def test_keeps_sessions_extended_after_selection(self):
+        now = timezone.now()
+        Session.objects.create(session_key='extended', session_data='', expire_date=now - timedelta(days=1))
+        delete = QuerySet.delete
+
+        def extend_then_delete(queryset):
+            # A request extends the session between the select and the delete
+            Session.objects.filter(session_key='extended').update(expire_date=now + timedelta(days=1))
+            return delete(queryset)
+
+        out = StringIO()
+        with mock.patch.object(QuerySet, 'delete', extend_then_delete):
+            call_command('prune_sessions', stdout=out)
+        self.assertIn('Deleted 0 expired sessions.', out.getvalue())
+        self.assertTrue(Session.objects.filter(session_key='extended').exists())
+
+    def test_benchmark_command_rolls_back(self):
+        out = StringIO()
+        call_command('benchmark_sessions', requests=2, warmup=1, stdout=out)
+        self.assertIn('/jobs/ cached_db:', out.getvalue())
+        self.assertIn('/about/ signed_cookies:', out.getvalue())
+        self.assertFalse(User.objects.exists())
+        self.assertEqual(visit_buffer.visits, [])
+
+
+def docx_cv(*paragraphs):
+    namespace = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+    body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    output = BytesIO()
+    with zipfile.ZipFile(output, 'w') as docx:
+        docx.writestr('word/document.xml', f'<w:document xmlns:w="{namespace}"><w:body>{body}</w:body></w:document>')
+    return output.getvalue()
+
+
+class CVIngestionTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        self.client.force_login(self.user)
+
+    def upload(self, name, content):
+        return self.client.post(reverse('account:edit-profile'), {
+            'first_name': 'Sam', 'last_name': 'Seeker', 'cv': SimpleUploadedFile(name, content),
+        })
+
+    def test_identical_cvs_are_stored_once(self):
+        content = docx_cv('Sam Seeker', 'Django developer')
+        self.assertRedirects(self.upload('my cv.docx', content), reverse('account:edit-profile'))
+        self.user.refresh_from_db()
+        document = CVDocument.objects.get()
+        self.assertEqual(self.user.cv_document, document)
+        self.assertEqual(self.user.cv.name, f'cvs/{document.sha256}.docx')
+        self.assertEqual(document.status, CVDocument.Status.PENDING)
+        self.assertEqual(document.size, len(content))
+
+        other = User.objects.create_user('other@example.com', 'pass12345', role='employee')
+        self.client.force_login(other)
+        self.upload('resume.docx', content)
+        other.refresh_from_db()
+        self.assertEqual(other.cv_document, document)
+        self.assertEqual(CVDocument.objects.count(), 1)
+
+    def test_rejects_oversized_and_mislabelled_files(self):
+        with mock.patch('account.cvs.CV_MAX_UPLOAD_SIZE', 10):
+            response = self.upload('cv.docx', docx_cv('Too long'))
+        self.assertFormError(response, 'form', 'cv', 'CVs can be at most 10\xa0bytes.')
+
+        response = self.upload('cv.pdf', docx_cv('Not a PDF'))
+        self.assertFormError(response, 'form', 'cv', 'This file is not a valid PDF document.')
+
+        response = self.upload('cv.txt', b'plain text')
+        self.assertFormError(response, 'form', 'cv', 'Upload your CV as a PDF, DOC or DOCX file.')
+        self.assertFalse(CVDocument.objects.exists())
+
+    def test_extract_cvs_fills_in_text(self):
+        self.upload('cv.docx', docx_cv('Sam Seeker', '  ', 'Django developer'))
+        self.upload('cv.doc', b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1legacy')
+        out = StringIO()
+        call_command('extract_cvs', workers=1, stdout=out)
+        self.assertIn('2 pending: 1 extracted, 1 unsupported', out.getvalue())
+        docx, doc = CVDocument.objects.order_by('id')
+        self.assertEqual(docx.status, CVDocument.Status.EXTRACTED)
+        self.assertEqual(docx.text, 'Sam Seeker\nDjango developer')
+        self.assertIsNotNone(docx.extracted_at)
+        self.assertEqual(doc.status, CVDocument.Status.UNSUPPORTED)
+
+    def test_extract_cvs_skips_missing_legacy_files(self):
+        name = default_storage.save('cvs/legacy.docx', ContentFile(docx_cv('Legacy CV')))
+        User.objects.filter(pk=self.user.pk).update(cv=name)
+        lost = User.objects.create_user('lost@example.com', 'pass12345', role='employee', cv='cvs/lost.docx')
+        out, err = StringIO(), StringIO()
+        call_command('extract_cvs', workers=1, stdout=out, stderr=err)
+        self.assertIn('Registered 1 existing CVs (1 unreadable). Of 1 pending: 1 extracted', out.getvalue())
+        self.assertIn(f'user {lost.pk} (cvs/lost.docx)', err.getvalue())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.cv_document.text, 'Legacy CV')
+        lost.refresh_from_db()
+        self.assertIsNone(lost.cv_document)
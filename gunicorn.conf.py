@@ -0,0 +1,12 @@
+# Loaded automatically by `gunicorn job.wsgi` (see Procfile).
+
+
+def post_worker_init(worker):
+    # Runs in each worker once the Django application is loaded, so its first
+    # request doesn't pay for template compilation and cold caches.
+    from jobapp.warmup import warm_up
+
+    timings = warm_up()
+    worker.log.info(
+        'Worker %s warmed up in %.0f ms', worker.pid, sum(seconds for _, seconds in timings.values()) * 1000,
+    )
@@ -50,24 +50,37 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'jobapp.middleware.StaticFilesMiddleware',
+    'jobapp.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'user_visit.middleware.UserVisitMiddleware',   
+    'account.middleware.BufferedUserVisitMiddleware',
     # 'debug_toolbar.middleware.DebugToolbarMiddleware', # Removed debug_toolbar middleware
 ]
 
 ROOT_URLCONF = 'job.urls'
 
+# Templates are read from disk on every render while DEBUG is on, so edits
+# show up immediately; otherwise the cached loader parses each one once per
+# process (`manage.py warmup` and gunicorn.conf.py do it before the first
+# request). TEMPLATE_CACHE=1/0 overrides the choice.
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if os.environ.get('TEMPLATE_CACHE', '0' if DEBUG else '1') == '1':
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR,'template')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -104,6 +117,8 @@ DATABASES = {
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+TEST_RUNNER = 'account.test_runner.TestRunner'
+
 #for debug toolbar
 # INTERNAL_IPS = [ # Removed INTERNAL_IPS
 #     # ...
@@ -112,6 +127,44 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # ]
 # CACHES
 # ------------------------------------------------------------------------------
+# Local memory unless CACHE_LOCATION names a memcached server (host:port)
+# or CACHE_DIR a directory, either shared by all worker processes. This is
+# also the second level behind jobapp.caching's in-process cache.
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION')
+CACHE_DIR = os.environ.get('CACHE_DIR')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_LOCATION,
+        }
+    }
+elif CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# SESSIONS
+# ------------------------------------------------------------------------------
+# cached_db reads sessions from the cache and writes through to the database.
+# It needs a cache shared by every process (a local-memory cache would keep
+# serving a session another process has logged out), so without one the
+# plain database engine is used. SESSION_ENGINE can also be set to
+# django.contrib.sessions.backends.signed_cookies to keep sessions out of
+# the server altogether. Expired rows are removed by `manage.py prune_sessions`.
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE',
+    'django.contrib.sessions.backends.cached_db' if CACHE_LOCATION or CACHE_DIR else 'django.contrib.sessions.backends.db',
+)
 
 # CACHES = {
 #     "default": {
@@ -166,10 +219,22 @@ STATICFILES_DIRS = [
 ]
 
 STATIC_ROOT = os.path.join(BASE_DIR,'staticfiles')
+if not DEBUG:
+    # collectstatic writes content-hashed names plus .gz/.br variants, which
+    # jobapp.middleware.StaticFilesMiddleware serves with far-future headers
+    STATICFILES_STORAGE = 'jobapp.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# CV uploads are checked, hashed and size-capped while they stream in
+FILE_UPLOAD_HANDLERS = [
+    'account.cvs.CVUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+CV_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
 AUTH_USER_MODEL = 'account.User'
 
 # CKeditor Config
@@ -184,9 +249,13 @@ CKEDITOR_CONFIGS = {
 # Email settings - use console backend in development to avoid SMTP connection errors
 if DEBUG:
     EMAIL_BACKEND = 'account.email_backends.DBAndConsoleEmailBackend'
+    # used by drain_outbox and the admin's resend action
+    EMAIL_OUTBOX_DELIVERY_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 else:
-    # Production: configure a real SMTP server here
-    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    # Production: requests only queue mail in the OutgoingEmail outbox; the
+    # drain_outbox command delivers it through the SMTP server configured here
+    EMAIL_BACKEND = 'account.email_backends.OutboxEmailBackend'
+    EMAIL_OUTBOX_DELIVERY_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
     # Example SMTP settings (fill with real credentials/environment vars):
     # EMAIL_HOST = 'smtp.gmail.com'
     # EMAIL_PORT = 587
@@ -20,6 +20,7 @@ from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/', include('jobapp.api_urls')),
     path('', include('jobapp.urls')),
     path('', include('account.urls')),
     path('__debug__/', include('debug_toolbar.urls')),
@@ -18,3 +18,18 @@ admin.site.register(Job,JobAdmin)
 class BookmarkJobAdmin(admin.ModelAdmin):
     list_display = ('job','user','created_at')
 admin.site.register(BookmarkJob,BookmarkJobAdmin)
+
+
+class SiteStatsAdmin(admin.ModelAdmin):
+    list_display = ('total_candidates','total_companies','total_jobs','total_completed_jobs','updated_at')
+admin.site.register(SiteStats,SiteStatsAdmin)
+
+
+class RecommendationRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at','finished_at','incremental','users','jobs','recommendations')
+admin.site.register(RecommendationRun,RecommendationRunAdmin)
+
+
+class JobAlertRunAdmin(admin.ModelAdmin):
+    list_display = ('started_at','finished_at','jobs','matches','emails')
+admin.site.register(JobAlertRun,JobAlertRunAdmin)
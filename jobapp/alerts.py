@@ -0,0 +1,168 @@
+"""
+Job alerts for saved searches.
+
+A saved search matches a job when every filter it sets holds: the job
+type, experience level and work arrangement are equal, and each word of
+its text and location starts a word of the job's title, company name,
+description or tags, and of its location, respectively (the prefix
+matching of the full-text search).
+
+Instead of re-running every saved query, each SavedSearch is stored
+under a single anchor, the condition least likely to hold: its longest
+text word, else its longest location word, else one of its filters, else
+MATCH_ALL. A batch of new jobs is turned into every anchor it could
+satisfy (each prefix of each of its words and each of its filter
+values), the saved searches under those anchors are read through the
+anchor index and only they are checked in full. The send_job_alerts
+command then emails each user one digest of their matching jobs.
+"""
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import get_template
+from django.urls import reverse
+
+from jobapp.models import SavedSearch
+from jobapp.search import WORD_RE, job_document
+
+# Longer words are compared on this many characters
+ALERT_TERM_MAX_LENGTH = 50
+# Jobs listed in one digest; the rest are summed up as "and N more"
+JOB_ALERT_DIGEST_LIMIT = getattr(settings, 'JOB_ALERT_DIGEST_LIMIT', 20)
+# Scheme and host of the links in the digests
+SITE_URL = getattr(settings, 'SITE_URL', 'http://127.0.0.1:8000')
+MATCH_ALL = '*'
+# (field, anchor prefix), from the filter that narrows a search the most
+ANCHOR_FILTERS = (('experience_level', 'e'), ('work_arrangement', 'w'), ('job_type', 'j'))
+SAVED_SEARCH_FIELDS = ('job_title_or_company_name', 'location', 'job_type', 'experience_level', 'work_arrangement')
+# Anchors per query, under SQLite's bound parameter limit
+ANCHORS_PER_QUERY = 500
+DIGESTS_PER_BATCH = 500
+
+# The prefixes of the words of a job, and its filter values ('' when unset)
+AlertJob = namedtuple('AlertJob', 'id text_prefixes location_prefixes job_type experience_level work_arrangement')
+
+
+def alert_terms(text):
+    return {word[:ALERT_TERM_MAX_LENGTH] for word in WORD_RE.findall((text or '').lower())}
+
+
+def _prefixes(terms):
+    return {term[:end] for term in terms for end in range(1, len(term) + 1)}
+
+
+def search_anchor(search):
+    """The key a SavedSearch is stored under (see the module docstring)."""
+    for field, prefix in (('job_title_or_company_name', 't'), ('location', 'l')):
+        terms = alert_terms(getattr(search, field))
+        if terms:
+            return f'{prefix}:{max(sorted(terms), key=len)}'
+    for field, prefix in ANCHOR_FILTERS:
+        value = getattr(search, field)
+        if value:
+            return f'{prefix}:{value}'
+    return MATCH_ALL
+
+
+def alert_job(job):
+    """The AlertJob of a Job; ``job.tags`` should be prefetched."""
+    document = job_document(job)
+    text = ' '.join(document[field] for field in ('title', 'company_name', 'description', 'tags'))
+    return AlertJob(
+        id=job.id,
+        text_prefixes=_prefixes(alert_terms(text)),
+        location_prefixes=_prefixes(alert_terms(document['location'])),
+        job_type=job.job_type or '',
+        experience_level=job.experience_level or '',
+        work_arrangement=job.work_arrangement or '',
+    )
+
+
+def job_anchors(job):
+    """Every anchor under which a saved search could match ``job``."""
+    anchors = {MATCH_ALL}
+    anchors.update(f't:{prefix}' for prefix in job.text_prefixes)
+    anchors.update(f'l:{prefix}' for prefix in job.location_prefixes)
+    for field, prefix in ANCHOR_FILTERS:
+        value = getattr(job, field)
+        if value:
+            anchors.add(f'{prefix}:{value}')
+    return anchors
+
+
+# What a saved search requires of a job: sets of text and location words, and filter values ('' for any)
+Conditions = namedtuple('Conditions', 'text_terms location_terms job_type experience_level work_arrangement')
+
+
+def search_conditions(text, location, job_type, experience_level, work_arrangement):
+    return Conditions(alert_terms(text), alert_terms(location), job_type, experience_level, work_arrangement)
+
+
+def matches(conditions, job):
+    return (
+        (not conditions.job_type or conditions.job_type == job.job_type)
+        and (not conditions.experience_level or conditions.experience_level == job.experience_level)
+        and (not conditions.work_arrangement or conditions.work_arrangement == job.work_arrangement)
+        and conditions.text_terms <= job.text_prefixes
+        and conditions.location_terms <= job.location_prefixes
+    )
+
+
+def match_jobs(jobs):
+    """Yield (user id, job id) for each saved search matching one of ``jobs`` (AlertJobs)."""
+    jobs_by_anchor = defaultdict(list)
+    for job in jobs:
+        for anchor in job_anchors(job):
+            jobs_by_anchor[anchor].append(job)
+    anchors = sorted(jobs_by_anchor)
+    for start in range(0, len(anchors), ANCHORS_PER_QUERY):
+        rows = SavedSearch.objects.filter(anchor__in=anchors[start:start + ANCHORS_PER_QUERY]).values_list(
+            'user_id', 'anchor', *SAVED_SEARCH_FIELDS,
+        )
+        for user_id, anchor, *fields in rows.iterator():
+            conditions = search_conditions(*fields)
+            for job in jobs_by_anchor[anchor]:
+                if matches(conditions, job):
+                    yield user_id, job.id
+
+
+def digest_job(job):
+    """What a digest shows of a Job."""
+    return {
+        'title': job.title,
+        'company_name': job.company_name,
+        'location': job.location,
+        'url': SITE_URL + reverse('jobapp:single-job', args=[job.id]),
+    }
+
+
+def send_digests(matched, jobs, limit=JOB_ALERT_DIGEST_LIMIT):
+    """
+    Email every active user in ``matched`` ({user id: job ids}) one digest
+    of their jobs, newest first; ``jobs`` is {job id: digest_job(job)}.
+    Returns the number of emails sent.
+    """
+    connection = get_connection()
+    template = get_template('jobapp/emails/job_alert.txt')
+    saved_searches_url = SITE_URL + reverse('jobapp:saved-searches')
+    user_ids = sorted(matched)
+    sent = 0
+    for start in range(0, len(user_ids), DIGESTS_PER_BATCH):
+        users = get_user_model().objects.filter(
+            id__in=user_ids[start:start + DIGESTS_PER_BATCH], is_active=True,
+        ).only('id', 'email', 'first_name')
+        messages = []
+        for user in users:
+            job_ids = sorted(matched[user.id], reverse=True)
+            body = template.render({
+                'user': user,
+                'jobs': [jobs[job_id] for job_id in job_ids[:limit]],
+                'more': len(job_ids[limit:]),
+                'saved_searches_url': saved_searches_url,
+            })
+            subject = f'{len(job_ids)} new job{"s" if len(job_ids) != 1 else ""} matching your saved searches'
+            messages.append(EmailMessage(subject, body, None, [user.email]))
+        sent += connection.send_messages(messages) or 0
+    return sent
@@ -0,0 +1,236 @@
+"""
+Read-only JSON API, version 1 (mounted at /api/v1/).
+
+  jobs/             open jobs, with the search_result_view filters and
+                    sort_by; cursor paginated (?limit=, ?after=, ?before=)
+  jobs/<id>/        one published job
+  categories/       every category
+  tags/             the tags of open jobs, most used first
+
+?fields=a,b,c limits a job to those fields (JOB_FIELDS, plus "tags" and
+"url"), and only their columns are read. Every 200 response carries an
+ETag of its body, so a client sending it back in If-None-Match gets an
+empty 304. Pages, jobs, categories and tags are kept in job_cache like
+the HTML listings and dropped when a job, category or tag changes.
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+from taggit.models import Tag, TaggedItem
+
+from jobapp.caching import job_cache
+from jobapp.models import OPEN_JOBS, Job
+from jobapp.pagination import CursorEncoder, CursorPaginator
+from jobapp.salary import parse_min_salary
+from jobapp.search import get_search_backend, search_jobs
+from jobapp.views import JOB_SORT_ORDERINGS, cached_categories
+
+try:
+    import orjson
+except ImportError:
+    # The standard library encoder, about eight times slower on a page of jobs
+    orjson = None
+
+# API field: Job model field
+JOB_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'company_name': 'company_name',
+    'company_description': 'company_description',
+    'company_website': 'url',
+    'location': 'location',
+    'job_type': 'job_type',
+    'experience_level': 'experience_level',
+    'work_arrangement': 'work_arrangement',
+    'category': 'category',
+    'salary': 'salary',
+    'salary_min': 'salary_min',
+    'salary_max': 'salary_max',
+    'salary_currency': 'salary_currency',
+    'salary_period': 'salary_period',
+    'description': 'description',
+    'benefits': 'benefits',
+    'last_date': 'last_date',
+    'created_at': 'created_at',
+}
+# Fields computed from more than the job's row
+EXTRA_JOB_FIELDS = ('tags', 'url')
+# The rich-text fields are left out of listings unless asked for
+DEFAULT_LIST_FIELDS = tuple(
+    field for field in (*JOB_FIELDS, *EXTRA_JOB_FIELDS)
+    if field not in ('description', 'benefits', 'company_description')
+)
+DEFAULT_DETAIL_FIELDS = (*JOB_FIELDS, *EXTRA_JOB_FIELDS)
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# Query parameters that are not search filters
+PAGE_PARAMS = ('after', 'before', 'limit', 'fields')
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, cls=CursorEncoder, separators=(',', ':')).encode()
+
+
+def api_response(request, data, status=200):
+    body = dumps(data)
+    response = HttpResponse(body, content_type='application/json', status=status)
+    if status != 200:
+        return response
+    etag = '"%s"' % hashlib.md5(body).hexdigest()
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    return get_conditional_response(request, etag=etag, response=response)
+
+
+def api_error(request, message, status=400):
+    return api_response(request, {'error': message}, status=status)
+
+
+class BadRequest(Exception):
+    pass
+
+
+def requested_fields(request, default):
+    if not request.GET.get('fields'):
+        return default
+    fields = tuple(dict.fromkeys(field.strip() for field in request.GET['fields'].split(',') if field.strip()))
+    unknown = [field for field in fields if field not in JOB_FIELDS and field not in EXTRA_JOB_FIELDS]
+    if unknown:
+        raise BadRequest(f'Unknown fields: {", ".join(unknown)}.')
+    return fields
+
+
+def page_size(request):
+    limit = request.GET.get('limit')
+    if not limit:
+        return API_PAGE_SIZE
+    # isdigit() would let through '²', which int() rejects
+    if not (limit.isascii() and limit.isdecimal()) or not 1 <= int(limit) <= API_MAX_PAGE_SIZE:
+        raise BadRequest(f'limit must be a number from 1 to {API_MAX_PAGE_SIZE}.')
+    return int(limit)
+
+
+def select_fields(queryset, fields, ordering=()):
+    """``queryset`` reading only the columns of ``fields`` and ``ordering``."""
+    columns = {JOB_FIELDS[field] for field in fields if field in JOB_FIELDS}
+    columns.update(field.lstrip('-') for field in ordering if field.lstrip('-') != 'search_rank')
+    return queryset.only('id', *columns)
+
+
+def job_tags(jobs, fields):
+    """
+    {job id: sorted tag names} of ``jobs`` when ``fields`` has "tags", read
+    in one query (taggit's prefetch_related('tags') is several times
+    slower on a page of jobs).
+    """
+    ids = [job.id for job in jobs]
+    if 'tags' not in fields or not ids:
+        return {}
+
+    def compute():
+        tags = defaultdict(list)
+        tagged = TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Job), object_id__in=ids)
+        for job_id, name in tagged.values_list('object_id', 'tag__name'):
+            tags[job_id].append(name)
+        return {job_id: sorted(names) for job_id, names in tags.items()}
+    return job_cache.get_or_set(('jobs', 'tags'), ('api-job-tags', tuple(ids)), compute)
+
+
+def serialize_job(request, job, fields, tags):
+    data = {}
+    for field in fields:
+        if field == 'tags':
+            data[field] = tags.get(job.id, [])
+        elif field == 'url':
+            data[field] = request.build_absolute_uri(reverse('jobapp:single-job', args=[job.id]))
+        elif field == 'category':
+            data[field] = job.category_id
+        else:
+            data[field] = getattr(job, JOB_FIELDS[field])
+    return data
+
+
+@require_safe
+def job_list_view(request):
+    try:
+        fields = requested_fields(request, DEFAULT_LIST_FIELDS)
+        per_page = page_size(request)
+        if request.GET.get('min_salary') and parse_min_salary(request.GET['min_salary']) is None:
+            raise BadRequest('min_salary must be a whole number.')
+    except BadRequest as error:
+        return api_error(request, str(error))
+
+    jobs = search_jobs(Job.objects.filter(OPEN_JOBS), request.GET)
+    sort_by = request.GET.get('sort_by')
+    if sort_by in JOB_SORT_ORDERINGS:
+        ordering = JOB_SORT_ORDERINGS[sort_by]
+        if ordering[0].lstrip('-').startswith('salary_'):
+            jobs = jobs.filter(**{f'{ordering[0].lstrip("-")}__isnull': False})
+    elif 'search_rank' in jobs.query.annotations:
+        ordering = get_search_backend().rank_ordering
+    else:
+        ordering = JOB_SORT_ORDERINGS['newest_first']
+
+    filters = sorted((key, value) for key, value in request.GET.items() if key not in PAGE_PARAMS)
+    paginator = CursorPaginator(
+        select_fields(jobs, fields, ordering), per_page, ordering,
+        cache_key=('api-jobs', tuple(filters), fields), cache_namespaces=('jobs', 'tags'),
+    )
+    for key in ('after', 'before'):
+        if request.GET.get(key) and paginator.decode(request.GET[key]) is None:
+            return api_error(request, f'{key} is not a valid cursor.')
+    page = paginator.get_page(request)
+    tags = job_tags(page, fields)
+    return api_response(request, {
+        'results': [serialize_job(request, job, fields, tags) for job in page],
+        'next': page.next_query and request.build_absolute_uri(f'{request.path}?{page.next_query}'),
+        'previous': page.previous_query and request.build_absolute_uri(f'{request.path}?{page.previous_query}'),
+    })
+
+
+@require_safe
+def job_detail_view(request, id):
+    try:
+        fields = requested_fields(request, DEFAULT_DETAIL_FIELDS)
+    except BadRequest as error:
+        return api_error(request, str(error))
+    job = job_cache.get_or_set(
+        ('jobs', 'tags'), ('api-job', id, fields),
+        lambda: select_fields(Job.objects.filter(id=id, is_published=True), fields).first(),
+    )
+    if job is None:
+        return api_error(request, 'Job not found.', status=404)
+    return api_response(request, serialize_job(request, job, fields, job_tags([job], fields)))
+
+
+@require_safe
+def category_list_view(request):
+    return api_response(request, {
+        'results': [{'id': category.id, 'name': category.name} for category in cached_categories()],
+    })
+
+
+def open_job_tags():
+    return list(
+        Tag.objects.filter(
+            taggit_taggeditem_items__content_type=ContentType.objects.get_for_model(Job),
+            taggit_taggeditem_items__object_id__in=Job.objects.filter(OPEN_JOBS).values('id'),
+        )
+        .annotate(jobs=Count('taggit_taggeditem_items'))
+        .order_by('-jobs', 'name')
+        .values('name', 'slug', 'jobs')
+    )
+
+
+@require_safe
+def tag_list_view(request):
+    return api_response(request, {'results': job_cache.get_or_set(('jobs', 'tags'), 'api-tags', open_job_tags)})
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from jobapp import api
+
+app_name = "api-v1"
+
+
+urlpatterns = [
+    path('jobs/', api.job_list_view, name='job-list'),
+    path('jobs/<int:id>/', api.job_detail_view, name='job-detail'),
+    path('categories/', api.category_list_view, name='category-list'),
+    path('tags/', api.tag_list_view, name='tag-list'),
+]
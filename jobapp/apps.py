@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class JobappConfig(AppConfig):
     name = 'jobapp'
+
+    def ready(self):
+        from jobapp import signals  # noqa: F401
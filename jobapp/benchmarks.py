@@ -0,0 +1,59 @@
+"""
+Helpers shared by the benchmark_* management commands: synthetic data
+created in a transaction that is always rolled back, requests that reach
+the views rather than the page cache, and latency percentiles.
+"""
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from jobapp.caching import NAMESPACES, job_cache
+from jobapp.models import SiteStats
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run the block in a transaction that is rolled back however it exits,
+    then drop what was cached from the rolled-back rows.
+    """
+    try:
+        with transaction.atomic():
+            try:
+                yield
+            finally:
+                transaction.set_rollback(True)
+    finally:
+        job_cache.bump(*NAMESPACES)
+        cache.delete(SiteStats.CACHE_KEY)
+
+
+@contextmanager
+def view_client(**defaults):
+    """A test Client whose requests skip the anonymous page cache."""
+    with override_settings(ALLOWED_HOSTS=['testserver']), mock.patch('jobapp.middleware.PAGE_CACHE_VIEWS', ()):
+        yield Client(**defaults)
+
+
+def time_calls(func, repeat):
+    """Sorted wall-clock seconds of ``repeat`` calls of ``func()``."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return sorted(times)
+
+
+def percentile(times, percent):
+    """Nearest-rank percentile of sorted ``times``."""
+    return times[min(len(times) - 1, max(0, -(-len(times) * percent // 100) - 1))]
+
+
+def latency(times):
+    return f'median {percentile(times, 50) * 1000:.1f} ms, p95 {percentile(times, 95) * 1000:.1f} ms'
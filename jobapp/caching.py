@@ -0,0 +1,193 @@
+"""
+Two-level cache for listing querysets.
+
+L1 is a small in-process LRU; L2 is the JOB_CACHE_ALIAS Django cache,
+shared between processes when CACHES points at memcached or a cache
+directory. Every entry depends on one or more namespaces ("jobs",
+"categories", ...) and its key carries their current generation numbers,
+so bumping a namespace (see jobapp.signals) makes every dependent entry
+unreachable without having to find and delete it.
+
+Generations live in L2 and are remembered in L1 for
+JOB_CACHE_GENERATION_TTL seconds, which bounds how long another process
+can keep serving an entry after a bump.
+"""
+import hashlib
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+JOB_CACHE_ALIAS = getattr(settings, 'JOB_CACHE_ALIAS', 'default')
+# Seconds entries stay in L2
+JOB_CACHE_TIMEOUT = getattr(settings, 'JOB_CACHE_TIMEOUT', 300)
+JOB_CACHE_L1_SIZE = getattr(settings, 'JOB_CACHE_L1_SIZE', 500)
+JOB_CACHE_L1_TIMEOUT = getattr(settings, 'JOB_CACHE_L1_TIMEOUT', 60)
+JOB_CACHE_GENERATION_TTL = getattr(settings, 'JOB_CACHE_GENERATION_TTL', 2)
+
+NAMESPACES = ('jobs', 'categories', 'applications', 'bookmarks', 'tags')
+
+_missing = object()
+
+
+class LocalLRU:
+    """Thread-safe bounded LRU whose entries expire after a per-entry TTL."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class JobCache:
+
+    def __init__(self, alias=JOB_CACHE_ALIAS, timeout=JOB_CACHE_TIMEOUT,
+                 l1_size=JOB_CACHE_L1_SIZE, l1_timeout=JOB_CACHE_L1_TIMEOUT,
+                 generation_ttl=JOB_CACHE_GENERATION_TTL):
+        self.alias = alias
+        self.timeout = timeout
+        self.l1_timeout = l1_timeout
+        self.generation_ttl = generation_ttl
+        self.local = LocalLRU(l1_size)
+        self.counters = Counter()
+        self.counters_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def _generation_key(namespace):
+        return f'jobcache:generation:{namespace}'
+
+    def generations(self, namespaces):
+        """Current generation of each namespace, from L1 when fresh enough."""
+        generations, missing = {}, []
+        for namespace in namespaces:
+            value = self.local.get(self._generation_key(namespace))
+            if value is None:
+                missing.append(namespace)
+            else:
+                generations[namespace] = value
+        if missing:
+            keys = {self._generation_key(namespace): namespace for namespace in missing}
+            found = self.shared.get_many(keys)
+            for key, namespace in keys.items():
+                value = found.get(key)
+                if value is None:
+                    # Start from the clock so a generation lost from L2 is never reused
+                    self.shared.add(key, int(time.time() * 1000), None)
+                    value = self.shared.get(key)
+                generations[namespace] = value
+                self.local.set(key, value, self.generation_ttl)
+        return generations
+
+    def bump(self, *namespaces):
+        """Invalidate every entry depending on any of ``namespaces``."""
+        for namespace in namespaces:
+            key = self._generation_key(namespace)
+            try:
+                value = self.shared.incr(key)
+            except ValueError:
+                value = int(time.time() * 1000)
+                self.shared.set(key, value, None)
+            self.local.set(key, value, self.generation_ttl)
+
+    def _count(self, namespaces, outcome):
+        with self.counters_lock:
+            for namespace in namespaces:
+                self.counters[namespace, outcome] += 1
+
+    def entry_key(self, namespaces, key):
+        """
+        The cache key of ``key`` for the current generations of
+        ``namespaces``; compute it before reading the data to be stored, so a
+        bump in between leaves the entry unreachable.
+        """
+        generations = self.generations(namespaces)
+        stamp = '.'.join(f'{namespace}{generations[namespace]}' for namespace in sorted(namespaces))
+        digest = hashlib.md5(repr(key).encode()).hexdigest()
+        return f'jobcache:{stamp}:{digest}'
+
+    def get(self, entry_key, namespaces, default=None):
+        # L1 keeps pickles so callers never share mutable objects
+        data = self.local.get(entry_key)
+        if data is not None:
+            self._count(namespaces, 'l1_hits')
+            return pickle.loads(data)
+        data = self.shared.get(entry_key)
+        if data is not None:
+            self._count(namespaces, 'l2_hits')
+            self.local.set(entry_key, data, self.l1_timeout)
+            return pickle.loads(data)
+        self._count(namespaces, 'misses')
+        return default
+
+    def set(self, entry_key, value, timeout=None):
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        self.shared.set(entry_key, data, self.timeout if timeout is None else timeout)
+        self.local.set(entry_key, data, self.l1_timeout)
+
+    def get_or_set(self, namespaces, key, compute, timeout=None):
+        """
+        The value cached under ``key`` for the current generations of
+        ``namespaces``, computing and storing it with ``compute()`` on a miss.
+        """
+        entry_key = self.entry_key(namespaces, key)
+        value = self.get(entry_key, namespaces, _missing)
+        if value is _missing:
+            value = compute()
+            self.set(entry_key, value, timeout)
+        return value
+
+    def stats(self):
+        """Hit/miss counters of this process, per namespace."""
+        with self.counters_lock:
+            counters = dict(self.counters)
+        return {
+            namespace: {
+                outcome: counters.get((namespace, outcome), 0)
+                for outcome in ('l1_hits', 'l2_hits', 'misses')
+            }
+            for namespace in NAMESPACES
+        }
+
+    def clear(self):
+        """Drop L1 and move every namespace to a new generation."""
+        self.local.clear()
+        self.bump(*NAMESPACES)
+        with self.counters_lock:
+            self.counters.clear()
+
+
+job_cache = JobCache()
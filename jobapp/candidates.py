@@ -0,0 +1,61 @@
+"""
+Candidate search for employers.
+
+Employees are matched on all the requested skills, a location and a
+preferred job title prefix, and a range of years of experience. Every
+skill adds one join on its UserSkill postings; the database drives the
+query from the first join and probes the others through the unique
+(skill, user) index, so the skills are filtered rarest first and the
+cost follows the shortest postings list rather than the most common
+skill. The prefixes are range scans of the lower() indexes on User.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.functions import Lower
+
+from account.models import Skill
+from account.skills import parse_skills
+
+CANDIDATE_SORT_ORDERINGS = {
+    'newest': ('-id',),
+    'most_experienced': ('-years_of_experience', '-id'),
+}
+CANDIDATES_PAGE_SIZE = 25
+# Highest total the result count reports exactly ("1000+" beyond)
+CANDIDATES_COUNT_CAP = 1000
+
+
+def _prefix_range(prefix):
+    """(lower bound, upper bound) of the lower-cased strings starting with ``prefix``."""
+    prefix = prefix.strip().lower()
+    return prefix, prefix + '\uffff'
+
+
+def search_candidates(skills='', location='', job_title='', min_years=None, max_years=None, sort_by='newest'):
+    """Employees matching every given criterion, to be ordered by CANDIDATE_SORT_ORDERINGS[sort_by]."""
+    candidates = get_user_model().objects.filter(role='employee')
+    names = parse_skills(skills)
+    if names:
+        found = list(Skill.objects.filter(name__in=names).order_by('user_count', 'id').values_list('id', flat=True))
+        if len(found) < len(names):
+            return candidates.none()
+        for skill_id in found:
+            # A separate filter() per skill: one join, and one postings list, each
+            candidates = candidates.filter(user_skills__skill_id=skill_id)
+    if location:
+        low, high = _prefix_range(location)
+        candidates = candidates.alias(location_key=Lower('location')).filter(
+            location_key__gte=low, location_key__lt=high,
+        )
+    if job_title:
+        low, high = _prefix_range(job_title)
+        candidates = candidates.alias(job_title_key=Lower('preferred_job_title')).filter(
+            job_title_key__gte=low, job_title_key__lt=high,
+        )
+    if min_years is not None:
+        candidates = candidates.filter(years_of_experience__gte=min_years)
+    if max_years is not None:
+        candidates = candidates.filter(years_of_experience__lte=max_years)
+    if sort_by == 'most_experienced':
+        # Cursors can't seek past NULLs
+        candidates = candidates.filter(years_of_experience__isnull=False)
+    return candidates
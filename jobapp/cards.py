@@ -0,0 +1,61 @@
+"""
+Job cards rendered once per job version.
+
+A card's markup depends only on the job, so it is cached under the job's
+id and updated_at: editing the job changes the key and the old markup is
+simply never read again. A page of cards is fetched with one get_many and
+the missing ones are stored with one set_many. The per-user "Applied" /
+"Saved" badges are rendered on every request and put in place of
+JOB_STATE_MARKER.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from jobapp.caching import JOB_CACHE_ALIAS
+from jobapp.thumbnails import logo_digests
+
+# Cards are keyed by version, so this only bounds how long unused ones linger
+JOB_CARD_CACHE_TIMEOUT = getattr(settings, 'JOB_CARD_CACHE_TIMEOUT', 24 * 60 * 60)
+# Raise to drop every cached card after changing a card template
+JOB_CARD_CACHE_VERSION = getattr(settings, 'JOB_CARD_CACHE_VERSION', 1)
+JOB_STATE_MARKER = '<!-- job-state -->'
+
+
+def card_key(template_name, job, truncate, logo_digest=''):
+    return (
+        f'jobcard:{JOB_CARD_CACHE_VERSION}:{template_name}:{truncate}:{job.id}:{job.updated_at.timestamp()}'
+        f':{logo_digest}'
+    )
+
+
+def render_cards(jobs, template_name, state_template_name, request, truncate=150, logos=False):
+    """
+    The cards of ``jobs`` with ``request``'s badges, in order. With
+    ``logos`` the cards also get their company's logo digest as
+    ``logo_digest``, which is part of the cache key.
+    """
+    jobs = list(jobs)
+    cache = caches[JOB_CACHE_ALIAS]
+    digests = logo_digests(job.user_id for job in jobs) if logos else {}
+    keys = [card_key(template_name, job, truncate, digests.get(job.user_id, '')) for job in jobs]
+    cards = cache.get_many(keys)
+
+    missing = {key: job for key, job in zip(keys, jobs) if key not in cards}
+    if missing:
+        template = get_template(template_name)
+        for key, job in missing.items():
+            cards[key] = template.render({
+                'job': job, 'truncate': truncate, 'logo_digest': digests.get(job.user_id, ''),
+                'job_state': mark_safe(JOB_STATE_MARKER),
+            })
+        cache.set_many({key: cards[key] for key in missing}, JOB_CARD_CACHE_TIMEOUT)
+
+    if request is None or not request.user.is_authenticated:
+        return mark_safe(''.join(cards[key].replace(JOB_STATE_MARKER, '') for key in keys))
+    state_template = get_template(state_template_name)
+    return mark_safe(''.join(
+        cards[key].replace(JOB_STATE_MARKER, state_template.render({'job': job, 'request': request}))
+        for key, job in zip(keys, jobs)
+    ))
@@ -0,0 +1,46 @@
+from django.db import models
+
+
+class FTS5MatchField(models.TextField):
+    """
+    The hidden column of an FTS5 table that carries the table's own name.
+    ``field__match=query`` renders ``table.table MATCH query``.
+    """
+
+
+@FTS5MatchField.register_lookup
+class FTS5Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class TSVectorField(models.TextField):
+    """A PostgreSQL tsvector column; ``field__tsmatch=query`` uses websearch_to_tsquery."""
+
+    def __init__(self, *args, search_config='english', **kwargs):
+        self.search_config = search_config
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.search_config != 'english':
+            kwargs['search_config'] = self.search_config
+        return name, path, args, kwargs
+
+    def db_type(self, connection):
+        return 'tsvector'
+
+
+@TSVectorField.register_lookup
+class TSMatch(models.Lookup):
+    lookup_name = 'tsmatch'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        config = self.lhs.output_field.search_config
+        return f"{lhs} @@ websearch_to_tsquery('{config}', {rhs})", lhs_params + rhs_params
@@ -2,12 +2,24 @@ from django import forms
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 
-from jobapp.models import Job, Applicant, BookmarkJob, Category, JobType, ExperienceLevel, WorkArrangement
+from jobapp.models import Job, Applicant, BookmarkJob, Category, JobType, ExperienceLevel, WorkArrangement, SavedSearch
+from jobapp.salary import set_salary_range
 from ckeditor.widgets import CKEditorWidget
 
 User = get_user_model()
 
-class JobForm(forms.ModelForm):
+
+class SalaryRangeMixin:
+    """Keeps the numeric salary columns in step with the free-text salary."""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        self.instance.salary = cleaned_data.get('salary', '')
+        set_salary_range(self.instance)
+        return cleaned_data
+
+
+class JobForm(SalaryRangeMixin, forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['title'].label = "Job Title:"
@@ -81,7 +93,7 @@ class JobBookmarkForm(forms.ModelForm):
         fields = ['job']
 
 
-class JobEditForm(forms.ModelForm):
+class JobEditForm(SalaryRangeMixin, forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.fields['title'].label = "Job Title:"
@@ -139,9 +151,34 @@ class JobEditForm(forms.ModelForm):
             'last_date': forms.DateInput(attrs={'type': 'date'}),
         }
 
+class SavedSearchForm(forms.ModelForm):
+    class Meta:
+        model = SavedSearch
+        fields = ['job_title_or_company_name', 'location', 'job_type', 'experience_level', 'work_arrangement']
+
+
 class ContactForm(forms.Form):
     first_name = forms.CharField(max_length=100, required=True)
     last_name = forms.CharField(max_length=100, required=True)
     email = forms.EmailField(required=True)
     subject = forms.CharField(max_length=200, required=True)
     message = forms.CharField(widget=forms.Textarea, required=True)
+
+
+class CandidateSearchForm(forms.Form):
+    skills = forms.CharField(max_length=500, required=False, label='Skills (Comma Separated)')
+    location = forms.CharField(max_length=100, required=False)
+    job_title = forms.CharField(max_length=100, required=False, label='Preferred Job Title')
+    min_years = forms.IntegerField(min_value=0, required=False, label='Min. Years of Experience')
+    max_years = forms.IntegerField(min_value=0, required=False, label='Max. Years of Experience')
+    sort_by = forms.ChoiceField(
+        choices=[('newest', 'Newest first'), ('most_experienced', 'Most experienced')], required=False,
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs.update({'class': 'form-control'})
+        self.fields['skills'].widget.attrs.update({'placeholder': 'e.g., Python, Django'})
+        self.fields['location'].widget.attrs.update({'placeholder': 'e.g., Nairobi'})
+        self.fields['job_title'].widget.attrs.update({'placeholder': 'e.g., Software Engineer'})
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobapp.caching import job_cache
+from jobapp.models import Job
+from jobapp.salary import set_salary_range
+
+
+class Command(BaseCommand):
+    help = 'Parse the free-text salary of existing jobs into the numeric salary columns.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-parse every job, not only those without a parsed salary.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Job.objects.exclude(salary='').only('id', 'salary').order_by('id')
+        if not options['all']:
+            queryset = queryset.filter(salary_min__isnull=True, salary_currency='', salary_period='')
+
+        last_id, parsed, seen = 0, 0, 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            for job in batch:
+                set_salary_range(job)
+            with transaction.atomic():
+                Job.objects.bulk_update(
+                    batch, ['salary_min', 'salary_max', 'salary_currency', 'salary_period'],
+                )
+            last_id = batch[-1].id
+            seen += len(batch)
+            parsed += sum(1 for job in batch if job.salary_min is not None)
+            self.stdout.write(f'{seen} jobs processed')
+
+        # bulk writes send no signals
+        job_cache.bump('jobs')
+        self.stdout.write(self.style.SUCCESS(f'Parsed {parsed} of {seen} salaries.'))
@@ -0,0 +1,46 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobapp.thumbnails import generate_logo_thumbnails
+
+
+def _init_worker():
+    django.setup()
+    # Never share the parent's database connections across processes
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Generate the missing thumbnails of company logos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Process every logo, not only those without thumbnails (e.g. after changing the sizes).',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Number of worker processes resizing logos in parallel (0 = one per CPU).',
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.exclude(company_logo='').exclude(company_logo__isnull=True)
+        if not options['all']:
+            users = users.filter(company_logo_digest='')
+        user_ids = list(users.order_by('id').values_list('id', flat=True))
+
+        if options['workers'] == 1:
+            digests = list(map(generate_logo_thumbnails, user_ids))
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'] or None, initializer=_init_worker) as pool:
+                digests = list(pool.map(generate_logo_thumbnails, user_ids, chunksize=16))
+
+        done = sum(1 for digest in digests if digest)
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated thumbnails for {done} of {len(user_ids)} logos.'
+        ))
@@ -0,0 +1,79 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobapp.benchmarks import latency, rolled_back, time_calls, view_client
+from jobapp.caching import job_cache
+from jobapp.models import Category, Job, SiteStats
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the home page and the COUNT queries it ran before SiteStats, on synthetic users '
+        'and jobs. Everything is created in a transaction that is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--jobs', type=int, default=500000)
+        parser.add_argument('--requests', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.benchmark(random.Random(options['seed']), options)
+
+    def benchmark(self, rng, options):
+        start = time.perf_counter()
+        User = get_user_model()
+        User.objects.bulk_create([
+            User(email=f'home-benchmark-{i}@example.invalid', role=rng.choice(('employee', 'employer')))
+            for i in range(options['users'])
+        ], batch_size=5000)
+        employer = User.objects.create(email='home-benchmark-employer@example.invalid', role='employer')
+        category = Category.objects.create(name='Home benchmark')
+        for offset in range(0, options['jobs'], 10000):
+            Job.objects.bulk_create([
+                Job(
+                    user=employer, category=category, title=f'Job {i}', description='Description',
+                    location='Nairobi', job_type='FT', company_name='Acme', is_published=True, is_closed=i % 5 == 0,
+                )
+                for i in range(offset, min(offset + 10000, options['jobs']))
+            ])
+        # bulk_create skips the signals that keep the counters current
+        SiteStats.recount()
+        self.stdout.write(f'Setup: {time.perf_counter() - start:.0f} s')
+
+        # What home_view counted on every request before SiteStats, the
+        # paginator's count of open jobs included
+        published_jobs = Job.objects.filter(is_published=True)
+        counts = time_calls(lambda: (
+            User.objects.filter(role='employee').count(),
+            User.objects.filter(role='employer').count(),
+            published_jobs.filter(is_closed=False).count(),
+            published_jobs.filter(is_closed=False).count(),
+            published_jobs.filter(is_closed=True).count(),
+        ), options['requests'])
+
+        with view_client() as client:
+            def get_home():
+                # Render the job page too instead of reading it from job_cache
+                job_cache.bump('jobs')
+                client.get(reverse('jobapp:home'))
+
+            get_home()
+            with CaptureQueriesContext(connection) as captured:
+                get_home()
+            queries = len(captured)
+            times = time_calls(get_home, options['requests'])
+
+        self.stdout.write(f'COUNT queries replaced by SiteStats: {latency(counts)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Home page, {options["users"]} users x {options["jobs"]} jobs: {queries} queries, '
+            f'{latency(times)} (rolled back).'
+        ))
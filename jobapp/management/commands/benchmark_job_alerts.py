@@ -0,0 +1,126 @@
+import random
+import time
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from jobapp.alerts import alert_job, digest_job, match_jobs, search_anchor, send_digests
+from jobapp.models import OPEN_JOBS, Category, ExperienceLevel, Job, JobType, SavedSearch, WorkArrangement
+from jobapp.search import get_search_backend, search_jobs
+
+CITIES = [f'city{i}' for i in range(60)]
+# Saved searches per synthetic user
+SEARCHES_PER_USER = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Time send_job_alerts\' matching and digests, and re-running every saved query instead, '
+        'on synthetic saved searches and jobs. Everything is created in a transaction that is '
+        'rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--searches', type=int, default=1000000)
+        parser.add_argument('--jobs', type=int, default=200, help='Number of newly published jobs.')
+        parser.add_argument('--batch-size', type=int, default=200, help='Number of jobs matched at a time.')
+        parser.add_argument('--sample', type=int, default=300, help='Saved queries re-run for the comparison.')
+        parser.add_argument(
+            '--email-backend', default='account.email_backends.OutboxEmailBackend',
+            help='Backend the digests are sent through; the outbox only stores rows, which are rolled back.',
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        with override_settings(EMAIL_BACKEND=options['email_backend']), transaction.atomic():
+            try:
+                self.benchmark(random.Random(options['seed']), options)
+            finally:
+                transaction.set_rollback(True)
+
+    def benchmark(self, rng, options):
+        titles = [f'role{i}' for i in range(3000)]
+        title_weights = [1 / (i + 1) ** 0.9 for i in range(len(titles))]
+        words = titles + [f'word{i}' for i in range(20000)]
+        word_weights = title_weights + [1 / (i + 1) for i in range(len(words) - len(titles))]
+        job_types = [choice for choice, _ in JobType.choices]
+        levels = [choice for choice, _ in ExperienceLevel.choices]
+        arrangements = [choice for choice, _ in WorkArrangement.choices]
+
+        start = time.perf_counter()
+        User = get_user_model()
+        User.objects.bulk_create([
+            User(email=f'alerts-benchmark-{i}@example.invalid', role='employee')
+            for i in range(max(1, options['searches'] // SEARCHES_PER_USER))
+        ], batch_size=5000)
+        user_ids = list(User.objects.filter(email__startswith='alerts-benchmark-').values_list('id', flat=True))
+        sampled = set(rng.sample(range(options['searches']), min(options['sample'], options['searches'])))
+        sample, searches = [], []
+        for i in range(options['searches']):
+            search = SavedSearch(
+                user_id=user_ids[i % len(user_ids)],
+                job_title_or_company_name=' '.join(rng.choices(titles, title_weights, k=rng.choice((0, 1, 1, 2, 2, 3)))),
+                location=rng.choice(CITIES) if rng.random() < 0.5 else '',
+                job_type=rng.choice(job_types) if rng.random() < 0.3 else '',
+                experience_level=rng.choice(levels) if rng.random() < 0.2 else '',
+                work_arrangement=rng.choice(arrangements) if rng.random() < 0.2 else '',
+            )
+            # bulk_create skips the pre_save signal that sets it
+            search.anchor = search_anchor(search)
+            searches.append(search)
+            if i in sampled:
+                sample.append(search)
+            if len(searches) == 10000:
+                SavedSearch.objects.bulk_create(searches)
+                searches = []
+        SavedSearch.objects.bulk_create(searches)
+
+        employer = User.objects.create(email='alerts-benchmark-employer@example.invalid', role='employer')
+        category = Category.objects.create(name='Alerts benchmark')
+        published_at = timezone.now()
+        Job.objects.bulk_create([
+            Job(
+                user=employer, category=category, company_name='Acme', is_published=True, published_at=published_at,
+                title=' '.join(rng.choices(titles, title_weights, k=3)),
+                description=' '.join(rng.choices(words, word_weights, k=150)),
+                location=rng.choice(CITIES), job_type=rng.choice(job_types),
+                experience_level=rng.choice(levels), work_arrangement=rng.choice(arrangements),
+            )
+            for _ in range(options['jobs'])
+        ])
+        new_jobs = Job.objects.filter(OPEN_JOBS, published_at__gte=published_at)
+        self.stdout.write(f'Setup: {time.perf_counter() - start:.0f} s')
+
+        # What send_job_alerts does after reading the runs
+        start = time.perf_counter()
+        matched, jobs, pairs = defaultdict(set), {}, 0
+        batch_jobs = list(new_jobs.prefetch_related('tags').order_by('id'))
+        for offset in range(0, len(batch_jobs), options['batch_size']):
+            batch = batch_jobs[offset:offset + options['batch_size']]
+            for user_id, job_id in match_jobs([alert_job(job) for job in batch]):
+                matched[user_id].add(job_id)
+                pairs += 1
+            jobs.update((job.id, digest_job(job)) for job in batch)
+        matching = time.perf_counter() - start
+        start = time.perf_counter()
+        emails = send_digests(matched, jobs)
+        digests = time.perf_counter() - start
+
+        # The alternative: every saved query run again over the new jobs
+        get_search_backend().index_jobs(batch_jobs)
+        start = time.perf_counter()
+        for search in sample:
+            list(search_jobs(new_jobs, vars(search)).values_list('id', flat=True))
+        per_search = (time.perf_counter() - start) / max(1, len(sample))
+
+        self.stdout.write(f'Matching {len(jobs)} jobs x {options["searches"]} saved searches: {matching:.1f} s, {pairs} matches')
+        self.stdout.write(f'Digests: {digests:.1f} s, {emails} emails')
+        self.stdout.write(
+            f'Re-running saved queries: {per_search * 1000:.2f} ms/search, '
+            f'{per_search * options["searches"]:.0f} s for {options["searches"]}'
+        )
+        self.stdout.write(self.style.SUCCESS(f'send_job_alerts work: {matching + digests:.1f} s (rolled back).'))
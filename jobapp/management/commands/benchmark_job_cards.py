@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.test import RequestFactory
+
+from jobapp.benchmarks import percentile, rolled_back, time_calls
+from jobapp.caching import JOB_CACHE_ALIAS
+from jobapp.cards import card_key, render_cards
+from jobapp.models import Category, Job
+
+TEMPLATE_NAME = 'jobapp/cards/job_block.html'
+STATE_TEMPLATE_NAME = 'jobapp/cards/job_state_item.html'
+
+
+class Command(BaseCommand):
+    help = (
+        'Time rendering a page of job cards for an anonymous visitor: one template render per '
+        'card as the listing templates did, and render_cards() with the cards missing from and '
+        'in the cache. The jobs are created in a transaction that is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=12)
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.benchmark(options)
+
+    def benchmark(self, options):
+        employer = get_user_model().objects.create(email='cards-benchmark-employer@example.invalid', role='employer')
+        category = Category.objects.create(name='Cards benchmark')
+        Job.objects.bulk_create([
+            Job(
+                user=employer, category=category, title=f'Job {i}', location='Nairobi', job_type='1',
+                description='<p>%s</p>' % ' '.join(['Description'] * 60), company_name='Acme', is_published=True,
+            )
+            for i in range(options['cards'])
+        ])
+        jobs = list(Job.objects.filter(user=employer).order_by('id'))
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        cache = caches[JOB_CACHE_ALIAS]
+        keys = [card_key(TEMPLATE_NAME, job, 150) for job in jobs]
+
+        def template_loop():
+            # The listing templates' {% for %} loop, badges included
+            template, state_template = get_template(TEMPLATE_NAME), get_template(STATE_TEMPLATE_NAME)
+            return ''.join(
+                template.render({
+                    'job': job, 'truncate': 150,
+                    'job_state': state_template.render({'job': job, 'request': request}),
+                })
+                for job in jobs
+            )
+
+        def cards():
+            return render_cards(jobs, TEMPLATE_NAME, STATE_TEMPLATE_NAME, request)
+
+        def cold_cards():
+            cache.delete_many(keys)
+            return cards()
+
+        try:
+            for name, func in (('template loop', template_loop), ('cards, cold', cold_cards), ('cards, cached', cards)):
+                func()
+                times = time_calls(func, options['repeat'])
+                self.stdout.write(f'{name}: {percentile(times, 50) * 1000:.2f} ms/page')
+        finally:
+            cache.delete_many(keys)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(jobs)} cards, {options["repeat"]} pages each (rolled back).'
+        ))
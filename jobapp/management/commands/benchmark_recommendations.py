@@ -0,0 +1,75 @@
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from jobapp.recommendations import Documents, Vectorizer, experience_level, job_features, profile_features, score_users
+
+CITIES = [f'city{i}' for i in range(60)]
+LEVELS = ['EN', 'JR', 'MD', 'SR', 'DR', 'EX']
+
+
+class Command(BaseCommand):
+    help = (
+        'Time rebuild_recommendations\' vectorising and scoring on synthetic jobs and profiles '
+        '(Zipf-distributed skills and words). Nothing is written to the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=50000)
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of users scored per matrix product.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        skills = [f'skill{i}' for i in range(2000)]
+        skill_weights = [1 / (i + 1) ** 0.8 for i in range(len(skills))]
+        words = [f'word{i}' for i in range(20000)]
+        word_weights = [1 / (i + 1) for i in range(len(words))]
+
+        jobs = Documents(
+            ids=np.arange(1, options['jobs'] + 1, dtype=np.int64),
+            features=[
+                job_features(
+                    ' '.join(rng.choices(skills, skill_weights, k=3)),
+                    rng.choices(skills, skill_weights, k=4),
+                    ' '.join(rng.choices(words, word_weights, k=80)),
+                )
+                for _ in range(options['jobs'])
+            ],
+            cities=[rng.choice(CITIES) for _ in range(options['jobs'])],
+            levels=[rng.choice(LEVELS) for _ in range(options['jobs'])],
+        )
+        # Negative ids match no real user, so the applications lookup finds nothing
+        users = Documents(
+            ids=-np.arange(1, options['users'] + 1, dtype=np.int64),
+            features=[
+                profile_features(
+                    ', '.join(rng.choices(skills, skill_weights, k=5)), ' '.join(rng.choices(skills, skill_weights, k=2)),
+                )
+                for _ in range(options['users'])
+            ],
+            cities=[rng.choice(CITIES) for _ in range(options['users'])],
+            levels=[experience_level(rng.randint(0, 20)) for _ in range(options['users'])],
+        )
+
+        start = time.perf_counter()
+        vectorizer = Vectorizer(jobs.features)
+        vectorizer.transform(jobs.features)
+        vectorising = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = sum(
+            len(candidates)
+            for lists in score_users(users, jobs, vectorizer, batch_size=options['batch_size'])
+            for candidates in lists.values()
+        )
+        scoring = time.perf_counter() - start
+
+        self.stdout.write(f'Vectorising {len(jobs.ids)} jobs: {vectorising:.1f} s ({len(vectorizer.vocabulary)} terms)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Scoring {len(users.ids)} users x {len(jobs.ids)} jobs: {scoring:.1f} s, '
+            f'{scoring / len(users.ids) * 1e6:.0f} us/user, {rows} recommendations.'
+        ))
@@ -0,0 +1,84 @@
+import random
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from jobapp.benchmarks import latency, rolled_back, time_calls, view_client
+from jobapp.caching import job_cache
+from jobapp.models import Category, Job
+from jobapp.search import IcontainsSearchBackend, get_search_backend
+
+CITIES = ['Nairobi'] + [f'city{i}' for i in range(59)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Time title and title + location searches through search_result_view with the '
+        'configured search backend and with icontains, on synthetic jobs. Everything is '
+        'created in a transaction that is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=500000)
+        parser.add_argument('--queries', type=int, default=40, help='Half of them also filter by location.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.benchmark(random.Random(options['seed']), options)
+
+    def benchmark(self, rng, options):
+        words = [f'word{i}' for i in range(20000)]
+        word_weights = [1 / (i + 1) for i in range(len(words))]
+
+        start = time.perf_counter()
+        employer = get_user_model().objects.create(email='search-benchmark-employer@example.invalid', role='employer')
+        category = Category.objects.create(name='Search benchmark')
+        for offset in range(0, options['jobs'], 10000):
+            Job.objects.bulk_create([
+                Job(
+                    user=employer, category=category, title=f'Job {i}', location=rng.choice(CITIES),
+                    description='<p>%s</p>' % ' '.join(rng.choices(words, word_weights, k=80)),
+                    job_type='FT', company_name='Acme', is_published=True,
+                )
+                for i in range(offset, min(offset + 10000, options['jobs']))
+            ])
+        # bulk_create skips the signals that index each job
+        call_command('rebuild_search_index', chunk_size=5000, stdout=StringIO())
+        self.stdout.write(f'Setup: {time.perf_counter() - start:.0f} s')
+
+        queries = [
+            {'job_title_or_company_name': f'job {rng.randrange(options["jobs"])}'}
+            for _ in range(options['queries'] - options['queries'] // 2)
+        ]
+        queries += [
+            {'job_title_or_company_name': f'Job {rng.randrange(options["jobs"])}', 'location': 'nairobi'}
+            for _ in range(options['queries'] // 2)
+        ]
+
+        backends = [get_search_backend()]
+        if not isinstance(backends[0], IcontainsSearchBackend):
+            backends.append(IcontainsSearchBackend())
+        with view_client() as client:
+            url = reverse('jobapp:search_result')
+            for backend in backends:
+                pending = iter(queries)
+
+                def search():
+                    # Count and page queries run every time instead of coming from job_cache
+                    job_cache.bump('jobs')
+                    client.get(url, next(pending))
+
+                with mock.patch('jobapp.search._backend', backend):
+                    client.get(url, queries[0])
+                    times = time_calls(search, len(queries))
+                self.stdout.write(f'{backend.__class__.__name__}: {latency(times)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(queries)} searches over {options["jobs"]} jobs (rolled back).'
+        ))
@@ -0,0 +1,68 @@
+import os
+import re
+
+from django.contrib.staticfiles import finders
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.templatetags.static import static
+from django.test import RequestFactory
+
+from jobapp.middleware import StaticFilesMiddleware
+
+STATIC_TAG = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]\s*%}""")
+
+
+def static_names(template_names):
+    """The assets named by {% static %} in the templates, in order."""
+    names = []
+    for template_name in template_names:
+        with open(get_template(template_name).origin.name, encoding='utf-8') as template:
+            names += [name for name in STATIC_TAG.findall(template.read()) if name not in names]
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        'Report the bytes a page load transfers for the static assets of the given templates: '
+        'the source files as served before, and the collected files as StaticFilesMiddleware '
+        'serves them to a browser accepting gzip and brotli. Run collectstatic with DEBUG off first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('templates', nargs='*', default=['head.html', 'scripts.html'])
+
+    def handle(self, *args, **options):
+        try:
+            middleware = StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+        except MiddlewareNotUsed as e:
+            raise CommandError(e)
+
+        names = static_names(options['templates'])
+        before = after = immutable = 0
+        factory = RequestFactory()
+        for name in names:
+            source = finders.find(name)
+            if source is None:
+                raise CommandError(f'{name} is not a static file.')
+            before += os.path.getsize(source)
+
+            response = middleware(factory.get(static(name), HTTP_ACCEPT_ENCODING='gzip, deflate, br'))
+            if response.status_code != 200:
+                raise CommandError(f'{name} is not collected in STATIC_ROOT.')
+            after += sum(len(chunk) for chunk in response.streaming_content)
+            response.close()
+            immutable += 'immutable' in response['Cache-Control']
+
+        self.stdout.write(
+            f'before: {before / 1024:.0f} KiB per page load, and {len(names)} revalidation requests '
+            f'on every later page'
+        )
+        self.stdout.write(
+            f'after: {after / 1024:.0f} KiB on the first load, and {len(names) - immutable} requests '
+            f'on later pages ({immutable} immutable)'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(names)} assets referenced by {", ".join(options["templates"])}.'
+        ))
@@ -0,0 +1,81 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from jobapp.benchmarks import view_client
+from jobapp.models import Job
+from jobapp.warmup import warm_up
+
+
+def default_paths():
+    paths = [reverse('jobapp:home'), reverse('jobapp:job-list')]
+    newest = Job.objects.filter(is_published=True).order_by('-id').values_list('id', flat=True).first()
+    if newest is not None:
+        paths.append(reverse('jobapp:single-job', args=[newest]))
+    return paths + [reverse('account:login')]
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the first and second request of a fresh process for each page, without and '
+        'with warm_up() before the first one, with the cached template loader on. Every '
+        'measurement runs in its own "manage.py benchmark_warmup --first-request" process.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Defaults to /, /jobs/, the newest job and login.')
+        parser.add_argument('--runs', type=int, default=3, help='Fresh processes per page and mode.')
+        parser.add_argument('--first-request', metavar='PATH', help='Measure PATH in this process and print JSON.')
+        parser.add_argument('--warm', action='store_true', help='With --first-request, call warm_up() first.')
+
+    def handle(self, *args, **options):
+        if options['first_request']:
+            self.stdout.write(json.dumps(self.first_requests(options['first_request'], options['warm'])))
+            return
+
+        env = dict(
+            os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE),
+            PYTHONPATH=os.pathsep.join(filter(None, [settings.BASE_DIR, os.environ.get('PYTHONPATH')])),
+            TEMPLATE_CACHE='1',
+        )
+        paths = options['paths'] or default_paths()
+        for path in paths:
+            results = {}
+            for mode in ('cold', 'warm'):
+                command = [sys.executable, '-m', 'django', 'benchmark_warmup', '--first-request', path]
+                if mode == 'warm':
+                    command.append('--warm')
+                runs = [
+                    json.loads(subprocess.run(command, env=env, check=True, stdout=subprocess.PIPE).stdout)
+                    for _ in range(options['runs'])
+                ]
+                results[mode] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            self.stdout.write(
+                f'{path}: cold first {results["cold"]["first"] * 1000:.1f} ms, '
+                f'warm first {results["warm"]["first"] * 1000:.1f} ms '
+                f'(warm-up {results["warm"]["warm_up"] * 1000:.0f} ms), '
+                f'second {results["cold"]["second"] * 1000:.1f} ms'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(paths)} pages, median of {options["runs"]} processes each.'
+        ))
+
+    def first_requests(self, path, warm):
+        timings = {'warm_up': 0}
+        if warm:
+            start = time.perf_counter()
+            warm_up()
+            timings['warm_up'] = time.perf_counter() - start
+        with view_client() as client:
+            for request in ('first', 'second'):
+                start = time.perf_counter()
+                client.get(path)
+                timings[request] = time.perf_counter() - start
+        return timings
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobapp.models import JobRecommendation, RecommendationRun
+from jobapp.recommendations import Vectorizer, active_profiles, merge_lists, open_jobs, score_users, store_lists
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the "jobs for you" of every active employee. With --incremental, only '
+        'score the jobs published or edited since the last run and merge them in.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true')
+        parser.add_argument(
+            '--batch-size', type=int, default=500, help='Number of users scored per matrix product.',
+        )
+
+    def handle(self, *args, **options):
+        last_run = RecommendationRun.objects.filter(finished_at__isnull=False).order_by('-started_at').first()
+        incremental = options['incremental'] and last_run is not None
+        run = RecommendationRun.objects.create(incremental=incremental)
+
+        jobs = open_jobs()
+        vectorizer = Vectorizer(jobs.features)
+        if incremental:
+            jobs = open_jobs(since=last_run.started_at)
+        users = active_profiles()
+
+        changed_ids = jobs.ids.tolist()
+        # Users whose stored lists hold a changed job, which may have to leave them
+        stale_users = set()
+        if incremental:
+            stale_users = set(
+                JobRecommendation.objects.filter(job_id__in=changed_ids).values_list('user_id', flat=True)
+            )
+        stored = 0
+        if changed_ids or not incremental:
+            for lists in score_users(users, jobs, vectorizer, batch_size=options['batch_size']):
+                if incremental:
+                    lists = {
+                        user_id: candidates for user_id, candidates in lists.items()
+                        if candidates or user_id in stale_users
+                    }
+                    lists = merge_lists(lists, changed_ids)
+                stored += store_lists(lists)
+
+        if not incremental:
+            # Employees who are no longer active, or whose profile is now empty
+            JobRecommendation.objects.filter(created_at__lt=run.started_at).delete()
+        run.finished_at = timezone.now()
+        run.users, run.jobs, run.recommendations = len(users.ids), len(jobs.ids), stored
+        run.save()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{"Incremental" if incremental else "Full"} run: stored {stored} recommendations '
+            f'for {len(users.ids)} active employees from {len(jobs.ids)} jobs.'
+        ))
@@ -0,0 +1,70 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from jobapp.models import Job, RelatedJob
+from jobapp.related import compute_related_rows
+
+
+def _init_worker():
+    django.setup()
+    # Never share the parent's database connections across processes
+    connections.close_all()
+
+
+def _compute_chunk(job_ids):
+    return compute_related_rows(job_ids)
+
+
+class Command(BaseCommand):
+    help = 'Recompute the RelatedJob table for every open job.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of worker processes scoring chunks in parallel (0 = one per CPU).',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        job_ids = list(
+            Job.objects.filter(is_published=True, is_closed=False).order_by('id').values_list('id', flat=True)
+        )
+        chunks = [job_ids[i:i + chunk_size] for i in range(0, len(job_ids), chunk_size)]
+
+        if not chunks:
+            RelatedJob.objects.all().delete()
+        elif options['workers'] == 1:
+            results = map(_compute_chunk, chunks)
+            self._store(chunks, results)
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'] or None, initializer=_init_worker) as pool:
+                self._store(chunks, pool.map(_compute_chunk, chunks))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {RelatedJob.objects.count()} related jobs for {len(job_ids)} open jobs.'
+        ))
+
+    def _store(self, chunks, results):
+        done = 0
+        for index, rows in enumerate(results):
+            # Each chunk replaces the rows of the job ids from its first id up
+            # to the next chunk's, so the table is never empty mid-rebuild and
+            # rows of jobs closed since are dropped with their range
+            stale = RelatedJob.objects.all()
+            if index:
+                stale = stale.filter(job_id__gte=chunks[index][0])
+            if index + 1 < len(chunks):
+                stale = stale.filter(job_id__lt=chunks[index + 1][0])
+            with transaction.atomic():
+                stale.delete()
+                RelatedJob.objects.bulk_create(
+                    [RelatedJob(job_id=job_id, related_id=related_id, score=score) for job_id, related_id, score in rows],
+                    batch_size=1000,
+                )
+            done += 1
+            self.stdout.write(f'{done} chunks stored')
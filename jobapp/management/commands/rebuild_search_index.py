@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobapp.caching import job_cache
+from jobapp.models import Job
+from jobapp.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the job full-text search index, streaming jobs in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        chunk_size = options['chunk_size']
+        self.stdout.write(f'Using {backend.__class__.__name__}')
+        backend.clear()
+
+        last_id, indexed = 0, 0
+        while True:
+            chunk = list(
+                Job.objects.filter(id__gt=last_id).order_by('id')
+                .only('id', 'title', 'company_name', 'location', 'description')
+                .prefetch_related('tags')[:chunk_size]
+            )
+            if not chunk:
+                break
+            with transaction.atomic():
+                backend.index_jobs(chunk)
+            last_id = chunk[-1].id
+            indexed += len(chunk)
+            self.stdout.write(f'{indexed} jobs indexed')
+
+        # bulk writes send no signals
+        job_cache.bump('jobs', 'tags')
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} jobs.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobapp.models import SiteStats
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized home page counters from the user and job tables.'
+
+    def handle(self, *args, **options):
+        stats = SiteStats.recount()
+        self.stdout.write(self.style.SUCCESS(
+            f'candidates={stats.total_candidates} companies={stats.total_companies} '
+            f'open jobs={stats.total_jobs} completed jobs={stats.total_completed_jobs}'
+        ))
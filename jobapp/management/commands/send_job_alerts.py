@@ -0,0 +1,48 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobapp.alerts import alert_job, digest_job, match_jobs, send_digests
+from jobapp.models import OPEN_JOBS, Job, JobAlertRun
+
+
+class Command(BaseCommand):
+    help = (
+        'Match the jobs published since the last run against every saved search '
+        'and email each user one digest of their new jobs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Number of jobs matched at a time.')
+
+    def handle(self, *args, **options):
+        last_run = JobAlertRun.objects.filter(finished_at__isnull=False).order_by('-started_at').first()
+        run = JobAlertRun.objects.create()
+        # A first run only covers the last day
+        since = last_run.started_at if last_run else run.started_at - timedelta(days=1)
+        queryset = (
+            Job.objects.filter(OPEN_JOBS, published_at__gte=since, published_at__lt=run.started_at)
+            .prefetch_related('tags').order_by('id')
+        )
+
+        matched, jobs = defaultdict(set), {}
+        last_id, pairs = 0, 0
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            for user_id, job_id in match_jobs([alert_job(job) for job in batch]):
+                matched[user_id].add(job_id)
+                pairs += 1
+            jobs.update((job.id, digest_job(job)) for job in batch)
+            last_id = batch[-1].id
+
+        run.emails = send_digests(matched, jobs)
+        run.jobs, run.matches = len(jobs), pairs
+        run.finished_at = timezone.now()
+        run.save()
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(jobs)} new jobs matched {pairs} saved searches; sent {run.emails} digests.'
+        ))
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import mimetypes
+import os
+from collections import namedtuple
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.models import Max
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from jobapp.caching import job_cache
+from jobapp.models import Job
+
+# Views whose anonymous responses are cached, by namespaced URL name
+PAGE_CACHE_VIEWS = getattr(settings, 'PAGE_CACHE_VIEWS', (
+    'jobapp:home', 'jobapp:job-list', 'jobapp:single-job', 'jobapp:search_result',
+))
+# Bounds how stale data outside the job namespaces (e.g. SiteStats) can get
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60)
+PAGE_CACHE_NAMESPACES = ('jobs', 'categories', 'tags')
+
+
+def jobs_last_modified():
+    """Unix time of the newest job change, computed once per "jobs" generation."""
+    def newest():
+        updated_at = Job.objects.aggregate(newest=Max('updated_at'))['newest']
+        return None if updated_at is None else int(updated_at.timestamp())
+    return job_cache.get_or_set(('jobs',), ('jobs-last-modified',), newest)
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serve the listing and job pages to visitors without a session from
+    job_cache, keyed by path and normalised query string. Entries live in
+    the "jobs", "categories" and "tags" generations, so saving, publishing,
+    closing or deleting a job makes every page stale at once.
+
+    Each entry carries an ETag derived from its key, which changes with the
+    namespace generations, and a Last-Modified time from the newest
+    Job.updated_at, so both move only when the data does (deleting a job
+    changes the ETag alone). Conditional requests that match get a 304
+    without rendering anything.
+
+    Requests with a session or pending messages always reach the view, and
+    responses that use the CSRF token or set cookies are never stored.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_cacheable_request(request):
+            return self.get_response(request)
+
+        entry_key = job_cache.entry_key(PAGE_CACHE_NAMESPACES, self.page_key(request))
+        entry = job_cache.get(entry_key, PAGE_CACHE_NAMESPACES)
+        if entry is None:
+            response = self.get_response(request)
+            if not self.is_cacheable_response(request, response):
+                return response
+            entry = {
+                'content': response.content,
+                'headers': list(response.items()),
+                'etag': '"%s"' % hashlib.md5(entry_key.encode()).hexdigest(),
+                'last_modified': jobs_last_modified(),
+            }
+            job_cache.set(entry_key, entry, PAGE_CACHE_TIMEOUT)
+
+        response = HttpResponse(entry['content'])
+        for header, value in entry['headers']:
+            response[header] = value
+        response['ETag'] = entry['etag']
+        if entry['last_modified'] is not None:
+            response['Last-Modified'] = http_date(entry['last_modified'])
+        patch_cache_control(response, no_cache=True)
+        return get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'], response=response,
+        )
+
+    @staticmethod
+    def is_cacheable_request(request):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+        if settings.SESSION_COOKIE_NAME in request.COOKIES or CookieStorage.cookie_name in request.COOKIES:
+            return False
+        try:
+            return resolve(request.path_info).view_name in PAGE_CACHE_VIEWS
+        except Resolver404:
+            return False
+
+    @staticmethod
+    def is_cacheable_response(request, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+            and not response.has_header('ETag')
+        )
+
+    @staticmethod
+    def page_key(request):
+        # Blank parameters are what the search form submits for unused fields
+        query = tuple(
+            (name, value)
+            for name, values in sorted(request.GET.lists())
+            for value in values if value != ''
+        )
+        return ('page', request.path, query, request.headers.get('X-Requested-With', ''))
+
+
+# max-age of static files whose name carries no content hash
+STATIC_MAX_AGE = getattr(settings, 'STATIC_MAX_AGE', 60 * 60)
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Preferred first
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+StaticFile = namedtuple('StaticFile', 'path content_type last_modified immutable variants')
+
+
+def static_files_index(root):
+    """
+    {relative URL path: StaticFile} of every file under ``root``, with the
+    precompressed variants collectstatic wrote next to it.
+    """
+    manifest = os.path.join(root, ManifestStaticFilesStorage.manifest_name)
+    hashed = set()
+    if os.path.exists(manifest):
+        with open(manifest) as manifest_file:
+            hashed = set(json.load(manifest_file).get('paths', {}).values())
+
+    files = {}
+    for directory, _, names in os.walk(root):
+        names = set(names)
+        for name in names:
+            if any(name.endswith(extension) and name[:-len(extension)] in names for _, extension in STATIC_ENCODINGS):
+                continue
+            path = os.path.join(directory, name)
+            url_path = os.path.relpath(path, root).replace(os.sep, '/')
+            content_type, _ = mimetypes.guess_type(name)
+            files[url_path] = StaticFile(
+                path=path,
+                content_type=content_type or 'application/octet-stream',
+                last_modified=int(os.stat(path).st_mtime),
+                immutable=url_path in hashed,
+                variants=tuple(
+                    (encoding, path + extension) for encoding, extension in STATIC_ENCODINGS
+                    if name + extension in names
+                ),
+            )
+    return files
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        encoding, _, params = part.partition(';')
+        quality = params.replace(' ', '').lower()
+        if quality.startswith('q=') and not quality[2:].strip('0.'):
+            continue
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class StaticFilesMiddleware:
+    """
+    Serve STATIC_ROOT from the application itself when DEBUG is off, so
+    gunicorn needs no separate file server. Files are indexed once at
+    startup. The brotli or gzip variant is sent when the client accepts it,
+    and content-hashed names are cached by browsers for a year as
+    immutable.
+    """
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT or not os.path.isdir(settings.STATIC_ROOT):
+            raise MiddlewareNotUsed('Static files are served by django.conf.urls.static or not collected')
+        self.get_response = get_response
+        self.prefix = urlparse(settings.STATIC_URL).path
+        self.files = static_files_index(settings.STATIC_ROOT)
+
+    def __call__(self, request):
+        if request.method not in ('GET', 'HEAD') or not request.path_info.startswith(self.prefix):
+            return self.get_response(request)
+        static_file = self.files.get(request.path_info[len(self.prefix):])
+        if static_file is None:
+            return self.get_response(request)
+
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), static_file.last_modified):
+            response = HttpResponseNotModified()
+        else:
+            path, encoding = static_file.path, None
+            accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            for variant_encoding, variant_path in static_file.variants:
+                if variant_encoding in accepted:
+                    path, encoding = variant_path, variant_encoding
+                    break
+            response = FileResponse(
+                open(path, 'rb'), content_type=static_file.content_type,
+                filename=os.path.basename(static_file.path),
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+            response['Last-Modified'] = http_date(static_file.last_modified)
+
+        if static_file.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        if static_file.immutable:
+            patch_cache_control(response, public=True, max_age=STATIC_IMMUTABLE_MAX_AGE, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=STATIC_MAX_AGE)
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-17 21:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_site_stats(apps, schema_editor):
+    Job = apps.get_model('jobapp', 'Job')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    SiteStats = apps.get_model('jobapp', 'SiteStats')
+    published_jobs = Job.objects.filter(is_published=True)
+    SiteStats.objects.update_or_create(pk=1, defaults={
+        'total_candidates': User.objects.filter(role='employee').count(),
+        'total_companies': User.objects.filter(role='employer').count(),
+        'total_jobs': published_jobs.filter(is_closed=False).count(),
+        'total_completed_jobs': published_jobs.filter(is_closed=True).count(),
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobapp', '0003_auto_20251129_1950'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_candidates', models.PositiveIntegerField(default=0)),
+                ('total_companies', models.PositiveIntegerField(default=0)),
+                ('total_jobs', models.PositiveIntegerField(default=0)),
+                ('total_completed_jobs', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'site stats',
+            },
+        ),
+        migrations.RunPython(populate_site_stats, migrations.RunPython.noop),
+    ]
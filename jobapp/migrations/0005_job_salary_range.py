@@ -0,0 +1,41 @@
+# Generated by Django 3.2.16 on 2026-10-17 21:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobapp', '0004_sitestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='salary_currency',
+            field=models.CharField(blank=True, max_length=3),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_max',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_min',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_period',
+            field=models.CharField(blank=True, choices=[('HR', 'Per hour'), ('DY', 'Per day'), ('WK', 'Per week'), ('MO', 'Per month'), ('YR', 'Per year')], max_length=2),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True), ('salary_min__isnull', False)), fields=['salary_min', 'id'], name='job_open_salary_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True), ('salary_max__isnull', False)), fields=['salary_max', 'id'], name='job_open_salary_max_idx'),
+        ),
+    ]
@@ -0,0 +1,146 @@
+# Generated by Django 3.2.16 on 2026-10-17 21:50
+
+from django.db import migrations, models, OperationalError
+from django.utils.html import strip_tags
+import django.db.models.deletion
+import jobapp.fields
+
+
+SQLITE_CREATE = (
+    'CREATE VIRTUAL TABLE jobapp_job_fts USING fts5('
+    'title, company_name, location, description, tags, '
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+# Column weights (title, company_name, location, description, tags) used by
+# the hidden `rank` column that the search backend orders by.
+SQLITE_RANK = "INSERT INTO jobapp_job_fts (jobapp_job_fts, rank) VALUES ('rank', 'bm25(10.0, 6.0, 2.0, 1.0, 4.0)')"
+
+SQLITE_DOCUMENTS = '''
+SELECT job.id, job.title, job.company_name, job.location, job.description,
+       COALESCE((SELECT group_concat(tag.name, ' ')
+                 FROM taggit_taggeditem item
+                 JOIN taggit_tag tag ON tag.id = item.tag_id
+                 JOIN django_content_type ct ON ct.id = item.content_type_id
+                 WHERE ct.app_label = 'jobapp' AND ct.model = 'job' AND item.object_id = job.id), '')
+FROM jobapp_job job
+WHERE job.id > %s
+ORDER BY job.id
+LIMIT %s
+'''
+
+SQLITE_INSERT = (
+    'INSERT INTO jobapp_job_fts (rowid, title, company_name, location, description, tags) '
+    'VALUES (%s, %s, %s, %s, %s, %s)'
+)
+
+SQLITE_POPULATE_CHUNK_SIZE = 1000
+
+POSTGRES_CREATE = [
+    '''CREATE TABLE jobapp_job_search (
+        job_id bigint PRIMARY KEY REFERENCES jobapp_job (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL,
+        location_document tsvector NOT NULL
+    )''',
+    'CREATE INDEX jobapp_job_search_document_gin ON jobapp_job_search USING GIN (document)',
+    'CREATE INDEX jobapp_job_search_location_gin ON jobapp_job_search USING GIN (location_document)',
+]
+
+POSTGRES_POPULATE = '''
+INSERT INTO jobapp_job_search (job_id, document, location_document)
+SELECT job.id,
+       setweight(to_tsvector('english', job.title), 'A') ||
+       setweight(to_tsvector('english', COALESCE((
+           SELECT string_agg(tag.name, ' ')
+           FROM taggit_taggeditem item
+           JOIN taggit_tag tag ON tag.id = item.tag_id
+           JOIN django_content_type ct ON ct.id = item.content_type_id
+           WHERE ct.app_label = 'jobapp' AND ct.model = 'job' AND item.object_id = job.id), '')), 'A') ||
+       setweight(to_tsvector('english', job.company_name), 'B') ||
+       setweight(to_tsvector('english', regexp_replace(job.description, '<[^>]*>', ' ', 'g')), 'D'),
+       to_tsvector('simple', job.location)
+FROM jobapp_job job
+'''
+
+
+def populate_sqlite_index(connection):
+    # Descriptions are CKEditor HTML; index their text, as
+    # jobapp.search.job_document does for later writes
+    last_id = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(SQLITE_DOCUMENTS, [last_id, SQLITE_POPULATE_CHUNK_SIZE])
+            rows = [
+                (job_id, title, company_name, location, strip_tags(description or ''), tags)
+                for job_id, title, company_name, location, description, tags in cursor.fetchall()
+            ]
+            if not rows:
+                break
+            cursor.executemany(SQLITE_INSERT, rows)
+            last_id = rows[-1][0]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_CREATE)
+        except OperationalError:
+            # SQLite built without FTS5; search falls back to icontains
+            return
+        schema_editor.execute(SQLITE_RANK)
+        populate_sqlite_index(schema_editor.connection)
+    elif vendor == 'postgresql':
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+        schema_editor.execute(POSTGRES_POPULATE)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS jobapp_job_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS jobapp_job_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('taggit', '0003_taggeditem_add_unique_index'),
+        ('jobapp', '0005_job_salary_range'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFTSEntry',
+            fields=[
+                ('job', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='fts_entry', serialize=False, to='jobapp.job')),
+                ('jobapp_job_fts', jobapp.fields.FTS5MatchField()),
+                ('title', models.TextField()),
+                ('company_name', models.TextField()),
+                ('location', models.TextField()),
+                ('description', models.TextField()),
+                ('tags', models.TextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'jobapp_job_fts',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='JobSearchVector',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_vector', serialize=False, to='jobapp.job')),
+                ('document', jobapp.fields.TSVectorField()),
+                ('location_document', jobapp.fields.TSVectorField(search_config='simple')),
+            ],
+            options={
+                'db_table': 'jobapp_job_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-17 21:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobapp', '0006_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['user', 'job'], name='applicant_user_job_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookmarkjob',
+            index=models.Index(fields=['user', 'job'], name='bookmarkjob_user_job_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True)), fields=['created_at', 'id'], name='job_open_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True)), fields=['title', 'id'], name='job_open_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True)), fields=['job_type', 'created_at', 'id'], name='job_open_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True)), fields=['experience_level', 'created_at', 'id'], name='job_open_experience_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True)), fields=['work_arrangement', 'created_at', 'id'], name='job_open_arrangement_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True)), fields=['category', 'created_at', 'id'], name='job_open_category_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-17 21:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobapp', '0007_open_job_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_jobs', to='jobapp.job')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to', to='jobapp.job')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='relatedjob',
+            index=models.Index(fields=['job', '-score', '-related'], name='relatedjob_job_score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='relatedjob',
+            constraint=models.UniqueConstraint(fields=('job', 'related'), name='relatedjob_unique_pair'),
+        ),
+    ]
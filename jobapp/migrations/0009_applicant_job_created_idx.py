@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-17 22:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobapp', '0008_relatedjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['job', 'created_at', 'id'], name='applicant_job_created_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-17 22:01
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_links(apps, schema_editor):
+    # keep the earliest row of every (user, job) pair
+    for model_name in ('Applicant', 'BookmarkJob'):
+        model = apps.get_model('jobapp', model_name)
+        duplicates = (
+            model.objects.values('user_id', 'job_id')
+            .annotate(first_id=Min('id'), rows=Count('id'))
+            .filter(rows__gt=1)
+        )
+        for pair in list(duplicates):
+            model.objects.filter(user_id=pair['user_id'], job_id=pair['job_id']).exclude(id=pair['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobapp', '0009_applicant_job_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_links, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='applicant',
+            constraint=models.UniqueConstraint(fields=('user', 'job'), name='applicant_unique_user_job'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookmarkjob',
+            constraint=models.UniqueConstraint(fields=('user', 'job'), name='bookmarkjob_unique_user_job'),
+        ),
+        # the unique constraints' indexes cover (user, job) lookups
+        migrations.RemoveIndex(
+            model_name='applicant',
+            name='applicant_user_job_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='bookmarkjob',
+            name='bookmarkjob_user_job_idx',
+        ),
+    ]
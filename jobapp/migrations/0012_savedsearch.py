@@ -0,0 +1,65 @@
+# Generated by Django 3.2.16 on 2026-10-17 23:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def set_published_at(apps, schema_editor):
+    # Jobs published before this migration are not new to anyone's alerts
+    Job = apps.get_model('jobapp', 'Job')
+    Job.objects.filter(is_published=True).update(published_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobapp', '0011_jobrecommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobAlertRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('jobs', models.PositiveIntegerField(default=0)),
+                ('matches', models.PositiveIntegerField(default=0)),
+                ('emails', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_title_or_company_name', models.CharField(blank=True, max_length=255)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('job_type', models.CharField(blank=True, choices=[('FT', 'Full time'), ('PT', 'Part time'), ('IN', 'Internship')], max_length=2)),
+                ('experience_level', models.CharField(blank=True, choices=[('EN', 'Entry Level'), ('JR', 'Junior'), ('MD', 'Mid-Level'), ('SR', 'Senior'), ('DR', 'Director'), ('EX', 'Executive')], max_length=2)),
+                ('work_arrangement', models.CharField(blank=True, choices=[('ON', 'On-site'), ('RM', 'Remote'), ('HB', 'Hybrid')], max_length=2)),
+                ('anchor', models.CharField(editable=False, max_length=60)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='published_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(set_published_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_closed', False), ('is_published', True)), fields=['published_at', 'id'], name='job_open_published_idx'),
+        ),
+        migrations.AddField(
+            model_name='savedsearch',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(fields=['anchor', 'id'], name='savedsearch_anchor_idx'),
+        ),
+    ]
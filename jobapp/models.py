@@ -1,9 +1,13 @@
+from django.core.cache import cache
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from ckeditor.fields import RichTextField
+from jobapp.fields import FTS5MatchField, TSVectorField
 from taggit.managers import TaggableManager
 
 User = get_user_model()
@@ -27,6 +31,17 @@ class WorkArrangement(models.TextChoices):
     REMOTE = 'RM', _('Remote')
     HYBRID = 'HB', _('Hybrid')
 
+class SalaryPeriod(models.TextChoices):
+    HOUR = 'HR', _('Per hour')
+    DAY = 'DY', _('Per day')
+    WEEK = 'WK', _('Per week')
+    MONTH = 'MO', _('Per month')
+    YEAR = 'YR', _('Per year')
+
+
+# Condition shared by the partial indexes over publicly listed jobs
+OPEN_JOBS = Q(is_published=True, is_closed=False)
+
 
 class Category(models.Model):
     name = models.CharField(max_length=50)
@@ -47,6 +62,11 @@ class Job(models.Model):
     benefits = RichTextField(blank=True, null=True)
     category = models.ForeignKey(Category, related_name='jobs', on_delete=models.CASCADE)
     salary = models.CharField(max_length=30, blank=True)
+    # Parsed from `salary` by the job forms / backfill_job_salaries command
+    salary_min = models.PositiveIntegerField(blank=True, null=True)
+    salary_max = models.PositiveIntegerField(blank=True, null=True)
+    salary_currency = models.CharField(max_length=3, blank=True)
+    salary_period = models.CharField(choices=SalaryPeriod.choices, max_length=2, blank=True)
     company_name = models.CharField(max_length=300)
     company_description = RichTextField(blank=True, null=True)
     url = models.URLField(max_length=200, blank=True, null=True) # Made URL optional
@@ -55,16 +75,181 @@ class Job(models.Model):
     is_closed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set the first time the job is saved as published; job alerts are sent for newly published jobs
+    published_at = models.DateTimeField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Open-jobs listing (home page, job list, search) in created_at / title order
+            models.Index(fields=['created_at', 'id'], name='job_open_created_idx', condition=OPEN_JOBS),
+            models.Index(fields=['title', 'id'], name='job_open_title_idx', condition=OPEN_JOBS),
+            # Search facets, newest first within each value
+            models.Index(fields=['job_type', 'created_at', 'id'], name='job_open_type_idx', condition=OPEN_JOBS),
+            models.Index(
+                fields=['experience_level', 'created_at', 'id'], name='job_open_experience_idx', condition=OPEN_JOBS,
+            ),
+            models.Index(
+                fields=['work_arrangement', 'created_at', 'id'], name='job_open_arrangement_idx', condition=OPEN_JOBS,
+            ),
+            models.Index(fields=['category', 'created_at', 'id'], name='job_open_category_idx', condition=OPEN_JOBS),
+            # Jobs published since the last send_job_alerts run
+            models.Index(fields=['published_at', 'id'], name='job_open_published_idx', condition=OPEN_JOBS),
+            # Salary sorts and "salary >= X" filters over the open-jobs listing
+            models.Index(
+                fields=['salary_min', 'id'], name='job_open_salary_min_idx',
+                condition=OPEN_JOBS & Q(salary_min__isnull=False),
+            ),
+            models.Index(
+                fields=['salary_max', 'id'], name='job_open_salary_max_idx',
+                condition=OPEN_JOBS & Q(salary_max__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class RelatedJob(models.Model):
+    """
+    Precomputed "related jobs" of an open job: its top neighbours by number
+    of shared tags, maintained by jobapp.related.
+    """
+    job = models.ForeignKey(Job, related_name='related_jobs', on_delete=models.CASCADE)
+    related = models.ForeignKey(Job, related_name='related_to', on_delete=models.CASCADE)
+    score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', '-score', '-related'], name='relatedjob_job_score_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'related'], name='relatedjob_unique_pair'),
+        ]
+
+    def __str__(self):
+        return f'{self.job_id} -> {self.related_id} ({self.score})'
+
+
+class JobRecommendation(models.Model):
+    """
+    Precomputed "jobs for you" of an active employee: the open jobs most
+    similar to their profile, maintained by the rebuild_recommendations
+    command (see jobapp.recommendations).
+    """
+    user = models.ForeignKey(User, related_name='job_recommendations', on_delete=models.CASCADE)
+    job = models.ForeignKey(Job, related_name='recommendations', on_delete=models.CASCADE)
+    score = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-score', '-job'], name='jobrec_user_score_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'job'], name='jobrec_unique_pair'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.job_id} ({self.score})'
+
+
+class RecommendationRun(models.Model):
+    """One run of rebuild_recommendations; incremental runs pick up the jobs changed since the last one."""
+    incremental = models.BooleanField(default=False)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    users = models.PositiveIntegerField(default=0)
+    jobs = models.PositiveIntegerField(default=0)
+    recommendations = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{"Incremental" if self.incremental else "Full"} run of {self.started_at}'
+
+
+class SavedSearch(models.Model):
+    """
+    The search_result_view filters of an employee, matched against newly
+    published jobs by the send_job_alerts command (see jobapp.alerts).
+    """
+    user = models.ForeignKey(User, related_name='saved_searches', on_delete=models.CASCADE)
+    job_title_or_company_name = models.CharField(max_length=255, blank=True)
+    location = models.CharField(max_length=100, blank=True)
+    job_type = models.CharField(choices=JobType.choices, max_length=2, blank=True)
+    experience_level = models.CharField(choices=ExperienceLevel.choices, max_length=2, blank=True)
+    work_arrangement = models.CharField(choices=WorkArrangement.choices, max_length=2, blank=True)
+    # Most selective condition, under which the alert matcher looks the search up
+    anchor = models.CharField(max_length=60, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['anchor', 'id'], name='savedsearch_anchor_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.anchor}'
+
+
+class JobAlertRun(models.Model):
+    """One run of send_job_alerts; each run alerts on the jobs published since the previous one started."""
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    jobs = models.PositiveIntegerField(default=0)
+    matches = models.PositiveIntegerField(default=0)
+    emails = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'Job alerts of {self.started_at}'
+
+
+class JobFTSEntry(models.Model):
+    """
+    Row of the SQLite FTS5 search index (see jobapp.search). The table is a
+    virtual table created by migration 0006, so Django does not manage it.
+    """
+    job = models.OneToOneField(
+        Job, primary_key=True, db_column='rowid', on_delete=models.DO_NOTHING, related_name='fts_entry',
+    )
+    jobapp_job_fts = FTS5MatchField()
+    title = models.TextField()
+    company_name = models.TextField()
+    location = models.TextField()
+    description = models.TextField()
+    tags = models.TextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'jobapp_job_fts'
+
+
+class JobSearchVector(models.Model):
+    """Row of the PostgreSQL tsvector search index, created by migration 0006."""
+    job = models.OneToOneField(
+        Job, primary_key=True, on_delete=models.DO_NOTHING, related_name='search_vector',
+    )
+    document = TSVectorField()
+    location_document = TSVectorField(search_config='simple')
+
+    class Meta:
+        managed = False
+        db_table = 'jobapp_job_search'
+
+
 class Applicant(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # the employer's applicant list, newest or oldest first
+            models.Index(fields=['job', 'created_at', 'id'], name='applicant_job_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'job'], name='applicant_unique_user_job'),
+        ]
+
     def __str__(self):
         return self.job.title
 
@@ -74,5 +259,61 @@ class BookmarkJob(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'job'], name='bookmarkjob_unique_user_job'),
+        ]
+
     def __str__(self):
         return self.job.title
+
+
+class SiteStats(models.Model):
+    """
+    Single-row store of the counters shown on the home page.
+    Kept up to date by the handlers in jobapp.signals; run the
+    recount_site_stats command to repair drift after bulk edits.
+    """
+    CACHE_KEY = 'jobapp:site-stats'
+
+    total_candidates = models.PositiveIntegerField(default=0)
+    total_companies = models.PositiveIntegerField(default=0)
+    total_jobs = models.PositiveIntegerField(default=0)
+    total_completed_jobs = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'site stats'
+
+    def __str__(self):
+        return 'Site stats'
+
+    @classmethod
+    def load(cls):
+        stats = cache.get(cls.CACHE_KEY)
+        if stats is None:
+            stats, _ = cls.objects.get_or_create(pk=1)
+            cache.set(cls.CACHE_KEY, stats)
+        return stats
+
+    @classmethod
+    def adjust(cls, **deltas):
+        # Clamped so a counter that has drifted to 0 cannot go negative
+        deltas = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        if not cls.objects.filter(pk=1).update(**deltas):
+            cls.recount()
+        cache.delete(cls.CACHE_KEY)
+
+    @classmethod
+    def recount(cls):
+        published_jobs = Job.objects.filter(is_published=True)
+        stats, _ = cls.objects.update_or_create(pk=1, defaults={
+            'total_candidates': User.objects.filter(role='employee').count(),
+            'total_companies': User.objects.filter(role='employer').count(),
+            'total_jobs': published_jobs.filter(is_closed=False).count(),
+            'total_completed_jobs': published_jobs.filter(is_closed=True).count(),
+        })
+        cache.delete(cls.CACHE_KEY)
+        return stats
@@ -0,0 +1,220 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import QueryDict
+
+from jobapp.caching import job_cache
+
+# Range of the widest integer column (BigIntegerField)
+MIN_INT, MAX_INT = -2 ** 63, 2 ** 63 - 1
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder truncates datetimes to milliseconds, which would make
+    # rows created in the same millisecond skip or repeat across pages.
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, size):
+    """Return the list of key values in ``token`` or None if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw.decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+class CursorPage:
+    """
+    One page of a CursorPaginator. Iterates like a Django Page so the
+    listing templates work unchanged; paginator.html renders Prev/Next
+    links from ``previous_query``/``next_query``.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous, query_params):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self._query_params = query_params if query_params is not None else QueryDict()
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def _query(self, **cursor):
+        params = self._query_params.copy()
+        for key in ('page', 'after', 'before'):
+            params.pop(key, None)
+        params.update(cursor)
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return self._query(after=self.paginator.cursor_for(self.object_list[-1]))
+
+    @property
+    def previous_query(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return self._query(before=self.paginator.cursor_for(self.object_list[0]))
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: pages are addressed by the sort key of the row on
+    either side instead of an OFFSET, so deep pages cost the same as the
+    first one and no COUNT(*) is needed.
+
+    ``ordering`` must end with a unique column (normally ``id``) so that
+    every row has a distinct cursor. ``count_cap`` bounds the optional
+    total count; ``count`` is None when it is not requested.
+
+    With a ``cache_key`` (anything identifying the queryset's filters),
+    pages and the count are kept in jobapp.caching.job_cache and dropped
+    when one of ``cache_namespaces`` is bumped.
+    """
+
+    def __init__(self, queryset, per_page, ordering, count_cap=None, cache_key=None, cache_namespaces=('jobs',)):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count_cap = count_cap
+        self.cache_key = cache_key
+        self.cache_namespaces = cache_namespaces
+
+    def _cached(self, key, compute):
+        if self.cache_key is None:
+            return compute()
+        return job_cache.get_or_set(
+            self.cache_namespaces, (self.cache_key, self.per_page, self.ordering) + key, compute,
+        )
+
+    @property
+    def fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def cursor_for(self, obj):
+        return encode_cursor([getattr(obj, field) for field in self.fields])
+
+    def _field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def decode(self, token):
+        """The sort key values in cursor ``token``, or None if it is malformed or tampered with."""
+        values = decode_cursor(token, len(self.ordering))
+        if values is None:
+            return None
+        fields = [self._field(name) for name in self.fields]
+        try:
+            values = [field.to_python(value) for field, value in zip(fields, values)]
+        except (ValidationError, TypeError, ValueError):
+            return None
+        # Every sort key must be comparable, and fit the database's integers
+        if any(value is None or isinstance(value, int) and not MIN_INT <= value <= MAX_INT for value in values):
+            return None
+        return values
+
+    def _seek(self, values, reverse):
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), per column direction
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            condition |= equal & Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+            equal &= Q(**{name: value})
+        # The redundant a >= x bound lets the database start an index range scan there
+        name = self.ordering[0].lstrip('-')
+        descending = self.ordering[0].startswith('-') != reverse
+        return Q(**{f'{name}__{"lte" if descending else "gte"}': values[0]}) & condition
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def page(self, after=None, before=None, query_params=None):
+        rows, has_next, has_previous = self._cached(('page', after, before), lambda: self._page(after, before))
+        return CursorPage(rows, self, has_next, has_previous, query_params)
+
+    def _page(self, after, before):
+        reverse = False
+        queryset = self.queryset
+        after_values = self.decode(after) if after else None
+        before_values = self.decode(before) if before else None
+        if after_values is not None:
+            queryset = queryset.filter(self._seek(after_values, reverse=False))
+        elif before_values is not None:
+            reverse = True
+            queryset = queryset.filter(self._seek(before_values, reverse=True))
+
+        ordering = [self._flip(f) for f in self.ordering] if reverse else list(self.ordering)
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, after_values is not None
+        return rows, has_next, has_previous
+
+    def get_page(self, request):
+        return self.page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+            query_params=request.GET,
+        )
+
+    @property
+    def count(self):
+        """Total row count, stopping at ``count_cap`` so it stays cheap."""
+        if self.count_cap is None:
+            return None
+        if not hasattr(self, '_count'):
+            self._count = self._cached(
+                ('count', self.count_cap), lambda: self.queryset.order_by()[:self.count_cap + 1].count(),
+            )
+        return self._count
+
+    @property
+    def count_display(self):
+        if self.count is not None and self.count > self.count_cap:
+            return f'{self.count_cap}+'
+        return self.count
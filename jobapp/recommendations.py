@@ -0,0 +1,307 @@
+"""
+"Jobs for you" recommendations for employees.
+
+Open jobs become sparse TF-IDF vectors over the words of their title, tags
+and description, and employee profiles (skills and preferred job title)
+vectors over the same vocabulary. A job's score for a profile is the
+cosine similarity of the two, raised by LOCATION_BOOST when the job is in
+the employee's city and by EXPERIENCE_BOOST when its experience level
+matches their years of experience. Jobs sharing no words with a profile
+are never recommended, whatever their location.
+
+Scores are computed for a batch of users at a time: one sparse matrix
+product, the boosts applied to its entries and a partial sort per row. The
+rebuild_recommendations command stores the RECOMMENDATIONS_LIMIT best jobs
+of every active employee in the JobRecommendation table: a full run
+nightly, and incremental runs in between that only score the jobs
+published or edited since the previous run and merge them into the stored
+lists. home_view just reads that table.
+"""
+import math
+import re
+from collections import Counter, defaultdict, namedtuple
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from django.utils.html import strip_tags
+from scipy import sparse
+from taggit.models import TaggedItem
+
+from jobapp.models import OPEN_JOBS, Applicant, ExperienceLevel, Job, JobRecommendation
+
+RECOMMENDATIONS_LIMIT = getattr(settings, 'RECOMMENDATIONS_LIMIT', 10)
+# Employees who logged in within this many days get recommendations
+RECOMMENDATIONS_ACTIVE_DAYS = getattr(settings, 'RECOMMENDATIONS_ACTIVE_DAYS', 90)
+
+# Weight of one occurrence of a word in each part of a job or profile
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+LOCATION_BOOST = 0.25
+EXPERIENCE_BOOST = 0.1
+# Upper bound (exclusive) of the years of experience of each level
+EXPERIENCE_YEARS = (
+    (1, ExperienceLevel.ENTRY),
+    (3, ExperienceLevel.JUNIOR),
+    (6, ExperienceLevel.MID),
+    (10, ExperienceLevel.SENIOR),
+    (15, ExperienceLevel.DIRECTOR),
+)
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset((
+    'a an and are as at be but by for from has have in is it its of on or our that the their this to we will '
+    'with you your who what which can all any more other into about also'
+).split())
+
+# ids: numpy array of job or user ids; features: {term: weighted count} per
+# id; cities and levels: the values the boosts compare, '' when unknown
+Documents = namedtuple('Documents', 'ids features cities levels')
+
+
+def words(text):
+    return [word for word in TOKEN_RE.findall((text or '').lower()) if word not in STOP_WORDS]
+
+
+def city(location):
+    """First word of a location ("Nairobi, Kenya" -> "nairobi")."""
+    location_words = words(location)
+    return location_words[0] if location_words else ''
+
+
+def experience_level(years):
+    if years is None:
+        return ''
+    for bound, level in EXPERIENCE_YEARS:
+        if years < bound:
+            return level
+    return ExperienceLevel.EXECUTIVE
+
+
+def _features(weighted_words):
+    counts = Counter()
+    for text_words, weight in weighted_words:
+        for word in text_words:
+            counts[word] += weight
+    return counts
+
+
+def job_features(title, tags, description):
+    return _features((
+        (words(title), TITLE_WEIGHT),
+        (words(' '.join(tags)), TAG_WEIGHT),
+        (words(strip_tags(description or '')), DESCRIPTION_WEIGHT),
+    ))
+
+
+def profile_features(skills, preferred_job_title):
+    return _features((
+        (words((skills or '').replace(',', ' ')), TAG_WEIGHT),
+        (words(preferred_job_title), TITLE_WEIGHT),
+    ))
+
+
+class Vectorizer:
+    """Vocabulary and inverse document frequencies of the open jobs."""
+
+    def __init__(self, documents):
+        document_frequency = Counter()
+        for features in documents:
+            document_frequency.update(features.keys())
+        terms = sorted(document_frequency)
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        self.idf = [math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1 for term in terms]
+
+    def transform(self, documents):
+        """L2-normalised TF-IDF rows of ``documents``; terms outside the vocabulary are ignored."""
+        vocabulary, idf, log = self.vocabulary, self.idf, math.log
+        indptr, columns, values = [0], [], []
+        for features in documents:
+            for term, count in features.items():
+                column = vocabulary.get(term)
+                if column is not None:
+                    columns.append(column)
+                    values.append((1 + log(count)) * idf[column])
+            indptr.append(len(columns))
+        matrix = sparse.csr_matrix(
+            (np.array(values, dtype=np.float32), np.array(columns, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(documents), len(vocabulary)),
+        )
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(np.float32)
+        return matrix
+
+
+def encode(values, codes):
+    """Integer codes of ``values`` for vectorised comparison; '' becomes -1, which matches nothing."""
+    return np.array([codes.setdefault(value, len(codes)) if value else -1 for value in values], dtype=np.int32)
+
+
+def boost(scores, user_cities, user_levels, job_cities, job_levels):
+    """
+    Multiply the scores of jobs in the user's city by 1 + LOCATION_BOOST and
+    of jobs at their experience level by 1 + EXPERIENCE_BOOST. The rows of
+    ``scores`` must be grouped by (city, level): each group is then one
+    slice of the sparse data, boosted with a single per-job factor.
+    """
+    starts = np.flatnonzero((np.diff(user_cities) != 0) | (np.diff(user_levels) != 0)) + 1
+    for first, end in zip([0, *starts.tolist()], [*starts.tolist(), len(user_cities)]):
+        factor = np.ones(len(job_cities), dtype=np.float32)
+        if user_cities[first] >= 0:
+            factor[job_cities == user_cities[first]] += LOCATION_BOOST
+        if user_levels[first] >= 0:
+            factor[job_levels == user_levels[first]] += EXPERIENCE_BOOST
+        entries = slice(scores.indptr[first], scores.indptr[end])
+        scores.data[entries] *= factor[scores.indices[entries]]
+
+
+def top_per_row(scores, limit, excluded=None):
+    """
+    (rows, columns, scores) of the ``limit`` highest positive entries of
+    each row of the sparse matrix ``scores``, best first within a row,
+    leaving out the (rows, columns) in ``excluded``.
+    """
+    # Ranked over each row's stored entries: a dense copy of a batch would
+    # take rows x jobs floats, however few of them are non-zero
+    scores = scores.tocsr()
+    indptr, columns = scores.indptr, scores.indices
+    # A copy, the caller's scores are left as they are
+    data = np.where(scores.data > 0, scores.data, 0)
+    if excluded is not None and len(excluded[0]):
+        order = np.argsort(excluded[0], kind='stable')
+        excluded_rows, first = np.unique(excluded[0][order], return_index=True)
+        for row, row_excluded in zip(excluded_rows.tolist(), np.split(excluded[1][order], first[1:])):
+            start, end = indptr[row], indptr[row + 1]
+            data[start:end][np.isin(columns[start:end], row_excluded)] = 0
+
+    chosen = data > 0 if limit else np.zeros(len(data), dtype=bool)
+    # Only rows with more than ``limit`` candidates need a partial sort. The
+    # ``limit``-th score is kept for the lowest columns that have it
+    for row in np.flatnonzero(np.diff(indptr) > limit).tolist() if limit else ():
+        start, end = indptr[row], indptr[row + 1]
+        row_scores = data[start:end]
+        lowest = -np.partition(-row_scores, limit - 1)[limit - 1]
+        if lowest <= 0:
+            continue
+        above = row_scores > lowest
+        ties = start + np.flatnonzero(row_scores == lowest)
+        slots = limit - np.count_nonzero(above)
+        if len(ties) > slots:
+            ties = ties[np.argsort(columns[ties], kind='stable')[:slots]]
+        chosen[start:end] = above
+        chosen[ties] = True
+
+    entries = np.flatnonzero(chosen)
+    rows = np.searchsorted(indptr, entries, side='right') - 1
+    # Best first within a row, equal scores by column
+    order = np.lexsort((columns[entries], -data[entries], rows))
+    return rows[order], columns[entries][order].astype(np.int64), data[entries][order]
+
+
+def open_jobs(since=None):
+    """Documents of the open jobs, or only of those updated since ``since``."""
+    jobs = Job.objects.filter(OPEN_JOBS)
+    if since is not None:
+        jobs = jobs.filter(updated_at__gte=since)
+    rows = list(jobs.order_by('id').values_list('id', 'title', 'description', 'location', 'experience_level'))
+    tags = defaultdict(list)
+    tagged = TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Job), object_id__in=jobs.values('id'),
+    )
+    for job_id, name in tagged.values_list('object_id', 'tag__name'):
+        tags[job_id].append(name)
+    return Documents(
+        ids=np.array([row[0] for row in rows], dtype=np.int64),
+        features=[job_features(title, tags[job_id], description) for job_id, title, description, _, _ in rows],
+        cities=[city(location) for _, _, _, location, _ in rows],
+        levels=[level or '' for _, _, _, _, level in rows],
+    )
+
+
+def active_profiles():
+    """Documents of the employees who logged in recently and filled in their skills or preferred job title."""
+    rows = (
+        get_user_model().objects
+        .filter(role='employee', last_login__gte=timezone.now() - timedelta(days=RECOMMENDATIONS_ACTIVE_DAYS))
+        .order_by('id')
+        .values_list('id', 'skills', 'preferred_job_title', 'location', 'years_of_experience')
+    )
+    ids, features, cities, levels = [], [], [], []
+    for user_id, skills, preferred_job_title, location, years in rows.iterator():
+        if skills or preferred_job_title:
+            ids.append(user_id)
+            features.append(profile_features(skills, preferred_job_title))
+            cities.append(city(location))
+            levels.append(experience_level(years))
+    return Documents(np.array(ids, dtype=np.int64), features, cities, levels)
+
+
+def _applied(user_ids, job_ids):
+    """(rows, columns) of the jobs among ``job_ids`` the users in ``user_ids`` already applied to."""
+    job_columns = {job_id: column for column, job_id in enumerate(job_ids.tolist())}
+    user_rows = {user_id: row for row, user_id in enumerate(user_ids.tolist())}
+    pairs = [
+        (user_rows[user_id], job_columns[job_id])
+        for user_id, job_id in Applicant.objects.filter(user_id__in=list(user_rows)).values_list('user_id', 'job_id')
+        if job_id in job_columns
+    ]
+    return (
+        np.array([row for row, _ in pairs], dtype=np.int64), np.array([column for _, column in pairs], dtype=np.int64),
+    )
+
+
+def score_users(users, jobs, vectorizer, limit=RECOMMENDATIONS_LIMIT, batch_size=500):
+    """Yield {user id: [(job id, score), ...] best first} for each batch of ``users``."""
+    profiles = vectorizer.transform(users.features)
+    jobs_t = vectorizer.transform(jobs.features).T.tocsr()
+    codes = {}
+    user_cities, job_cities = encode(users.cities, codes), encode(jobs.cities, codes)
+    user_levels, job_levels = encode(users.levels, codes), encode(jobs.levels, codes)
+    # Users with the same city and level next to each other, see boost()
+    order = np.lexsort((user_levels, user_cities))
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        user_ids = users.ids[batch]
+        scores = profiles[batch].dot(jobs_t).tocsr()
+        boost(scores, user_cities[batch], user_levels[batch], job_cities, job_levels)
+
+        rows, columns, best = top_per_row(scores, limit, _applied(user_ids, jobs.ids))
+        lists = {user_id: [] for user_id in user_ids.tolist()}
+        for user_id, job_id, score in zip(user_ids[rows].tolist(), jobs.ids[columns].tolist(), best.tolist()):
+            lists[user_id].append((job_id, score))
+        yield lists
+
+
+def store_lists(lists):
+    """Replace the recommendations of the users in ``lists``; returns the number of rows written."""
+    with transaction.atomic():
+        JobRecommendation.objects.filter(user_id__in=list(lists)).delete()
+        created = JobRecommendation.objects.bulk_create([
+            JobRecommendation(user_id=user_id, job_id=job_id, score=score)
+            for user_id, jobs in lists.items() for job_id, score in jobs
+        ], batch_size=1000)
+    return len(created)
+
+
+def merge_lists(lists, changed_job_ids, limit=RECOMMENDATIONS_LIMIT):
+    """
+    ``lists`` of freshly scored changed jobs merged into the stored lists of
+    the same users: stale rows of the changed jobs are dropped, and each
+    user keeps their ``limit`` best.
+    """
+    changed = set(changed_job_ids)
+    merged = {user_id: dict(jobs) for user_id, jobs in lists.items()}
+    stored = JobRecommendation.objects.filter(user_id__in=list(lists)).values_list('user_id', 'job_id', 'score')
+    for user_id, job_id, score in stored:
+        if job_id not in changed:
+            merged[user_id].setdefault(job_id, score)
+    return {
+        user_id: sorted(jobs.items(), key=lambda item: (-item[1], -item[0]))[:limit]
+        for user_id, jobs in merged.items()
+    }
@@ -0,0 +1,92 @@
+"""
+Maintenance of the RelatedJob table.
+
+Two open jobs are related when they share tags; the score is the number of
+shared tags, which is what taggit's similar_objects() ranks by. Each open
+job keeps its RELATED_JOBS_LIMIT best neighbours.
+"""
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, Min
+from taggit.models import TaggedItem
+
+from jobapp.models import Job, RelatedJob
+
+RELATED_JOBS_LIMIT = getattr(settings, 'RELATED_JOBS_LIMIT', 10)
+
+
+def _job_tags():
+    return TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Job))
+
+
+def _open_job_ids():
+    return Job.objects.filter(is_published=True, is_closed=False).values('id')
+
+
+def score_neighbours(job_id, limit=RELATED_JOBS_LIMIT):
+    """[(related_id, score), ...] of open jobs sharing tags with ``job_id``, best first."""
+    tag_ids = _job_tags().filter(object_id=job_id).values('tag_id')
+    scores = (
+        _job_tags()
+        .filter(tag_id__in=tag_ids, object_id__in=_open_job_ids())
+        .exclude(object_id=job_id)
+        .values('object_id')
+        .annotate(score=Count('id'))
+        .order_by('-score', '-object_id')
+        .values_list('object_id', 'score')
+    )
+    if limit is not None:
+        scores = scores[:limit]
+    return list(scores)
+
+
+def compute_related_rows(job_ids, limit=RELATED_JOBS_LIMIT):
+    """RelatedJob rows (job_id, related_id, score) for the open jobs among ``job_ids``."""
+    open_ids = Job.objects.filter(id__in=list(job_ids), is_published=True, is_closed=False).values_list('id', flat=True)
+    return [
+        (job_id, related_id, float(score))
+        for job_id in open_ids
+        for related_id, score in score_neighbours(job_id, limit)
+    ]
+
+
+def refresh_related_jobs(job_ids, batch_size=500):
+    """Recompute the neighbour lists of ``job_ids`` from scratch."""
+    job_ids = sorted(set(job_ids))
+    for start in range(0, len(job_ids), batch_size):
+        batch = job_ids[start:start + batch_size]
+        rows = compute_related_rows(batch)
+        with transaction.atomic():
+            RelatedJob.objects.filter(job_id__in=batch).delete()
+            RelatedJob.objects.bulk_create(
+                [RelatedJob(job_id=job_id, related_id=related_id, score=score) for job_id, related_id, score in rows]
+            )
+
+
+def job_changed(job_id):
+    """
+    Update after a job's tags or open state changed: recompute its own list
+    and the lists it may now enter or must leave, without touching the rest.
+    """
+    stale = set(RelatedJob.objects.filter(related_id=job_id).values_list('job_id', flat=True))
+    is_open = Job.objects.filter(id=job_id, is_published=True, is_closed=False).exists()
+    if not is_open:
+        RelatedJob.objects.filter(job_id=job_id).delete()
+        refresh_related_jobs(stale)
+        return
+
+    candidates = dict(score_neighbours(job_id, limit=None))
+    tag_ids = _job_tags().filter(object_id=job_id).values('tag_id')
+    lists = (
+        RelatedJob.objects.filter(job_id__in=_job_tags().filter(tag_id__in=tag_ids).values('object_id'))
+        .values('job_id')
+        .annotate(size=Count('id'), lowest=Min('score'))
+    )
+    full = {row['job_id']: row['lowest'] for row in lists if row['size'] >= RELATED_JOBS_LIMIT}
+    entering = {
+        candidate for candidate, score in candidates.items()
+        if candidate not in full or score >= full[candidate]
+    }
+    refresh_related_jobs(stale | entering | {job_id})
+
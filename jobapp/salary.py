@@ -0,0 +1,92 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+from jobapp.models import SalaryPeriod
+
+
+CURRENCY_SYMBOLS = {
+    '$': 'USD',
+    '€': 'EUR',
+    '£': 'GBP',
+    'ksh': 'KES',
+    'kshs': 'KES',
+    'usd': 'USD',
+    'eur': 'EUR',
+    'gbp': 'GBP',
+    'kes': 'KES',
+}
+
+PERIOD_WORDS = {
+    'hour': SalaryPeriod.HOUR, 'hr': SalaryPeriod.HOUR, 'hourly': SalaryPeriod.HOUR,
+    'day': SalaryPeriod.DAY, 'daily': SalaryPeriod.DAY,
+    'week': SalaryPeriod.WEEK, 'wk': SalaryPeriod.WEEK, 'weekly': SalaryPeriod.WEEK,
+    'month': SalaryPeriod.MONTH, 'mo': SalaryPeriod.MONTH, 'monthly': SalaryPeriod.MONTH, 'pm': SalaryPeriod.MONTH,
+    'year': SalaryPeriod.YEAR, 'yr': SalaryPeriod.YEAR, 'annum': SalaryPeriod.YEAR, 'annual': SalaryPeriod.YEAR,
+    'annually': SalaryPeriod.YEAR, 'pa': SalaryPeriod.YEAR,
+}
+
+AMOUNT_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([km])?\b', re.IGNORECASE)
+CURRENCY_RE = re.compile(r'[$€£]|\b(?:kshs?|usd|eur|gbp|kes)\b', re.IGNORECASE)
+PERIOD_RE = re.compile(r'\b(' + '|'.join(sorted(PERIOD_WORDS, key=len, reverse=True)) + r')\b', re.IGNORECASE)
+
+MULTIPLIERS = {'k': 1000, 'm': 1000000}
+# Largest amount the salary_min/salary_max columns hold (PositiveIntegerField)
+MAX_SALARY = 2 ** 31 - 1
+MIN_SALARY_RE = re.compile(r'[0-9]+')
+
+
+def _amount(number, suffix):
+    try:
+        value = Decimal(number.replace(',', ''))
+    except InvalidOperation:
+        return None
+    if suffix:
+        value *= MULTIPLIERS[suffix.lower()]
+    if value > MAX_SALARY:
+        return None
+    return int(value)
+
+
+def parse_min_salary(value):
+    """The ``min_salary`` search parameter as a number (at most MAX_SALARY), or None if it is not one."""
+    if not value or not MIN_SALARY_RE.fullmatch(value):
+        return None
+    return min(int(value), MAX_SALARY)
+
+
+def parse_salary(text):
+    """
+    Parse a free-text salary such as "$800 - $1200", "KES 50,000 per month"
+    or "40k-60k/yr" into (minimum, maximum, currency, period).
+    Anything that cannot be read is returned as None / ''.
+    """
+    if not text:
+        return None, None, '', ''
+
+    matches = AMOUNT_RE.findall(text)[:2]
+    # "40-60k" means 40k to 60k: carry the second suffix back to the first number
+    if len(matches) == 2 and matches[1][1] and not matches[0][1]:
+        low, high = _amount(matches[0][0], matches[1][1]), _amount(*matches[1])
+        if low is not None and high is not None and low <= high:
+            matches[0] = (matches[0][0], matches[1][1])
+    amounts = [amount for amount in (_amount(*match) for match in matches) if amount is not None]
+    if not amounts:
+        return None, None, '', ''
+    minimum, maximum = min(amounts), max(amounts)
+
+    currency = ''
+    match = CURRENCY_RE.search(text)
+    if match:
+        currency = CURRENCY_SYMBOLS[match.group(0).lower()]
+
+    period = ''
+    match = PERIOD_RE.search(text)
+    if match:
+        period = PERIOD_WORDS[match.group(1).lower()]
+
+    return minimum, maximum, currency, period
+
+
+def set_salary_range(job):
+    """Fill the parsed salary columns of ``job`` from its free-text salary."""
+    job.salary_min, job.salary_max, job.salary_currency, job.salary_period = parse_salary(job.salary)
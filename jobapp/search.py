@@ -0,0 +1,211 @@
+"""
+Full-text search over jobs.
+
+The backend is picked from settings.JOB_SEARCH_BACKEND (a dotted path) or,
+by default, from the database vendor: an FTS5 table on SQLite, a tsvector
+table with a GIN index on PostgreSQL, and plain icontains elsewhere.
+Every backend takes the already-filtered Job queryset and returns it
+narrowed to matching jobs; when there is free text to rank by, it is also
+annotated with ``search_rank``, to be ordered by ``rank_ordering``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, FloatField, Func, Q, Value
+from django.utils.html import strip_tags
+from django.utils.module_loading import import_string
+
+from jobapp.salary import parse_min_salary
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def job_document(job):
+    """Text fields of a job as they are indexed; ``job.tags`` should be prefetched."""
+    return {
+        'title': job.title,
+        'company_name': job.company_name,
+        'location': job.location,
+        'description': strip_tags(job.description or ''),
+        'tags': ' '.join(tag.name for tag in job.tags.all()),
+    }
+
+
+class IcontainsSearchBackend:
+    """The original LIKE based search, kept for databases without full-text support."""
+    rank_ordering = ('-created_at', '-id')
+
+    def search(self, queryset, text=None, location=None):
+        if text:
+            queryset = queryset.filter(Q(title__icontains=text) | Q(company_name__icontains=text))
+        if location:
+            queryset = queryset.filter(location__icontains=location)
+        return queryset
+
+    def index_jobs(self, jobs):
+        pass
+
+    def remove_jobs(self, job_ids):
+        pass
+
+    def clear(self):
+        pass
+
+
+class SQLiteFTSSearchBackend:
+    """BM25 ranked search on the ``jobapp_job_fts`` FTS5 table (rowid = job id)."""
+    table = 'jobapp_job_fts'
+    columns = ('title', 'company_name', 'location', 'description', 'tags')
+    # bm25() is lower for better matches
+    rank_ordering = ('search_rank', 'id')
+
+    @staticmethod
+    def _terms(text):
+        return ' '.join(f'"{word}"*' for word in WORD_RE.findall(text.lower()))
+
+    def match_expression(self, text=None, location=None):
+        parts = []
+        if text and WORD_RE.search(text):
+            parts.append(f'{{title company_name description tags}} : ({self._terms(text)})')
+        if location and WORD_RE.search(location):
+            parts.append(f'location : ({self._terms(location)})')
+        return ' AND '.join(parts)
+
+    def search(self, queryset, text=None, location=None):
+        match = self.match_expression(text, location)
+        if not match:
+            return queryset
+        queryset = queryset.filter(fts_entry__jobapp_job_fts__match=match)
+        if text and WORD_RE.search(text):
+            # `rank` is bm25() with the weights configured by migration 0006
+            queryset = queryset.annotate(search_rank=F('fts_entry__rank'))
+        return queryset
+
+    def index_jobs(self, jobs):
+        rows = []
+        for job in jobs:
+            document = job_document(job)
+            rows.append([job.id] + [document[column] for column in self.columns])
+        if not rows:
+            return
+        self.remove_jobs([row[0] for row in rows])
+        placeholders = ', '.join(['%s'] * (len(self.columns) + 1))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, {", ".join(self.columns)}) VALUES ({placeholders})',
+                rows,
+            )
+
+    def remove_jobs(self, job_ids):
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid IN ({", ".join(["%s"] * len(job_ids))})',
+                job_ids,
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+
+class PostgresSearchBackend:
+    """
+    ts_rank_cd ranked search on ``jobapp_job_search`` (job_id, document tsvector)
+    with a GIN index. Title and tags carry weight A, company B, the rest D.
+    """
+    table = 'jobapp_job_search'
+    config = 'english'
+    rank_ordering = ('-search_rank', '-id')
+
+    def search(self, queryset, text=None, location=None):
+        if location and WORD_RE.search(location):
+            queryset = queryset.filter(search_vector__location_document__tsmatch=location)
+        if text and WORD_RE.search(text):
+            queryset = queryset.filter(search_vector__document__tsmatch=text).annotate(
+                search_rank=Func(
+                    F('search_vector__document'),
+                    Func(Value(self.config), Value(text), function='websearch_to_tsquery'),
+                    function='ts_rank_cd', output_field=FloatField(),
+                ),
+            )
+        return queryset
+
+    def index_jobs(self, jobs):
+        rows = []
+        for job in jobs:
+            document = job_document(job)
+            rows.append((
+                job.id, self.config, document['title'], self.config, document['tags'],
+                self.config, document['company_name'], self.config, document['description'],
+                document['location'],
+            ))
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (job_id, document, location_document) VALUES (%s, '
+                "setweight(to_tsvector(%s::regconfig, %s), 'A') || setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+                "setweight(to_tsvector(%s::regconfig, %s), 'B') || setweight(to_tsvector(%s::regconfig, %s), 'D'), "
+                "to_tsvector('simple', %s)) "
+                'ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document, '
+                'location_document = EXCLUDED.location_document',
+                rows,
+            )
+
+    def remove_jobs(self, job_ids):
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE job_id = ANY(%s)', [job_ids])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.table}')
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'JOB_SEARCH_BACKEND', None)
+        backend_class = import_string(path) if path else VENDOR_BACKENDS.get(connection.vendor, IcontainsSearchBackend)
+        table = getattr(backend_class, 'table', None)
+        # e.g. a SQLite build without FTS5, where the migration skipped the table
+        if table and table not in connection.introspection.table_names():
+            backend_class = IcontainsSearchBackend
+        _backend = backend_class()
+    return _backend
+
+
+# search_result_view parameters applied as equality filters
+SEARCH_FILTERS = ('job_type', 'experience_level', 'work_arrangement')
+
+
+def search_jobs(queryset, params):
+    """
+    ``queryset`` narrowed by the job search parameters in ``params`` (the
+    search form's GET parameters), annotated with ``search_rank`` when
+    there is free text to rank by.
+    """
+    queryset = get_search_backend().search(
+        queryset, text=params.get('job_title_or_company_name'), location=params.get('location'),
+    )
+    for field in SEARCH_FILTERS:
+        if params.get(field):
+            queryset = queryset.filter(**{field: params[field]})
+    min_salary = parse_min_salary(params.get('min_salary'))
+    if min_salary is not None:
+        queryset = queryset.filter(salary_max__gte=min_salary)
+    return queryset
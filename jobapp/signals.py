@@ -0,0 +1,225 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from taggit.models import Tag
+
+from account.skills import release_user_skills, set_user_skills
+from jobapp.alerts import search_anchor
+from jobapp.caching import job_cache
+from jobapp.models import Applicant, BookmarkJob, Category, Job, RelatedJob, SavedSearch, SiteStats
+from jobapp.related import job_changed, refresh_related_jobs
+from jobapp.search import get_search_backend
+from jobapp.thumbnails import forget_logo_digest, schedule_logo_thumbnails
+from jobapp.user_state import invalidate_user_job_state
+
+User = get_user_model()
+
+
+def _job_counter(is_published, is_closed):
+    if not is_published:
+        return None
+    return 'total_completed_jobs' if is_closed else 'total_jobs'
+
+
+def _user_counter(role):
+    return {
+        'employee': 'total_candidates',
+        'employer': 'total_companies',
+    }.get(role)
+
+
+def _move_counter(before, after):
+    if before == after:
+        return
+    deltas = {}
+    if before:
+        deltas[before] = -1
+    if after:
+        deltas[after] = 1
+    SiteStats.adjust(**deltas)
+
+
+@receiver(pre_save, sender=Job)
+def remember_job_state(sender, instance, raw=False, **kwargs):
+    instance._old_state = None
+    if instance.pk and not raw:
+        old = Job.objects.filter(pk=instance.pk).values('is_published', 'is_closed').first()
+        if old:
+            instance._old_state = (old['is_published'], old['is_closed'])
+    if instance.is_published and instance.published_at is None and not raw:
+        instance.published_at = timezone.now()
+
+
+@receiver(post_save, sender=Job)
+def update_job_counters(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = getattr(instance, '_old_state', None)
+    _move_counter(
+        _job_counter(*old_state) if old_state else None,
+        _job_counter(instance.is_published, instance.is_closed),
+    )
+
+
+@receiver(post_delete, sender=Job)
+def release_job_counter(sender, instance, **kwargs):
+    _move_counter(_job_counter(instance.is_published, instance.is_closed), None)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_counter(sender, instance, raw=False, **kwargs):
+    instance._stats_counter = None
+    instance._logo_changed = bool(instance.company_logo) and not raw
+    instance._skills_changed = bool(instance.skills) and not raw
+    if instance.pk and not raw:
+        old = User.objects.filter(pk=instance.pk).values('role', 'company_logo', 'skills').first()
+        if old:
+            instance._stats_counter = _user_counter(old['role'])
+            instance._logo_changed = (old['company_logo'] or '') != (instance.company_logo.name or '')
+            instance._skills_changed = (old['skills'] or '') != (instance.skills or '')
+    if instance._logo_changed:
+        # The thumbnails of the new logo don't exist yet
+        instance.company_logo_digest = ''
+
+
+@receiver(post_save, sender=User)
+def update_user_counters(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _move_counter(getattr(instance, '_stats_counter', None), _user_counter(instance.role))
+
+
+@receiver(post_delete, sender=User)
+def release_user_counter(sender, instance, **kwargs):
+    _move_counter(_user_counter(instance.role), None)
+
+
+@receiver(post_save, sender=User)
+def process_company_logo(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(instance, '_logo_changed', False):
+        return
+    transaction.on_commit(lambda: forget_logo_digest(instance.pk))
+    if instance.company_logo:
+        schedule_logo_thumbnails(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def update_user_skills(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_skills_changed', False):
+        set_user_skills(instance.pk, instance.skills)
+
+
+@receiver(pre_delete, sender=User)
+def forget_user_skills(sender, instance, **kwargs):
+    release_user_skills(instance.pk)
+
+
+@receiver(pre_save, sender=SavedSearch)
+def set_saved_search_anchor(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.anchor = search_anchor(instance)
+
+
+def _reindex_job(job_id):
+    job = Job.objects.filter(pk=job_id).prefetch_related('tags').first()
+    if job is not None:
+        get_search_backend().index_jobs([job])
+
+
+@receiver(post_save, sender=Job)
+def index_job(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Tags are saved after the job itself, so index once the transaction commits
+    transaction.on_commit(lambda: _reindex_job(instance.pk))
+
+
+@receiver(m2m_changed, sender=Job.tags.through)
+def index_job_tags(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, Job):
+        transaction.on_commit(lambda: _reindex_job(instance.pk))
+
+
+@receiver(post_delete, sender=Job)
+def unindex_job(sender, instance, **kwargs):
+    get_search_backend().remove_jobs([instance.pk])
+
+
+@receiver(post_save, sender=Job)
+def update_related_jobs_on_state_change(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = getattr(instance, '_old_state', None)
+    if created or old_state != (instance.is_published, instance.is_closed):
+        transaction.on_commit(lambda: job_changed(instance.pk))
+
+
+@receiver(m2m_changed, sender=Job.tags.through)
+def update_related_jobs_on_retag(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, Job):
+        transaction.on_commit(lambda: job_changed(instance.pk))
+
+
+@receiver(pre_delete, sender=Job)
+def remember_related_lists(sender, instance, **kwargs):
+    instance._neighbour_of = list(
+        RelatedJob.objects.filter(related_id=instance.pk).values_list('job_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Job)
+def update_related_jobs_on_delete(sender, instance, **kwargs):
+    neighbour_of = getattr(instance, '_neighbour_of', [])
+    transaction.on_commit(lambda: refresh_related_jobs(neighbour_of))
+
+
+@receiver(post_save, sender=Applicant)
+@receiver(post_delete, sender=Applicant)
+@receiver(post_save, sender=BookmarkJob)
+@receiver(post_delete, sender=BookmarkJob)
+def invalidate_applied_and_saved(sender, instance, **kwargs):
+    invalidate_user_job_state(instance.user_id)
+
+
+def _bump(*namespaces):
+    job_cache.bump(*namespaces)
+    # Again once committed: a request may have cached the old rows in between
+    transaction.on_commit(lambda: job_cache.bump(*namespaces))
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_cached_jobs(sender, **kwargs):
+    _bump('jobs')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_cached_categories(sender, **kwargs):
+    _bump('categories')
+
+
+@receiver(post_save, sender=Applicant)
+@receiver(post_delete, sender=Applicant)
+def invalidate_cached_applications(sender, **kwargs):
+    _bump('applications')
+
+
+@receiver(post_save, sender=BookmarkJob)
+@receiver(post_delete, sender=BookmarkJob)
+def invalidate_cached_bookmarks(sender, **kwargs):
+    _bump('bookmarks')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_cached_tags(sender, **kwargs):
+    _bump('tags')
+
+
+@receiver(m2m_changed, sender=Job.tags.through)
+def invalidate_cached_job_tags(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _bump('tags')
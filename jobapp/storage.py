@@ -0,0 +1,52 @@
+"""
+Static files storage for production: hashed file names from
+ManifestStaticFilesStorage plus .gz and .br variants written at
+collectstatic time, which jobapp.middleware.StaticFilesMiddleware serves.
+"""
+import gzip
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    # Only gzip variants are written without the brotli package
+    brotli = None
+
+# Formats that are already compressed (images, woff, archives) are left alone
+COMPRESSIBLE_EXTENSIONS = getattr(settings, 'STATIC_COMPRESSIBLE_EXTENSIONS', (
+    '.css', '.js', '.map', '.json', '.svg', '.html', '.txt', '.xml', '.ttf', '.otf', '.eot',
+))
+# A variant is only kept when it saves at least this fraction of the file
+STATIC_COMPRESSION_MIN_SAVING = 0.05
+
+
+def compressed_variants(content):
+    """{extension: bytes} of the variants of ``content`` worth serving."""
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    return {
+        extension: data for extension, data in variants.items()
+        if len(data) <= len(content) * (1 - STATIC_COMPRESSION_MIN_SAVING)
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # hashed_files maps every collected name to its final hashed name
+        for name in sorted(set(self.hashed_files.values()) | set(self.hashed_files)):
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as original:
+                content = original.read()
+            for extension, data in compressed_variants(content).items():
+                if self.exists(name + extension):
+                    self.delete(name + extension)
+                self._save(name + extension, ContentFile(data))
@@ -0,0 +1,11 @@
+from django import template
+
+from jobapp.thumbnails import logo_sources
+
+register = template.Library()
+
+
+@register.inclusion_tag('jobapp/company_logo.html')
+def company_logo(digest, alt=''):
+    """``{% company_logo user.company_logo_digest job.company_name %}``: thumbnails, or the placeholder."""
+    return {'logo': logo_sources(digest), 'alt': alt}
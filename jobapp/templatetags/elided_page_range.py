@@ -0,0 +1,7 @@
+from django import template
+register = template.Library()
+
+
+@register.filter(name='elided_page_range')
+def elided_page_range(page_obj):
+    return page_obj.paginator.get_elided_page_range(page_obj.number)
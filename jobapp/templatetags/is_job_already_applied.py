@@ -7,8 +7,4 @@ register = template.Library()
 
 @register.simple_tag(name='is_job_already_applied')
 def is_job_already_applied(job, user):
-    applied = Applicant.objects.filter(job=job, user=user)
-    if applied:
-        return True
-    else:
-        return False
+    return Applicant.objects.filter(job=job, user=user).exists()
@@ -0,0 +1,11 @@
+from django import template
+
+from jobapp.cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True, name='job_cards')
+def job_cards(context, jobs, template_name, state_template_name, truncate=150, logos=False):
+    """``{% job_cards page_obj 'jobapp/cards/job_block.html' 'jobapp/cards/job_state_item.html' %}``"""
+    return render_cards(jobs, template_name, state_template_name, context.get('request'), truncate, logos)
@@ -0,0 +1,16 @@
+from django import template
+
+from jobapp.user_state import get_user_job_state
+
+register = template.Library()
+
+
+@register.filter(name='is_applied')
+def is_applied(job, request):
+    """``{% if job|is_applied:request %}`` without a query per job."""
+    return get_user_job_state(request).has_applied(job)
+
+
+@register.filter(name='is_saved')
+def is_saved(job, request):
+    return get_user_job_state(request).has_saved(job)
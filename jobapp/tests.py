@@ -1,3 +1,1356 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import get_messages
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.template.loader import get_template
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image
+from scipy import sparse
+
+from account.middleware import visit_buffer
+from account.models import Skill, User, UserSkill
+from account.skills import parse_skills
+from jobapp import api
+from jobapp.alerts import MATCH_ALL, alert_job, match_jobs
+from jobapp.caching import JobCache, LocalLRU, job_cache
+from jobapp.cards import JOB_STATE_MARKER, render_cards
+from jobapp.forms import JobForm
+from jobapp.middleware import StaticFilesMiddleware
+from jobapp.models import (
+    Applicant, BookmarkJob, Job, Category, JobAlertRun, JobRecommendation, RecommendationRun, RelatedJob, SalaryPeriod,
+    SavedSearch, SiteStats,
+)
+from jobapp.pagination import encode_cursor
+from jobapp.recommendations import Vectorizer, experience_level, profile_features, top_per_row
+from jobapp.related import compute_related_rows
+from jobapp.salary import parse_salary, set_salary_range
+from jobapp.search import get_search_backend
+from jobapp.thumbnails import LOGO_THUMBNAIL_SIZES, generate_logo_thumbnails, thumbnail_name
+from jobapp.user_state import add_user_job
+from jobapp.views import JOB_SORT_ORDERINGS, cached_categories
+from jobapp.warmup import template_names, warm_up
+
+
+def make_job(user, category, **kwargs):
+    fields = {
+        'title': 'Python Developer',
+        'description': 'Build things',
+        'location': 'Nairobi',
+        'job_type': 'FT',
+        'company_name': 'Acme',
+        'is_published': True,
+    }
+    fields.update(kwargs)
+    return Job.objects.create(user=user, category=category, **fields)
+
+
+class SiteStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        self.category = Category.objects.create(name='IT')
+
+    def test_counters_follow_writes(self):
+        job = make_job(self.employer, self.category)
+        make_job(self.employer, self.category, is_published=False)
+        stats = SiteStats.load()
+        self.assertEqual((stats.total_candidates, stats.total_companies), (1, 1))
+        self.assertEqual((stats.total_jobs, stats.total_completed_jobs), (1, 0))
+
+        job.is_closed = True
+        job.save()
+        stats = SiteStats.load()
+        self.assertEqual((stats.total_jobs, stats.total_completed_jobs), (0, 1))
+
+        job.delete()
+        self.assertEqual(SiteStats.load().total_completed_jobs, 0)
+
+    def test_recount_repairs_drift(self):
+        make_job(self.employer, self.category)
+        Job.objects.update(is_closed=True)
+        call_command('recount_site_stats', stdout=StringIO())
+        stats = SiteStats.load()
+        self.assertEqual((stats.total_jobs, stats.total_completed_jobs), (0, 1))
+
+    def test_adjust_does_not_go_below_zero(self):
+        make_job(self.employer, self.category)
+        SiteStats.objects.update(total_jobs=0)
+        SiteStats.adjust(total_jobs=-1, total_completed_jobs=1)
+        stats = SiteStats.load()
+        self.assertEqual((stats.total_jobs, stats.total_completed_jobs), (0, 1))
+
+    def test_home_page_does_not_count_tables(self):
+        make_job(self.employer, self.category)
+        SiteStats.load()
+        # jobs, company logo digests, newest job change for the page cache's Last-Modified
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('jobapp:home'))
+        self.assertEqual(response.context['total_jobs'], 1)
+
+    def test_benchmark_command_rolls_back(self):
+        make_job(self.employer, self.category)
+        out = StringIO()
+        call_command('benchmark_home_page', users=20, jobs=30, requests=2, stdout=out)
+        self.assertIn('Home page, 20 users x 30 jobs', out.getvalue())
+        self.assertFalse(User.objects.filter(email__startswith='home-benchmark-').exists())
+        self.assertEqual(Job.objects.count(), 1)
+        self.assertEqual(SiteStats.load().total_jobs, 1)
+
+
+# Exercise the views themselves rather than the page cache in front of them
+@mock.patch('jobapp.middleware.PAGE_CACHE_VIEWS', ())
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        category = Category.objects.create(name='IT')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jobs = [make_job(employer, category, title=f'Job {i % 3}') for i in range(13)]
+
+    def walk(self, url, params):
+        seen, response = [], self.client.get(url, params)
+        while True:
+            page = response.context['page_obj']
+            seen.extend(job.id for job in page)
+            if not page.has_next():
+                return seen, page
+            response = self.client.get(f'{url}?{page.next_query}')
+
+    def test_pages_cover_every_job_once(self):
+        url = reverse('jobapp:job-list')
+        for sort_by in ('newest_first', 'oldest_first', 'title_asc'):
+            seen, _ = self.walk(url, {'sort_by': sort_by})
+            self.assertEqual(sorted(seen), sorted(job.id for job in self.jobs))
+        seen, _ = self.walk(url, {'sort_by': 'title_asc'})
+        titles = list(Job.objects.filter(id__in=seen).order_by('title', 'id').values_list('id', flat=True))
+        self.assertEqual(seen, titles)
+
+    def test_previous_page_and_filters_survive(self):
+        url = reverse('jobapp:search_result')
+        response = self.client.get(url, {'location': 'Nairobi'})
+        page = response.context['page_obj']
+        self.assertEqual(page.paginator.count, 13)
+        self.assertIn('location=Nairobi', page.next_query)
+
+        second = self.client.get(f'{url}?{page.next_query}').context['page_obj']
+        self.assertTrue(second.has_previous())
+        first_again = self.client.get(f'{url}?{second.previous_query}').context['page_obj']
+        self.assertEqual([j.id for j in first_again], [j.id for j in page])
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('jobapp:job-list'), {'after': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 12)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        tampered = (['not-a-date', 1], [{}, 1], [None, 1], ['2020-01-01T00:00:00+00:00', 'x'], [1, 10 ** 20])
+        for url, params in ((reverse('jobapp:job-list'), {}), (reverse('jobapp:search_result'), {'job_title_or_company_name': 'job'})):
+            first = [job.id for job in self.client.get(url, params).context['page_obj']]
+            for values in tampered:
+                response = self.client.get(url, {**params, 'after': encode_cursor(values)})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual([job.id for job in response.context['page_obj']], first)
+
+
+class SalaryRangeTests(TestCase):
+
+    def setUp(self):
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.category = Category.objects.create(name='IT')
+
+    def test_parse_salary(self):
+        self.assertEqual(parse_salary('$800 - $1200'), (800, 1200, 'USD', ''))
+        self.assertEqual(parse_salary('KES 50,000 per month'), (50000, 50000, 'KES', SalaryPeriod.MONTH))
+        self.assertEqual(parse_salary('40-60k/yr'), (40000, 60000, '', SalaryPeriod.YEAR))
+        self.assertEqual(parse_salary('Negotiable'), (None, None, '', ''))
+        # Beyond the columns' range
+        self.assertEqual(parse_salary('$500 - $99999999999999999999'), (500, 500, 'USD', ''))
+        self.assertEqual(parse_salary('99999999999999999999'), (None, None, '', ''))
+        self.assertEqual(parse_salary('10-9999999m'), (10, 10, '', ''))
+
+    def test_backfill_and_numeric_sort(self):
+        for salary in ('$900', '$1,200 - $1,500', '$80', 'Negotiable'):
+            make_job(self.employer, self.category, title=salary, salary=salary)
+        call_command('backfill_job_salaries', stdout=StringIO())
+
+        response = self.client.get(reverse('jobapp:job-list'), {'sort_by': 'salary_high_low'})
+        self.assertEqual([job.title for job in response.context['page_obj']], ['$1,200 - $1,500', '$900', '$80'])
+        response = self.client.get(reverse('jobapp:search_result'), {'min_salary': '1000'})
+        self.assertEqual([job.title for job in response.context['page_obj']], ['$1,200 - $1,500'])
+        for min_salary in ('\u00b2', '99999999999999999999', '-5'):
+            response = self.client.get(reverse('jobapp:search_result'), {'min_salary': min_salary})
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page_obj']), 4)
+
+    def test_job_form_fills_salary_columns(self):
+        form = JobForm(data={
+            'title': 'Dev', 'location': 'Nairobi', 'job_type': 'FT', 'category': self.category.id,
+            'salary': '$800 - $1200', 'description': 'Build', 'tags': 'python', 'company_name': 'Acme',
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+        form.instance.user = self.employer
+        job = form.save()
+        self.assertEqual((job.salary_min, job.salary_max, job.salary_currency), (800, 1200, 'USD'))
+
+
+class JobSearchTests(TestCase):
+
+    def setUp(self):
+        employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        category = Category.objects.create(name='IT')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.backend_job = make_job(employer, category, title='Backend Engineer', description='<p>Django APIs</p>')
+            self.backend_job.tags.add('python')
+            self.python_job = make_job(employer, category, title='Python Developer', location='Mombasa')
+            make_job(employer, category, title='Accountant', description='Python is a plus', job_type='PT')
+
+    def search(self, **params):
+        response = self.client.get(reverse('jobapp:search_result'), params)
+        return [job.title for job in response.context['page_obj']]
+
+    def test_ranks_title_matches_above_description(self):
+        self.assertEqual(self.search(job_title_or_company_name='python')[:2], ['Python Developer', 'Backend Engineer'])
+        self.assertEqual(self.search(job_title_or_company_name='python', job_type='PT'), ['Accountant'])
+        self.assertEqual(self.search(job_title_or_company_name='djang'), ['Backend Engineer'])
+        self.assertEqual(self.search(location='mombasa'), ['Python Developer'])
+
+    def test_index_follows_edits_and_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python_job.title = 'Golang Developer'
+            self.python_job.save()
+        self.assertEqual(self.search(job_title_or_company_name='golang'), ['Golang Developer'])
+
+        get_search_backend().clear()
+        # writing to the index directly bypasses the signals that invalidate cached results
+        job_cache.bump('tags')
+        self.assertEqual(self.search(job_title_or_company_name='golang'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search(job_title_or_company_name='golang'), ['Golang Developer'])
+
+    def test_benchmark_command_rolls_back(self):
+        out = StringIO()
+        call_command('benchmark_search', jobs=20, queries=4, stdout=out)
+        self.assertIn('IcontainsSearchBackend: median', out.getvalue())
+        self.assertIn('4 searches over 20 jobs', out.getvalue())
+        self.assertEqual(Job.objects.count(), 3)
+        self.assertEqual(self.search(job_title_or_company_name='python')[:2], ['Python Developer', 'Backend Engineer'])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class HotPathQueryPlanTests(TestCase):
+    """Every query the public and dashboard views run must stay index backed."""
+    tables = (
+        'jobapp_job', 'jobapp_applicant', 'jobapp_bookmarkjob', 'jobapp_jobrecommendation', 'account_userskill',
+    )
+
+    def setUp(self):
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.seeker = User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        self.category = Category.objects.create(name='IT')
+        self.job = make_job(self.employer, self.category, salary='$900')
+        set_salary_range(self.job)
+        self.job.save()
+
+    def full_scans(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        return [
+            step for step in plan
+            if any(step == f'SCAN {table}' or step.startswith(f'SCAN {table} ') and 'INDEX' not in step
+                   for table in self.tables)
+        ]
+
+    def assertIndexBacked(self, method, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            getattr(self.client, method)(url, params or {})
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if sql.startswith('SELECT') and any(f'"{table}"' in sql for table in self.tables):
+                self.assertEqual(self.full_scans(sql), [], f'{url} regressed to a full scan:\n{sql}')
+
+    def test_public_views(self):
+        self.assertIndexBacked('get', reverse('jobapp:home'))
+        for sort_by in JOB_SORT_ORDERINGS:
+            self.assertIndexBacked('get', reverse('jobapp:job-list'), {'sort_by': sort_by})
+        after = encode_cursor([self.job.created_at, self.job.id])
+        self.assertIndexBacked('get', reverse('jobapp:job-list'), {'after': after})
+        self.assertIndexBacked('get', reverse('jobapp:search_result'))
+        for facet, value in (('job_type', 'FT'), ('experience_level', 'SR'), ('work_arrangement', 'RM'),
+                             ('min_salary', '500')):
+            self.assertIndexBacked('get', reverse('jobapp:search_result'), {facet: value})
+        self.assertIndexBacked('get', reverse('jobapp:single-job', args=[self.job.id]))
+        for sort_by in JOB_SORT_ORDERINGS:
+            self.assertIndexBacked('get', reverse('api-v1:job-list'), {'sort_by': sort_by})
+        self.assertIndexBacked('get', reverse('api-v1:job-list'), {'job_type': 'FT', 'after': after})
+        self.assertIndexBacked('get', reverse('api-v1:job-detail', args=[self.job.id]))
+        self.assertIndexBacked('get', reverse('api-v1:tag-list'))
+
+    def test_seeker_views(self):
+        self.client.force_login(self.seeker)
+        JobRecommendation.objects.create(user=self.seeker, job=self.job, score=0.5)
+        self.assertIndexBacked('get', reverse('jobapp:home'))
+        self.assertIndexBacked('get', reverse('jobapp:apply-job', args=[self.job.id]))
+        self.assertIndexBacked('get', reverse('jobapp:bookmark-job', args=[self.job.id]))
+        self.assertIndexBacked('get', reverse('jobapp:single-job', args=[self.job.id]))
+        self.assertIndexBacked('get', reverse('jobapp:dashboard'))
+
+    def test_employer_views(self):
+        self.client.force_login(self.employer)
+        self.assertIndexBacked('get', reverse('jobapp:dashboard'))
+        self.assertIndexBacked('get', reverse('jobapp:applicants', args=[self.job.id]))
+        self.assertIndexBacked('get', reverse('jobapp:candidate-search'), {'skills': 'python, sql', 'location': 'nai'})
+
+
+class RelatedJobTests(TestCase):
+
+    def setUp(self):
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.category = Category.objects.create(name='IT')
+
+    def tagged_job(self, *tags, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = make_job(self.employer, self.category, **kwargs)
+            job.tags.add(*tags)
+        return job
+
+    def related_titles(self, job):
+        response = self.client.get(reverse('jobapp:single-job', args=[job.id]))
+        return [related.title for related in response.context['page_obj']]
+
+    def test_neighbours_follow_tags_and_closing(self):
+        job = self.tagged_job('python', 'django', title='Main')
+        close = self.tagged_job('python', 'django', title='Close match')
+        self.tagged_job('python', title='Loose match')
+        self.tagged_job('java', title='Unrelated')
+
+        self.assertEqual(self.related_titles(job), ['Close match', 'Loose match'])
+        self.assertEqual(self.related_titles(close), ['Main', 'Loose match'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            close.is_closed = True
+            close.save()
+        self.assertEqual(self.related_titles(job), ['Loose match'])
+        self.assertFalse(RelatedJob.objects.filter(job=close).exists())
+
+    def test_rebuild_matches_incremental(self):
+        jobs = [self.tagged_job('python', *extra) for extra in ([], ['django'], ['django', 'rest'])]
+        incremental = set(RelatedJob.objects.values_list('job_id', 'related_id', 'score'))
+        call_command('rebuild_related_jobs', stdout=StringIO())
+        self.assertEqual(set(RelatedJob.objects.values_list('job_id', 'related_id', 'score')), incremental)
+        # job, related count, related page, newest job change for the page cache's Last-Modified
+        with self.assertNumQueries(4):
+            self.related_titles(jobs[0])
+
+    def test_rebuild_drops_rows_of_closed_jobs(self):
+        jobs = [self.tagged_job('python', *extra) for extra in ([], ['django'], ['django', 'rest'])]
+        # Bulk updates send no signals, so the closed job's rows are left behind
+        Job.objects.filter(id=jobs[0].id).update(is_closed=True)
+        readable = []
+
+        def compute_chunk(job_ids):
+            # What the job pages read while the rebuild is under way
+            readable.append(RelatedJob.objects.filter(job=jobs[2]).exists())
+            return compute_related_rows(job_ids)
+
+        with mock.patch('jobapp.management.commands.rebuild_related_jobs._compute_chunk', compute_chunk):
+            call_command('rebuild_related_jobs', chunk_size=1, stdout=StringIO())
+        self.assertEqual(readable, [True, True])
+        self.assertEqual(
+            set(RelatedJob.objects.values_list('job_id', 'related_id')),
+            {(jobs[1].id, jobs[2].id), (jobs[2].id, jobs[1].id)},
+        )
+
+
+class RecommendationTests(TestCase):
+
+    def setUp(self):
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.category = Category.objects.create(name='IT')
+        self.seeker = User.objects.create_user(
+            'seeker@example.com', 'pass12345', role='employee', skills='Python, Django',
+            preferred_job_title='Backend developer', location='Nairobi', years_of_experience=4,
+            last_login=timezone.now(),
+        )
+        self.python_job = self.tagged_job('python', 'django', title='Backend Developer', experience_level='MD')
+        self.java_job = self.tagged_job('java', title='Java Engineer', location='Mombasa')
+        self.frontend_job = self.tagged_job('javascript', title='Frontend Developer')
+
+    def tagged_job(self, *tags, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = make_job(self.employer, self.category, description='<p>Join our team</p>', **kwargs)
+            job.tags.add(*tags)
+        return job
+
+    def recommended_jobs(self, user=None):
+        self.client.force_login(user or self.seeker)
+        return self.client.get(reverse('jobapp:home')).context['recommended_jobs']
+
+    def recommended(self, user=None):
+        return [job.title for job in self.recommended_jobs(user)]
+
+    def test_scores_are_cosine_similarities_best_first(self):
+        vectorizer = Vectorizer([profile_features('python', ''), profile_features('java', '')])
+        jobs = vectorizer.transform([profile_features('python', ''), profile_features('java', '')])
+        profiles = vectorizer.transform([profile_features('python, java', ''), profile_features('cobol', '')])
+        scores = profiles.dot(jobs.T.tocsr())
+        rows, columns, best = top_per_row(scores, 1)
+        self.assertEqual((rows.tolist(), columns.tolist()), ([0], [0]))
+        self.assertAlmostEqual(float(best[0]), 2 ** -0.5, places=5)
+        self.assertEqual(experience_level(0), 'EN')
+        self.assertEqual(experience_level(30), 'EX')
+
+    def test_top_per_row_ranks_sparse_rows(self):
+        scores = sparse.csr_matrix(np.array([
+            [0.2, 0, 0.5, 0.2, 0.9],
+            [0, 0, 0, 0, 0],
+            [0.1, 0.3, 0, 0, 0],
+        ], dtype=np.float32))
+        rows, columns, best = top_per_row(scores, 3, (np.array([0]), np.array([4])))
+        self.assertEqual(list(zip(rows.tolist(), columns.tolist())), [(0, 2), (0, 0), (0, 3), (2, 1), (2, 0)])
+        self.assertEqual(best.tolist(), np.array([0.5, 0.2, 0.2, 0.3, 0.1], dtype=np.float32).tolist())
+        self.assertEqual(len(top_per_row(scores, 0)[0]), 0)
+
+    def test_location_and_experience_only_boost_matching_jobs(self):
+        self.tagged_job('python', 'django', title='Backend Developer', location='Mombasa')
+        self.seeker.location = 'Mombasa, Kenya'
+        self.seeker.save()
+        cobol = User.objects.create_user(
+            'cobol@example.com', 'pass12345', role='employee', skills='COBOL', location='Mombasa',
+            last_login=timezone.now(),
+        )
+        call_command('rebuild_recommendations', stdout=StringIO())
+        self.assertEqual(
+            [(job.title, job.location) for job in self.recommended_jobs()][:2],
+            [('Backend Developer', 'Mombasa'), ('Backend Developer', 'Nairobi')],
+        )
+        self.assertEqual(self.recommended(cobol), [])
+
+    def test_rebuild_ranks_matching_jobs_and_skips_applied_ones(self):
+        call_command('rebuild_recommendations', stdout=StringIO())
+        self.assertEqual(self.recommended(), ['Backend Developer', 'Frontend Developer'])
+
+        Applicant.objects.create(user=self.seeker, job=self.python_job)
+        call_command('rebuild_recommendations', stdout=StringIO())
+        self.assertEqual(self.recommended(), ['Frontend Developer'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.frontend_job.is_closed = True
+            self.frontend_job.save()
+        self.assertEqual(self.recommended(), [])
+
+    def test_inactive_and_empty_profiles_get_nothing(self):
+        idle = User.objects.create_user(
+            'idle@example.com', 'pass12345', role='employee', skills='Python',
+            last_login=timezone.now() - timedelta(days=365),
+        )
+        blank = User.objects.create_user('blank@example.com', 'pass12345', role='employee', last_login=timezone.now())
+        JobRecommendation.objects.create(user=idle, job=self.java_job, score=1)
+        call_command('rebuild_recommendations', stdout=StringIO())
+        self.assertEqual(self.recommended(idle), [])
+        self.assertEqual(self.recommended(blank), [])
+
+    def test_incremental_run_merges_changed_jobs(self):
+        call_command('rebuild_recommendations', stdout=StringIO())
+        self.tagged_job('python', 'django', title='Senior Backend Developer Python')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python_job.title = 'Office Manager'
+            self.python_job.save()
+            self.python_job.tags.set('admin')
+
+        out = StringIO()
+        call_command('rebuild_recommendations', incremental=True, stdout=out)
+        self.assertIn('from 2 jobs', out.getvalue())
+        self.assertEqual(self.recommended(), ['Senior Backend Developer Python', 'Frontend Developer'])
+        self.assertEqual(RecommendationRun.objects.filter(incremental=True).count(), 1)
+
+    def test_home_page_adds_one_query(self):
+        call_command('rebuild_recommendations', stdout=StringIO())
+        self.client.force_login(self.seeker)
+        SiteStats.load()
+        # session, user, jobs, company logo digests, recommendations, applied / saved jobs
+        with self.assertNumQueries(6):
+            self.client.get(reverse('jobapp:home'))
+
+    def test_benchmark_command_writes_nothing(self):
+        out = StringIO()
+        call_command('benchmark_recommendations', jobs=50, users=120, batch_size=50, stdout=out)
+        self.assertIn('Scoring 120 users x 50 jobs', out.getvalue())
+        self.assertFalse(JobRecommendation.objects.exists())
+
+
+class UserJobStateTests(TestCase):
+
+    def setUp(self):
+        visit_buffer.clear()
+        cache.clear()
+        employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.seeker = User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        category = Category.objects.create(name='IT')
+        self.jobs = [make_job(employer, category, title=f'Job {i}') for i in range(12)]
+        Applicant.objects.create(user=self.seeker, job=self.jobs[0])
+        BookmarkJob.objects.create(user=self.seeker, job=self.jobs[1])
+        self.client.force_login(self.seeker)
+
+    def test_listing_badges_cost_one_query(self):
+        self.client.get(reverse('jobapp:job-list'))
+        cache.clear()
+        job_cache.clear()
+        # session, user, jobs, applied/saved ids
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('jobapp:job-list'))
+        self.assertContains(response, '>Applied</li>', count=1)
+        self.assertContains(response, '>Saved</li>', count=1)
+        # jobs and ids are served from the caches on the next request
+        with self.assertNumQueries(2):
+            self.client.get(reverse('jobapp:job-list'))
+
+    def test_writes_invalidate_cached_ids(self):
+        self.client.get(reverse('jobapp:job-list'))
+        self.client.get(reverse('jobapp:apply-job', args=[self.jobs[2].id]))
+        response = self.client.get(reverse('jobapp:job-list'))
+        self.assertContains(response, '>Applied</li>', count=2)
+
+
+class JobCardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.seeker = User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        category = Category.objects.create(name='IT')
+        self.jobs = [make_job(employer, category, title=f'Job {i}') for i in range(3)]
+        Applicant.objects.create(user=self.seeker, job=self.jobs[0])
+
+    def render(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return render_cards(
+            Job.objects.order_by('id'), 'jobapp/cards/job_block.html', 'jobapp/cards/job_state_item.html', request,
+        )
+
+    def test_cards_are_rendered_once_per_job_version(self):
+        anonymous = self.render(AnonymousUser())
+        self.assertEqual(anonymous.count('<h3>'), 3)
+        with mock.patch('jobapp.cards.get_template', wraps=get_template) as loader:
+            self.assertEqual(self.render(AnonymousUser()), anonymous)
+        loader.assert_not_called()
+
+        self.jobs[1].title = 'Renamed'
+        self.jobs[1].save()
+        self.assertIn('<h3>Renamed</h3>', self.render(AnonymousUser()))
+
+    def test_badges_are_not_cached(self):
+        self.assertIn('>Applied</li>', self.render(self.seeker))
+        self.assertNotIn('Applied', self.render(AnonymousUser()))
+        self.assertNotIn(JOB_STATE_MARKER, self.render(self.seeker))
+
+    def test_benchmark_command_rolls_back(self):
+        out = StringIO()
+        call_command('benchmark_job_cards', cards=2, repeat=2, stdout=out)
+        self.assertIn('cards, cached:', out.getvalue())
+        self.assertEqual(Job.objects.count(), 3)
+        self.assertFalse(User.objects.filter(email__startswith='cards-benchmark-').exists())
+
+
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        job_cache.clear()
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.category = Category.objects.create(name='IT')
+        self.job = make_job(self.employer, self.category, title='First')
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        url = reverse('jobapp:job-list')
+        first = self.client.get(url, {'sort_by': 'newest_first', 'location': ''})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'location': '', 'sort_by': 'newest_first'})
+            self.client.get(url, {'sort_by': 'newest_first'})
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertIn('no-cache', second['Cache-Control'])
+
+    def test_conditional_requests_get_not_modified(self):
+        url = reverse('jobapp:single-job', args=[self.job.id])
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+            not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+
+    def test_job_changes_invalidate_pages(self):
+        url = reverse('jobapp:home')
+        response = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.title = 'Renamed'
+            self.job.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.is_closed = True
+            self.job.save()
+        self.assertNotContains(self.client.get(url), 'Renamed')
+
+    def test_validators_follow_job_data(self):
+        url = reverse('jobapp:job-list')
+        first = self.client.get(url)
+        self.assertEqual(first['Last-Modified'], http_date(int(self.job.updated_at.timestamp())))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second = make_job(self.employer, self.category, title='Second')
+        added = self.client.get(url)
+        self.assertEqual(added['Last-Modified'], http_date(int(second.updated_at.timestamp())))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        removed = self.client.get(url, HTTP_IF_NONE_MATCH=added['ETag'])
+        self.assertEqual(removed.status_code, 200)
+        self.assertNotEqual(removed['ETag'], added['ETag'])
+
+    def test_sessions_and_other_pages_bypass_cache(self):
+        url = reverse('jobapp:job-list')
+        self.client.get(url)
+        self.client.force_login(self.employer)
+        response = self.client.get(url)
+        self.assertNotIn('ETag', response)
+        self.assertIsNotNone(response.context)
+
+        self.client.logout()
+        self.client.get(reverse('jobapp:contact'))
+        self.assertNotIn('ETag', self.client.get(reverse('jobapp:contact')))
+
+
+class EmployeeDashboardTests(TestCase):
+
+    def setUp(self):
+        visit_buffer.clear()
+        employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.seeker = User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        self.category = Category.objects.create(name='IT')
+        self.employer = employer
+        self.client.force_login(self.seeker)
+
+    def add_rows(self, count):
+        for i in range(count):
+            job = make_job(self.employer, self.category, title=f'Job {i}')
+            Applicant.objects.create(user=self.seeker, job=job)
+            BookmarkJob.objects.create(user=self.seeker, job=job)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        url = reverse('jobapp:dashboard')
+        self.add_rows(3)
+        self.client.get(url)
+        # session, user, count, rows
+        with self.assertNumQueries(4):
+            self.client.get(url)
+        self.add_rows(30)
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['page_obj']), 10)
+
+    def test_only_requested_tab_is_rendered(self):
+        job = make_job(self.employer, self.category, title='Applied Only')
+        Applicant.objects.create(user=self.seeker, job=job)
+        response = self.client.get(reverse('jobapp:dashboard'))
+        self.assertEqual(response.context['tab'], 'saved')
+        self.assertNotContains(response, 'Applied Only')
+
+        response = self.client.get(
+            reverse('jobapp:dashboard'), {'tab': 'applied'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertTemplateUsed(response, 'jobapp/dashboard_tab.html')
+        self.assertTemplateNotUsed(response, 'jobapp/dashboard.html')
+        self.assertContains(response, 'Applied Only')
+
+    def test_tabs_paginate_independently(self):
+        self.add_rows(12)
+        response = self.client.get(reverse('jobapp:dashboard'), {'tab': 'applied', 'page': 2})
+        self.assertEqual(response.context['page_obj'].number, 2)
+        self.assertEqual(len(response.context['page_obj']), 2)
+        self.assertContains(response, '?tab=applied&page=1')
+
+
+class ApplicantListTests(TestCase):
+
+    def setUp(self):
+        visit_buffer.clear()
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.job = make_job(self.employer, Category.objects.create(name='IT'))
+        for i, years in enumerate([3, None, 10, 1]):
+            seeker = User.objects.create_user(
+                f'seeker{i}@example.com', 'pass12345', role='employee',
+                first_name=f'Seeker{i}', years_of_experience=years,
+            )
+            Applicant.objects.create(user=seeker, job=self.job)
+        self.client.force_login(self.employer)
+
+    def test_one_joined_query_for_the_page(self):
+        url = reverse('jobapp:applicants', args=[self.job.id])
+        self.client.get(url)
+        # session, user, job, count, applicants joined with users
+        with self.assertNumQueries(5):
+            response = self.client.get(url, {'sort_by': 'most_experienced'})
+        names = [applicant.user.first_name for applicant in response.context['page_obj']]
+        self.assertEqual(names, ['Seeker2', 'Seeker0', 'Seeker3', 'Seeker1'])
+
+    def test_other_employers_cannot_list_applicants(self):
+        other = User.objects.create_user('other@example.com', 'pass12345', role='employer')
+        self.client.force_login(other)
+        response = self.client.get(reverse('jobapp:applicants', args=[self.job.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_streaming_exports(self):
+        response = self.client.get(
+            reverse('jobapp:export-applicants', args=[self.job.id, 'csv']), {'sort_by': 'oldest'},
+        )
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['first_name', 'last_name', 'email'])
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[1].startswith('Seeker0,'))
+
+        response = self.client.get(reverse('jobapp:export-applicants', args=[self.job.id, 'jsonl']))
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows[0]['first_name'], 'Seeker3')
+        self.assertIsNone(rows[2]['years_of_experience'])
+
+        response = self.client.get(reverse('jobapp:export-applicants', args=[self.job.id, 'xml']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_csv_export_neutralises_formulas(self):
+        User.objects.filter(first_name='Seeker0').update(
+            first_name='=HYPERLINK("http://example.com")', last_name='-2+3', preferred_job_title='@SUM(A1)',
+        )
+        response = self.client.get(
+            reverse('jobapp:export-applicants', args=[self.job.id, 'csv']), {'sort_by': 'oldest'},
+        )
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[1][:2], ['\'=HYPERLINK("http://example.com")', "'-2+3"])
+        self.assertEqual(rows[1][4:6], ["'@SUM(A1)", '3'])
+
+        response = self.client.get(reverse('jobapp:export-applicants', args=[self.job.id, 'jsonl']))
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows[-1]['first_name'], '=HYPERLINK("http://example.com")')
+
+
+class CandidateSearchTests(TestCase):
+
+    def setUp(self):
+        visit_buffer.clear()
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.seekers = [
+            User.objects.create_user(
+                f'seeker{i}@example.com', 'pass12345', role='employee', first_name=f'Seeker{i}',
+                skills=skills, location=location, preferred_job_title=title, years_of_experience=years,
+            )
+            for i, (skills, location, title, years) in enumerate([
+                ('Python, Django', 'Nairobi, Kenya', 'Backend Developer', 4),
+                ('python; SQL\nDjango', 'Mombasa', 'Data Analyst', 8),
+                ('Excel, SQL', 'nairobi', 'Data Analyst', None),
+                ('  PYTHON  ,  Machine   Learning ', 'Kisumu', 'Backend Engineer', 2),
+            ])
+        ]
+        self.client.force_login(self.employer)
+
+    def search(self, **params):
+        response = self.client.get(reverse('jobapp:candidate-search'), params)
+        return [candidate.first_name for candidate in response.context['page_obj']]
+
+    def test_skills_are_normalised_on_save(self):
+        self.assertEqual(parse_skills(' Python,, python ;Machine  Learning\n'), ['python', 'machine learning'])
+        self.assertEqual(
+            sorted(self.seekers[3].skill_tags.values_list('name', flat=True)), ['machine learning', 'python'],
+        )
+        self.assertEqual(Skill.objects.get(name='python').user_count, 3)
+
+        seeker = self.seekers[0]
+        seeker.skills = 'Go, Django'
+        seeker.save()
+        self.assertEqual(sorted(seeker.skill_tags.values_list('name', flat=True)), ['django', 'go'])
+        self.assertEqual(Skill.objects.get(name='python').user_count, 2)
+
+        self.seekers[1].delete()
+        User.objects.filter(pk=self.seekers[3].pk).delete()
+        counts = dict(Skill.objects.values_list('name', 'user_count'))
+        self.assertEqual((counts['python'], counts['django'], counts['sql'], counts['machine learning']), (0, 1, 1, 0))
+
+    def test_search_filters(self):
+        self.assertEqual(self.search(), ['Seeker3', 'Seeker2', 'Seeker1', 'Seeker0'])
+        self.assertEqual(self.search(skills='django, PYTHON'), ['Seeker1', 'Seeker0'])
+        self.assertEqual(self.search(skills='python, cobol'), [])
+        self.assertEqual(self.search(location='Nairobi'), ['Seeker2', 'Seeker0'])
+        self.assertEqual(self.search(job_title='backend'), ['Seeker3', 'Seeker0'])
+        self.assertEqual(self.search(skills='sql', min_years=5), ['Seeker1'])
+        self.assertEqual(self.search(max_years=4, sort_by='most_experienced'), ['Seeker0', 'Seeker3'])
+        self.assertEqual(self.search(sort_by='most_experienced'), ['Seeker1', 'Seeker0', 'Seeker3'])
+
+    def test_cursor_pages(self):
+        with mock.patch('jobapp.views.CANDIDATES_PAGE_SIZE', 2):
+            response = self.client.get(reverse('jobapp:candidate-search'), {'skills': 'python'})
+            page = response.context['page_obj']
+            self.assertEqual([candidate.first_name for candidate in page], ['Seeker3', 'Seeker1'])
+            self.assertEqual(page.paginator.count, 3)
+            next_page = self.client.get(f"{reverse('jobapp:candidate-search')}?{page.next_query}")
+        self.assertEqual([candidate.first_name for candidate in next_page.context['page_obj']], ['Seeker0'])
+
+    def test_query_budget(self):
+        url = reverse('jobapp:candidate-search')
+        self.client.get(url)
+        # session, user, skills, page; the count only runs when there are other pages
+        with self.assertNumQueries(4):
+            self.client.get(url, {'skills': 'python, django', 'location': 'nai'})
+
+    def test_only_employers(self):
+        self.client.force_login(self.seekers[0])
+        response = self.client.get(reverse('jobapp:candidate-search'))
+        self.assertRedirects(response, reverse('account:login'), fetch_redirect_response=False)
+
+    def test_backfill(self):
+        UserSkill.objects.all().delete()
+        Skill.objects.update(user_count=0)
+        call_command('backfill_user_skills', batch_size=3, stdout=StringIO())
+        self.assertEqual(UserSkill.objects.count(), 9)
+        self.assertEqual(Skill.objects.get(name='sql').user_count, 2)
+        self.assertEqual(self.search(skills='sql, excel'), ['Seeker2'])
+
+
+class JobAlertTests(TestCase):
+
+    def setUp(self):
+        visit_buffer.clear()
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.category = Category.objects.create(name='IT')
+        self.seekers = [
+            User.objects.create_user(f'seeker{i}@example.com', 'pass12345', role='employee', first_name=f'Seeker{i}')
+            for i in range(4)
+        ]
+
+    def save_search(self, user, **fields):
+        return SavedSearch.objects.create(user=user, **fields)
+
+    def test_anchor_is_the_most_selective_condition(self):
+        search = self.save_search(
+            self.seekers[0], job_title_or_company_name='Python Developer', location='Nairobi', job_type='FT',
+        )
+        self.assertEqual(search.anchor, 't:developer')
+        self.assertEqual(self.save_search(self.seekers[0], location='Nairobi', job_type='FT').anchor, 'l:nairobi')
+        self.assertEqual(self.save_search(self.seekers[0], job_type='FT', experience_level='SR').anchor, 'e:SR')
+        self.assertEqual(self.save_search(self.seekers[0]).anchor, MATCH_ALL)
+
+    def test_matching(self):
+        job = make_job(
+            self.employer, self.category, title='Senior Python Developer', location='Nairobi, Kenya',
+            experience_level='SR', work_arrangement='RM',
+        )
+        self.save_search(self.seekers[0], job_title_or_company_name='pyth dev', location='nairobi')
+        self.save_search(self.seekers[1], job_title_or_company_name='python', job_type='PT')
+        self.save_search(self.seekers[2], work_arrangement='RM', experience_level='SR')
+        self.save_search(self.seekers[3], job_title_or_company_name='acme java')
+        self.save_search(self.seekers[3], location='Mombasa')
+        self.assertEqual(
+            sorted(match_jobs([alert_job(job)])), [(self.seekers[0].id, job.id), (self.seekers[2].id, job.id)],
+        )
+
+    def test_published_at(self):
+        job = make_job(self.employer, self.category, is_published=False)
+        self.assertIsNone(job.published_at)
+        job.is_published = True
+        job.save()
+        published_at = job.published_at
+        self.assertIsNotNone(published_at)
+        job.save()
+        self.assertEqual(job.published_at, published_at)
+
+    def test_digests(self):
+        first = make_job(self.employer, self.category, title='Python Developer')
+        second = make_job(self.employer, self.category, title='Django Developer')
+        self.save_search(self.seekers[0], job_title_or_company_name='developer')
+        self.save_search(self.seekers[0], job_title_or_company_name='python')
+        self.save_search(self.seekers[1], job_title_or_company_name='java')
+
+        call_command('send_job_alerts', batch_size=1, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['seeker0@example.com'])
+        self.assertEqual(message.subject, '2 new jobs matching your saved searches')
+        self.assertLess(message.body.index('Django Developer'), message.body.index('Python Developer'))
+        self.assertIn(reverse('jobapp:single-job', args=[first.id]), message.body)
+        run = JobAlertRun.objects.get()
+        self.assertEqual((run.jobs, run.matches, run.emails), (2, 3, 1))
+
+        # Only jobs published since the previous run
+        mail.outbox = []
+        make_job(self.employer, self.category, title='Java Developer')
+        second.save()
+        call_command('send_job_alerts', stdout=StringIO())
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['seeker0@example.com', 'seeker1@example.com'])
+        self.assertTrue(all(message.subject.startswith('1 new job ') for message in mail.outbox))
+
+    def test_save_and_delete_searches(self):
+        self.client.force_login(self.seekers[0])
+        params = {'job_title_or_company_name': 'python', 'location': '', 'job_type': 'FT'}
+        response = self.client.post(reverse('jobapp:save-search'), params)
+        self.assertRedirects(
+            response, reverse('jobapp:search_result') + '?job_title_or_company_name=python&location=&job_type=FT',
+            fetch_redirect_response=False,
+        )
+        self.client.post(reverse('jobapp:save-search'), params)
+        search = SavedSearch.objects.get()
+        self.assertEqual((search.job_title_or_company_name, search.job_type), ('python', 'FT'))
+
+        response = self.client.get(reverse('jobapp:search_result'), {'job_type': 'PT'})
+        self.assertContains(response, 'name="job_type" value="PT"')
+        response = self.client.get(reverse('jobapp:saved-searches'))
+        self.assertContains(response, 'Full time')
+
+        self.client.force_login(self.seekers[1])
+        response = self.client.post(reverse('jobapp:delete-saved-search', args=[search.id]))
+        self.assertEqual(response.status_code, 403)
+        self.client.force_login(self.seekers[0])
+        self.client.post(reverse('jobapp:delete-saved-search', args=[search.id]))
+        self.assertFalse(SavedSearch.objects.exists())
+
+    def test_benchmark_command_rolls_back(self):
+        jobs = Job.objects.count()
+        out = StringIO()
+        call_command('benchmark_job_alerts', searches=50, jobs=3, sample=5, stdout=out)
+        self.assertIn('Matching 3 jobs x 50 saved searches', out.getvalue())
+        self.assertFalse(SavedSearch.objects.exists())
+        self.assertEqual(Job.objects.count(), jobs)
+        self.assertFalse(User.objects.filter(email__startswith='alerts-benchmark-').exists())
+
+
+class ApiTests(TestCase):
+
+    def setUp(self):
+        visit_buffer.clear()
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.category = Category.objects.create(name='IT')
+        # The search index is written on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jobs = [
+                make_job(self.employer, self.category, title=title, job_type=job_type, salary=salary)
+                for title, job_type, salary in (
+                    ('Python Developer', 'FT', '$900'), ('Django Developer', 'PT', ''), ('Accountant', 'FT', '$500'),
+                )
+            ]
+            for job in self.jobs:
+                set_salary_range(job)
+                job.save()
+            self.jobs[0].tags.add('python', 'django')
+            self.jobs[1].tags.add('django')
+            make_job(self.employer, self.category, title='Draft', is_published=False)
+
+    def get(self, name, *args, **params):
+        return self.client.get(reverse(f'api-v1:{name}', args=args), params)
+
+    def test_job_list(self):
+        response = self.get('job-list')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()
+        self.assertEqual([job['title'] for job in data['results']], ['Accountant', 'Django Developer', 'Python Developer'])
+        self.assertEqual(set(data['results'][0]), set(api.DEFAULT_LIST_FIELDS))
+        self.assertEqual(data['results'][2]['tags'], ['django', 'python'])
+        self.assertEqual(data['results'][2]['salary_max'], 900)
+        self.assertTrue(data['results'][2]['url'].endswith(reverse('jobapp:single-job', args=[self.jobs[0].id])))
+        self.assertIsNone(data['next'])
+
+    def test_filters_and_sparse_fields(self):
+        data = self.get('job-list', job_title_or_company_name='developer', job_type='FT', fields='id,title').json()
+        self.assertEqual(data['results'], [{'id': self.jobs[0].id, 'title': 'Python Developer'}])
+        data = self.get('job-list', sort_by='salary_low_high', fields='title').json()
+        self.assertEqual([job['title'] for job in data['results']], ['Accountant', 'Python Developer'])
+        data = self.get('job-list', min_salary='600', fields='title').json()
+        self.assertEqual(data['results'], [{'title': 'Python Developer'}])
+
+        response = self.get('job-list', fields='id,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Unknown fields: password.'})
+        self.assertEqual(self.get('job-list', limit='500').status_code, 400)
+        self.assertEqual(self.get('job-list', limit='\u00b2').status_code, 400)
+        response = self.get('job-list', min_salary='\u00b2')
+        self.assertEqual(response.json(), {'error': 'min_salary must be a whole number.'})
+        self.assertEqual(self.get('job-list', min_salary='99999999999999999999').json()['results'], [])
+        for values in (['not-a-date', 1], [{}, 1], [None, 1], ['2020-01-01T00:00:00+00:00', 'x'], [1, 10 ** 20]):
+            response = self.get('job-list', after=encode_cursor(values))
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {'error': 'after is not a valid cursor.'})
+        self.assertEqual(self.get('job-list', before='not-a-cursor').status_code, 400)
+
+    def test_cursor_pages(self):
+        data = self.get('job-list', limit='2', fields='title', job_type='FT').json()
+        self.assertEqual([job['title'] for job in data['results']], ['Accountant', 'Python Developer'])
+        self.assertIsNone(data['next'])
+        data = self.get('job-list', limit='2', fields='title').json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIn('fields=title', data['next'])
+        next_page = self.client.get(data['next']).json()
+        self.assertEqual(next_page['results'], [{'title': 'Python Developer'}])
+        self.assertIsNone(next_page['next'])
+        self.assertEqual(self.client.get(next_page['previous']).json()['results'], data['results'])
+
+    def test_job_detail(self):
+        data = self.get('job-detail', self.jobs[0].id).json()
+        self.assertEqual(set(data), set(api.DEFAULT_DETAIL_FIELDS))
+        self.assertEqual(data['description'], 'Build things')
+        self.assertEqual(data['category'], self.category.id)
+        self.assertEqual(self.get('job-detail', self.jobs[0].id, fields='title').json(), {'title': 'Python Developer'})
+        draft = Job.objects.get(title='Draft')
+        self.assertEqual(self.get('job-detail', draft.id).status_code, 404)
+        self.assertEqual(self.client.post(reverse('api-v1:job-detail', args=[self.jobs[0].id])).status_code, 405)
+
+    def test_categories_and_tags(self):
+        self.assertEqual(self.get('category-list').json(), {'results': [{'id': self.category.id, 'name': 'IT'}]})
+        self.assertEqual(self.get('tag-list').json(), {'results': [
+            {'name': 'django', 'slug': 'django', 'jobs': 2}, {'name': 'python', 'slug': 'python', 'jobs': 1},
+        ]})
+        self.jobs[1].is_closed = True
+        self.jobs[1].save()
+        self.assertEqual(self.get('tag-list').json()['results'][0]['jobs'], 1)
+
+    def test_etags(self):
+        response = self.get('job-list')
+        etag = response['ETag']
+        response = self.client.get(reverse('api-v1:job-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.jobs[2].title = 'Senior Accountant'
+        self.jobs[2].save()
+        self.assertEqual(self.client.get(reverse('api-v1:job-list'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_query_budgets(self):
+        for name, args, params, budget in (
+            ('job-list', (), {}, 2),  # page, tags
+            ('job-list', (), {'fields': 'id,title', 'job_type': 'FT'}, 1),
+            ('job-list', (), {'job_title_or_company_name': 'developer', 'location': 'nairobi'}, 2),
+            ('job-detail', (self.jobs[0].id,), {}, 2),  # job, tags
+            ('category-list', (), {}, 1),
+            ('tag-list', (), {}, 1),
+        ):
+            job_cache.bump('jobs', 'tags', 'categories')
+            with self.assertNumQueries(budget):
+                self.get(name, *args, **params)
+            # and none once cached
+            with self.assertNumQueries(0):
+                self.get(name, *args, **params)
+
+    def test_fallback_encoder(self):
+        data = {'created_at': self.jobs[0].created_at, 'last_date': timezone.now().date(), 'title': 'Python'}
+        with mock.patch('jobapp.api.orjson', None):
+            fallback = api.dumps(data)
+        self.assertEqual(json.loads(fallback), json.loads(api.dumps(data)))
+
+
+class IdempotentApplyTests(TestCase):
+
+    def setUp(self):
+        employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.seeker = User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        self.job = make_job(employer, Category.objects.create(name='IT'))
+        self.client.force_login(self.seeker)
+
+    def test_second_apply_is_reported_not_inserted(self):
+        url = reverse('jobapp:apply-job', args=[self.job.id])
+        response = self.client.get(url)
+        self.assertEqual(str(list(get_messages(response.wsgi_request))[-1]), 'You have successfully applied for this job!')
+        response = self.client.get(url)
+        self.assertEqual(str(list(get_messages(response.wsgi_request))[-1]), 'You have already applied for this job!')
+        self.assertEqual(Applicant.objects.filter(user=self.seeker, job=self.job).count(), 1)
+
+    def test_apply_is_a_single_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(add_user_job(Applicant, self.seeker.pk, self.job.id))
+        self.assertEqual(len(queries), 1)
+        self.assertFalse(add_user_job(Applicant, self.seeker.pk, self.job.id))
+        self.assertFalse(add_user_job(BookmarkJob, self.seeker.pk, self.job.id + 100))
+        self.assertTrue(add_user_job(BookmarkJob, self.seeker.pk, self.job.id))
+
+    def test_unknown_job(self):
+        response = self.client.get(reverse('jobapp:apply-job', args=[self.job.id + 100]))
+        self.assertRedirects(response, reverse('jobapp:job-list'))
+        response = self.client.get(reverse('jobapp:bookmark-job', args=[self.job.id + 100]))
+        self.assertEqual(response.status_code, 404)
+
+
+class ConcurrentApplyTests(TransactionTestCase):
+
+    def test_simultaneous_applies_create_one_row(self):
+        employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        seeker = User.objects.create_user('seeker@example.com', 'pass12345', role='employee')
+        job = make_job(employer, Category.objects.create(name='IT'))
+        start = threading.Barrier(20)
+
+        def apply(_):
+            try:
+                start.wait()
+            except threading.BrokenBarrierError:
+                pass
+            began = time.monotonic()
+            try:
+                return add_user_job(Applicant, seeker.pk, job.id), time.monotonic() - began
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            results = list(pool.map(apply, range(200)))
+
+        self.assertEqual(sum(created for created, _ in results), 1)
+        self.assertEqual(Applicant.objects.filter(user=seeker, job=job).count(), 1)
+        self.assertLess(max(elapsed for _, elapsed in results), 5)
+
+
+@mock.patch('jobapp.middleware.PAGE_CACHE_VIEWS', ())
+class JobCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        job_cache.clear()
+        self.employer = User.objects.create_user('boss@example.com', 'pass12345', role='employer')
+        self.category = Category.objects.create(name='IT')
+
+    def test_local_lru_is_bounded_and_expires(self):
+        lru = LocalLRU(2)
+        lru.set('a', 1, 60)
+        lru.set('b', 2, 60)
+        lru.get('a')
+        lru.set('c', 3, 60)
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (1, None, 3))
+        lru.set('d', 4, -1)
+        self.assertIsNone(lru.get('d'))
+
+    def test_levels_and_generations(self):
+        # two processes sharing L2; the second re-reads generations every time
+        first, second = JobCache(), JobCache(generation_ttl=0)
+        compute = mock.Mock(side_effect=lambda: ['rows'])
+        self.assertEqual(first.get_or_set(('jobs',), 'key', compute), ['rows'])
+        self.assertEqual(first.get_or_set(('jobs',), 'key', compute), ['rows'])
+        self.assertEqual(second.get_or_set(('jobs',), 'key', compute), ['rows'])
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(first.stats()['jobs'], {'l1_hits': 1, 'l2_hits': 0, 'misses': 1})
+        self.assertEqual(second.stats()['jobs'], {'l1_hits': 0, 'l2_hits': 1, 'misses': 0})
+
+        first.bump('categories')
+        second.get_or_set(('jobs',), 'key', compute)
+        self.assertEqual(compute.call_count, 1)
+        first.bump('jobs')
+        second.get_or_set(('jobs',), 'key', compute)
+        self.assertEqual(compute.call_count, 2)
+
+    def test_model_changes_invalidate_listings(self):
+        make_job(self.employer, self.category, title='First')
+        url = reverse('jobapp:job-list')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual([job.title for job in response.context['page_obj']], ['First'])
+
+        job = make_job(self.employer, self.category, title='Second')
+        response = self.client.get(url)
+        self.assertEqual([job.title for job in response.context['page_obj']], ['Second', 'First'])
+        job.tags.add('python')
+        self.assertEqual(job_cache.stats()['jobs']['misses'], 2)
+
+        self.client.get(reverse('jobapp:search_result'), {'job_title_or_company_name': 'python'})
+        self.client.get(reverse('jobapp:search_result'), {'job_title_or_company_name': 'python'})
+        self.assertEqual(job_cache.stats()['tags']['l1_hits'], 1)
+        job.tags.remove('python')
+        self.client.get(reverse('jobapp:search_result'), {'job_title_or_company_name': 'python'})
+        self.assertEqual(job_cache.stats()['tags']['misses'], 2)
+
+    def test_category_changes_invalidate_category_list(self):
+        self.assertEqual([c.name for c in cached_categories()], ['IT'])
+        Category.objects.create(name='Finance')
+        self.assertEqual(sorted(c.name for c in cached_categories()), ['Finance', 'IT'])
+
+    def test_stats_view_is_staff_only(self):
+        url = reverse('jobapp:cache-stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_superuser('admin@example.com', 'pass12345'))
+        self.assertEqual(self.client.get(url).json()['jobs'], {'l1_hits': 0, 'l2_hits': 0, 'misses': 0})
+
+
+class WarmupTests(TestCase):
+
+    def test_every_template_compiles(self):
+        names = list(template_names())
+        self.assertIn('base.html', names)
+        self.assertIn('jobapp/cards/job_block.html', names)
+        self.assertIn('account/login.html', names)
+        with mock.patch('jobapp.warmup.logger') as logger:
+            timings = warm_up()
+        logger.warning.assert_not_called()
+        self.assertEqual(timings['templates'][0], len(names))
+        self.assertGreater(timings['urls'][0], 0)
+        self.assertIs(timings['caches'][0], True)
+
+    def test_command_reports_what_it_did(self):
+        out = StringIO()
+        call_command('warmup', stdout=out)
+        self.assertIn(f'{len(list(template_names()))} templates', out.getvalue())
+
+    def test_benchmark_command_measures_first_requests(self):
+        out = StringIO()
+        call_command('benchmark_warmup', first_request=reverse('jobapp:about'), warm=True, stdout=out)
+        timings = json.loads(out.getvalue())
+        self.assertEqual(set(timings), {'warm_up', 'first', 'second'})
+        self.assertGreater(timings['warm_up'], 0)
+
+
+class StaticFilesTests(TestCase):
+
+    def setUp(self):
+        source, self.root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, self.root)
+        os.makedirs(os.path.join(source, 'css'))
+        self.css = b'body { color: #123456; }\n' * 200
+        with open(os.path.join(source, 'css', 'site.css'), 'wb') as css:
+            css.write(self.css)
+        settings = override_settings(
+            DEBUG=False, STATIC_ROOT=self.root, STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATICFILES_STORAGE='jobapp.storage.CompressedManifestStaticFilesStorage',
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.hashed = staticfiles_storage.stored_name('css/site.css')
+        self.middleware = StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+
+    def get(self, name, **headers):
+        return self.middleware(RequestFactory().get(f'/static/{name}', **headers))
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        self.assertNotEqual(self.hashed, 'css/site.css')
+        with open(os.path.join(self.root, self.hashed + '.gz'), 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), self.css)
+
+    def test_serves_precompressed_immutable_files(self):
+        response = self.get(self.hashed, HTTP_ACCEPT_ENCODING='br;q=0, gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.css)
+
+        plain = self.get(self.hashed)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(plain.streaming_content), self.css)
+        self.assertEqual(self.get(self.hashed, HTTP_IF_MODIFIED_SINCE=plain['Last-Modified']).status_code, 304)
+
+    def test_unhashed_and_unknown_files(self):
+        self.assertNotIn('immutable', self.get('css/site.css')['Cache-Control'])
+        self.assertEqual(self.get('css/missing.css').status_code, 404)
+
+    def test_benchmark_command_reports_transfer(self):
+        templates = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, templates)
+        with open(os.path.join(templates, 'page.html'), 'w') as page:
+            page.write("{% load static %}<link href=\"{% static 'css/site.css' %}\">")
+        out = StringIO()
+        with override_settings(TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates', 'DIRS': [templates],
+        }]):
+            call_command('benchmark_static_transfer', 'page.html', stdout=out)
+        self.assertIn('before: 5 KiB per page load, and 1 revalidation requests', out.getvalue())
+        self.assertIn('and 0 requests on later pages (1 immutable)', out.getvalue())
+
+
+def png_logo(name='logo.png', size=(400, 200), color=(200, 30, 30, 255)):
+    output = BytesIO()
+    Image.new('RGBA', size, color).save(output, 'PNG')
+    return SimpleUploadedFile(name, output.getvalue(), content_type='image/png')
+
+
+class LogoThumbnailTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        schedule = mock.patch('jobapp.signals.schedule_logo_thumbnails')
+        self.schedule = schedule.start()
+        self.addCleanup(schedule.stop)
+        self.employer = User.objects.create_user(
+            'boss@example.com', 'pass12345', role='employer', company_logo=png_logo(),
+        )
+
+    def test_thumbnails_are_content_addressed(self):
+        self.schedule.assert_called_once_with(self.employer.pk)
+        digest = generate_logo_thumbnails(self.employer.pk)
+        self.employer.refresh_from_db()
+        self.assertEqual(self.employer.company_logo_digest, digest)
+        for size in LOGO_THUMBNAIL_SIZES:
+            for extension in ('webp', 'jpg'):
+                with default_storage.open(thumbnail_name(digest, size, extension)) as thumbnail:
+                    self.assertEqual(Image.open(thumbnail).size, (size, size))
+
+        other = User.objects.create_user('other@example.com', 'pass12345', role='employer', company_logo=png_logo())
+        with mock.patch.object(default_storage, 'save') as save:
+            self.assertEqual(generate_logo_thumbnails(other.pk), digest)
+        save.assert_not_called()
+
+    def test_new_logo_resets_digest(self):
+        generate_logo_thumbnails(self.employer.pk)
+        self.employer.company_logo = png_logo('new.png', color=(0, 0, 255, 255))
+        self.employer.save()
+        self.employer.refresh_from_db()
+        self.assertEqual(self.employer.company_logo_digest, '')
+        self.assertEqual(self.schedule.call_count, 2)
+
+        self.employer.first_name = 'Boss'
+        self.employer.save()
+        self.assertEqual(self.schedule.call_count, 2)
+
+    def test_tag_and_job_cards_use_thumbnails(self):
+        tag = Template("{% load company_logo %}{% company_logo digest 'Acme' %}")
+        self.assertIn("images/i.jpg", tag.render(Context({'digest': ''})))
+
+        digest = generate_logo_thumbnails(self.employer.pk)
+        rendered = tag.render(Context({'digest': digest}))
+        self.assertIn(f'{digest}-{LOGO_THUMBNAIL_SIZES[1]}.webp 2x', rendered)
+        self.assertIn('type="image/webp"', rendered)
+
+        make_job(self.employer, Category.objects.create(name='IT'))
+        self.assertContains(self.client.get(reverse('jobapp:home')), f'{digest}-{LOGO_THUMBNAIL_SIZES[0]}.jpg')
+
+    def test_backfill_command(self):
+        User.objects.filter(pk=self.employer.pk).update(company_logo_digest='')
+        out = StringIO()
+        call_command('backfill_logo_thumbnails', workers=1, stdout=out)
+        self.assertIn('Generated thumbnails for 1 of 1 logos.', out.getvalue())
+        self.assertTrue(User.objects.get(pk=self.employer.pk).company_logo_digest)
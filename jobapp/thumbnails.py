@@ -0,0 +1,155 @@
+"""
+Company logo thumbnails.
+
+Every uploaded logo gets square WebP and JPEG thumbnails in
+LOGO_THUMBNAIL_SIZES, stored under the sha256 of the original, so
+identical logos share files and a URL never changes content. They are
+generated after the upload commits, on a small thread pool outside the
+request, and User.company_logo_digest is only set once all of them
+exist; until then templates keep showing the placeholder image. The
+backfill_logo_thumbnails command catches up on logos that were never
+processed.
+"""
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Square edge lengths in pixels; the first is the 1x size of the srcset
+LOGO_THUMBNAIL_SIZES = getattr(settings, 'LOGO_THUMBNAIL_SIZES', (96, 192))
+LOGO_THUMBNAIL_DIR = 'logo_thumbnails'
+# (extension, Pillow format, save options)
+LOGO_THUMBNAIL_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 6}),
+    ('jpg', 'JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+)
+LOGO_THUMBNAIL_WORKERS = getattr(settings, 'LOGO_THUMBNAIL_WORKERS', 2)
+LOGO_DIGEST_CACHE_TIMEOUT = 24 * 60 * 60
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def thumbnail_name(digest, size, extension):
+    return f'{LOGO_THUMBNAIL_DIR}/{digest[:2]}/{digest}-{size}.{extension}'
+
+
+def make_thumbnails(data):
+    """{(size, extension): bytes} for the image in ``data``."""
+    with Image.open(BytesIO(data)) as image:
+        image = image.convert('RGBA')
+    thumbnails = {}
+    for size in LOGO_THUMBNAIL_SIZES:
+        fitted = image.copy()
+        fitted.thumbnail((size, size), Image.LANCZOS)
+        # Centre on a white square so every card lays out the same
+        square = Image.new('RGB', (size, size), 'white')
+        square.paste(fitted, ((size - fitted.width) // 2, (size - fitted.height) // 2), fitted)
+        for extension, image_format, options in LOGO_THUMBNAIL_FORMATS:
+            output = BytesIO()
+            square.save(output, image_format, **options)
+            thumbnails[size, extension] = output.getvalue()
+    return thumbnails
+
+
+def _digest_cache_key(user_id):
+    return f'companylogo:{user_id}'
+
+
+def generate_logo_thumbnails(user_id):
+    """Write the thumbnails of a user's logo and record its digest; returns the digest."""
+    user = get_user_model().objects.filter(pk=user_id).only('company_logo').first()
+    if user is None or not user.company_logo:
+        return None
+    logo_name = user.company_logo.name
+    with user.company_logo.open('rb') as logo:
+        data = logo.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    names = {
+        (size, extension): thumbnail_name(digest, size, extension)
+        for size in LOGO_THUMBNAIL_SIZES for extension, _, _ in LOGO_THUMBNAIL_FORMATS
+    }
+    if not all(default_storage.exists(name) for name in names.values()):
+        try:
+            thumbnails = make_thumbnails(data)
+        except (UnidentifiedImageError, OSError):
+            logger.warning('Company logo %s of user %s is not a readable image', logo_name, user_id, exc_info=True)
+            return None
+        for key, name in names.items():
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(thumbnails[key]))
+
+    # Unless the logo was replaced meanwhile, in which case its own run records it
+    if get_user_model().objects.filter(pk=user_id, company_logo=logo_name).update(company_logo_digest=digest):
+        cache.set(_digest_cache_key(user_id), digest, LOGO_DIGEST_CACHE_TIMEOUT)
+    return digest
+
+
+def _generate_in_background(user_id):
+    try:
+        generate_logo_thumbnails(user_id)
+    except Exception:
+        logger.exception('Could not generate the logo thumbnails of user %s', user_id)
+    finally:
+        connection.close()
+
+
+def schedule_logo_thumbnails(user_id):
+    """Generate the thumbnails on the background pool once the current transaction commits."""
+    def submit():
+        global _executor
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(LOGO_THUMBNAIL_WORKERS, thread_name_prefix='logo-thumbnails')
+        _executor.submit(_generate_in_background, user_id)
+
+    transaction.on_commit(submit)
+
+
+def forget_logo_digest(user_id):
+    cache.delete(_digest_cache_key(user_id))
+
+
+def logo_digests(user_ids):
+    """{user id: company_logo_digest} with one cache round trip and at most one query."""
+    user_ids = set(user_ids)
+    keys = {_digest_cache_key(user_id): user_id for user_id in user_ids}
+    digests = {keys[key]: digest for key, digest in cache.get_many(keys).items()}
+    missing = user_ids - set(digests)
+    if missing:
+        found = dict(
+            get_user_model().objects.filter(id__in=missing).values_list('id', 'company_logo_digest')
+        )
+        fetched = {user_id: found.get(user_id, '') for user_id in missing}
+        cache.set_many(
+            {_digest_cache_key(user_id): digest for user_id, digest in fetched.items()}, LOGO_DIGEST_CACHE_TIMEOUT,
+        )
+        digests.update(fetched)
+    return digests
+
+
+def logo_sources(digest):
+    """URLs and srcsets of the thumbnails for ``digest``, or None without one."""
+    if not digest:
+        return None
+    sources = {}
+    for extension, _, _ in LOGO_THUMBNAIL_FORMATS:
+        sources[extension] = ', '.join(
+            f'{default_storage.url(thumbnail_name(digest, size, extension))} {size // LOGO_THUMBNAIL_SIZES[0]}x'
+            for size in LOGO_THUMBNAIL_SIZES
+        )
+    sources['src'] = default_storage.url(thumbnail_name(digest, LOGO_THUMBNAIL_SIZES[0], 'jpg'))
+    sources['size'] = LOGO_THUMBNAIL_SIZES[0]
+    return sources
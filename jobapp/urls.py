@@ -13,15 +13,21 @@ urlpatterns = [
     path('result/', views.search_result_view, name='search_result'),
     path('about/', TemplateView.as_view(template_name='jobapp/about.html'), name='about'),
     path('contact/', views.contact_view, name='contact'),
+    path('cache-stats/', views.cache_stats_view, name='cache-stats'),
 
     # --- Dashboard URLs (Specific before Generic) ---
     path('dashboard/', views.dashboard_view, name='dashboard'),
     path('dashboard/employer/job/<int:id>/applicants/', views.all_applicants_view, name='applicants'),
+    path('dashboard/employer/job/<int:id>/applicants/export.<str:export_format>', views.export_applicants_view, name='export-applicants'),
     path('dashboard/employer/job/edit/<int:id>/', views.JobUpdateView.as_view(), name='edit-job'),
+    path('dashboard/employer/candidates/', views.candidate_search_view, name='candidate-search'),
     path('dashboard/employer/applicant/<int:id>/', views.applicant_details_view, name='applicant-details'),
     path('dashboard/employer/close/<int:id>/', views.make_complete_job_view, name='complete'),
     path('dashboard/employer/delete/<int:id>/', views.JobDeleteView.as_view(), name='delete'),
     path('dashboard/employee/delete-bookmark/<int:id>/', views.BookmarkDeleteView.as_view(), name='delete-bookmark'),
+    path('dashboard/employee/saved-searches/', views.saved_searches_view, name='saved-searches'),
+    path('dashboard/employee/saved-searches/save/', views.save_search_view, name='save-search'),
+    path('dashboard/employee/saved-searches/<int:id>/delete/', views.SavedSearchDeleteView.as_view(), name='delete-saved-search'),
     
     # --- Domestic Job URLs (Specific before Generic) ---
     path('domestic-jobs/', views.domestic_job_list_view, name='domestic-job-list'), # Matches /domestic-jobs/
@@ -0,0 +1,102 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import CharField, Value
+from django.utils import timezone
+
+from jobapp.caching import job_cache
+from jobapp.models import Applicant, BookmarkJob, Job
+
+# Seconds a user's applied/saved job ids stay cached; 0 disables caching.
+USER_JOB_STATE_CACHE_TIMEOUT = getattr(settings, 'USER_JOB_STATE_CACHE_TIMEOUT', 300)
+
+
+def cache_key(user_id):
+    return f'jobapp:user-job-state:{user_id}'
+
+
+class UserJobState:
+    """
+    The ids of the jobs a user has applied for and saved, loaded with a
+    single UNION query (or from the cache) the first time they are needed.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._ids = None
+
+    def _load(self):
+        if self._ids is not None:
+            return self._ids
+        if not self.user.is_authenticated or self.user.role != 'employee':
+            self._ids = (frozenset(), frozenset())
+            return self._ids
+
+        key = cache_key(self.user.pk)
+        ids = cache.get(key) if USER_JOB_STATE_CACHE_TIMEOUT else None
+        if ids is None:
+            rows = Applicant.objects.filter(user=self.user).values_list(
+                'job_id', Value('applied', output_field=CharField()),
+            ).union(BookmarkJob.objects.filter(user=self.user).values_list(
+                'job_id', Value('saved', output_field=CharField()),
+            ), all=True)
+            applied, saved = set(), set()
+            for job_id, kind in rows:
+                (applied if kind == 'applied' else saved).add(job_id)
+            ids = (frozenset(applied), frozenset(saved))
+            if USER_JOB_STATE_CACHE_TIMEOUT:
+                cache.set(key, ids, USER_JOB_STATE_CACHE_TIMEOUT)
+        self._ids = ids
+        return ids
+
+    @property
+    def applied_job_ids(self):
+        return self._load()[0]
+
+    @property
+    def saved_job_ids(self):
+        return self._load()[1]
+
+    def has_applied(self, job):
+        return getattr(job, 'pk', job) in self.applied_job_ids
+
+    def has_saved(self, job):
+        return getattr(job, 'pk', job) in self.saved_job_ids
+
+
+def get_user_job_state(request):
+    """The request's UserJobState, created on first use."""
+    state = getattr(request, '_user_job_state', None)
+    if state is None:
+        state = request._user_job_state = UserJobState(request.user)
+    return state
+
+
+def invalidate_user_job_state(user_id):
+    cache.delete(cache_key(user_id))
+
+
+def add_user_job(model, user_id, job_id):
+    """
+    Apply for or save a job (``model`` is Applicant or BookmarkJob) with a
+    single INSERT ... SELECT that skips existing (user, job) pairs and
+    unknown jobs. Returns True if a row was created.
+
+    Being raw SQL it sends no post_save, so the caches are invalidated here.
+    """
+    connection = connections[router.db_for_write(model)]
+    ops = connection.ops
+    created_at = model._meta.get_field('created_at').get_db_prep_save(timezone.now(), connection)
+    sql = (
+        f'{ops.insert_statement(ignore_conflicts=True)} {ops.quote_name(model._meta.db_table)} '
+        f'(user_id, job_id, created_at) '
+        f'SELECT %s, id, %s FROM {ops.quote_name(Job._meta.db_table)} WHERE id = %s '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, created_at, job_id])
+        created = cursor.rowcount == 1
+    if created:
+        invalidate_user_job_state(user_id)
+        job_cache.bump('applications' if model is Applicant else 'bookmarks')
+    return created
@@ -1,34 +1,69 @@
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q, Count
+from django.db.models import Count, F
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
-from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.http import Http404, HttpResponseRedirect, JsonResponse, QueryDict
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 
 from account.models import User, DomesticJob
-from jobapp.forms import JobForm, JobEditForm, ContactForm
+from jobapp.caching import job_cache
+from jobapp.candidates import CANDIDATE_SORT_ORDERINGS, CANDIDATES_COUNT_CAP, CANDIDATES_PAGE_SIZE, search_candidates
+from jobapp.exports import EXPORT_FORMATS, applicants_export_response
+from jobapp.forms import JobForm, JobEditForm, ContactForm, CandidateSearchForm, SavedSearchForm
 from account.forms import DomesticJobForm
-from jobapp.models import Job, JobType, ExperienceLevel, WorkArrangement, Category, Applicant, BookmarkJob # Import all necessary models
+from jobapp.models import Job, JobType, ExperienceLevel, WorkArrangement, Category, Applicant, BookmarkJob, SavedSearch, SiteStats # Import all necessary models
+from jobapp.pagination import CursorPaginator
 from jobapp.permission import *
+from jobapp.search import get_search_backend, search_jobs
+from jobapp.user_state import add_user_job
 
 User = get_user_model()
 
 
+def cached_categories():
+    return job_cache.get_or_set(('categories',), 'categories', lambda: list(Category.objects.all()))
+
+
+class KnownCountPaginator(Paginator):
+    """Paginator that trusts a precomputed total instead of running COUNT(*)."""
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @property
+    def count(self):
+        return self._known_count
+
+
+def is_ajax(request):
+    # HttpRequest.is_ajax() is deprecated since Django 3.1
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
+# "Jobs for you" shown to employees on the home page
+HOME_RECOMMENDATIONS = 5
+
+
 def home_view(request):
+    stats = SiteStats.load()
     published_jobs = Job.objects.filter(is_published=True, is_closed=False).order_by('-created_at')
-    total_candidates = User.objects.filter(role='employee').count()
-    total_companies = User.objects.filter(role='employer').count()
-    paginator = Paginator(published_jobs, 3)
+    paginator = KnownCountPaginator(published_jobs, 3, stats.total_jobs)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = job_cache.get_or_set(('jobs',), ('home', page_obj.number), lambda: list(page_obj.object_list))
+
+    if is_ajax(request):
+        job_list = [
+            {field: getattr(job, field) for field in ('id', 'title', 'location', 'job_type', 'company_name', 'url')}
+            for job in page_obj.object_list
+        ]
 
-    if request.is_ajax():
-        job_list = list(page_obj.object_list.values('id', 'title', 'location', 'job_type', 'company_name', 'url'))
-        
         data = {
             'job_lists': job_list,
             'current_page_no': page_obj.number,
@@ -38,11 +73,19 @@ def home_view(request):
         }
         return JsonResponse(data)
 
+    recommended_jobs = []
+    if request.user.is_authenticated and request.user.role == 'employee':
+        recommended_jobs = list(
+            Job.objects.filter(recommendations__user=request.user, is_published=True, is_closed=False)
+            .order_by('-recommendations__score', '-recommendations__job')[:HOME_RECOMMENDATIONS]
+        )
+
     context = {
-        'total_candidates': total_candidates,
-        'total_companies': total_companies,
-        'total_jobs': published_jobs.count(),
-        'total_completed_jobs': Job.objects.filter(is_published=True, is_closed=True).count(),
+        'recommended_jobs': recommended_jobs,
+        'total_candidates': stats.total_candidates,
+        'total_companies': stats.total_companies,
+        'total_jobs': stats.total_jobs,
+        'total_completed_jobs': stats.total_completed_jobs,
         'page_obj': page_obj,
         'job_type_choices': JobType.choices, # Added for search form
         'experience_level_choices': ExperienceLevel.choices, # Added for search form
@@ -51,38 +94,47 @@ def home_view(request):
     return render(request, 'jobapp/index.html', context)
 
 
+# Keyset orderings for the job listing; each ends with a unique column so
+# the cursor identifies exactly one row.
+JOB_SORT_ORDERINGS = {
+    'newest_first': ('-created_at', '-id'),
+    'oldest_first': ('created_at', 'id'),
+    'salary_high_low': ('-salary_max', '-id'),
+    'salary_low_high': ('salary_min', 'id'),
+    'title_asc': ('title', 'id'),
+}
+
+
 class JobListView(ListView):
     model = Job
     template_name = 'jobapp/job-list.html'
-    context_object_name = 'page_obj'
     paginate_by = 12
-    # queryset = Job.objects.filter(is_published=True, is_closed=False).order_by('-created_at') # Will be set in get_queryset
+
+    def get_sort_by(self):
+        sort_by = self.request.GET.get('sort_by')
+        return sort_by if sort_by in JOB_SORT_ORDERINGS else 'newest_first'
 
     def get_queryset(self):
         queryset = Job.objects.filter(is_published=True, is_closed=False)
-        sort_by = self.request.GET.get('sort_by', '-created_at') # Default to newest first
-
-        if sort_by == 'oldest_first':
-            queryset = queryset.order_by('created_at')
-        elif sort_by == 'salary_high_low':
-            # Assuming salary is a numeric field or can be converted for sorting
-            # For now, sorting as string, consider converting to IntegerField for proper numeric sort
-            queryset = queryset.order_by('-salary') 
-        elif sort_by == 'salary_low_high':
-            queryset = queryset.order_by('salary')
-        elif sort_by == 'title_asc':
-            queryset = queryset.order_by('title')
-        else: # Default or 'newest_first'
-            queryset = queryset.order_by('-created_at')
-        
+        sort_field = JOB_SORT_ORDERINGS[self.get_sort_by()][0].lstrip('-')
+        if sort_field.startswith('salary_'):
+            # Only jobs with a parseable salary can be ranked by it
+            queryset = queryset.filter(**{f'{sort_field}__isnull': False})
         return queryset
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(
+            queryset, page_size, JOB_SORT_ORDERINGS[self.get_sort_by()], cache_key=('job-list', self.get_sort_by()),
+        )
+        page = paginator.get_page(self.request)
+        return paginator, page, page.object_list, page.has_other_pages()
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['job_type_choices'] = JobType.choices
         context['experience_level_choices'] = ExperienceLevel.choices
         context['work_arrangement_choices'] = WorkArrangement.choices
-        context['current_sort_by'] = self.request.GET.get('sort_by', '-created_at') # Pass current sort to template
+        context['current_sort_by'] = self.get_sort_by() # Pass current sort to template
         return context
 
 
@@ -94,12 +146,14 @@ class JobDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        related_job_list = self.object.tags.similar_objects()
+        related_job_list = Job.objects.filter(
+            related_to__job=self.object, is_published=True, is_closed=False,
+        ).order_by('-related_to__score', '-id')
         paginator = Paginator(related_job_list, 5)
         page_number = self.request.GET.get('page')
         page_obj = paginator.get_page(page_number)
         context['page_obj'] = page_obj
-        context['total'] = len(related_job_list)
+        context['total'] = paginator.count
         return context
 
 
@@ -120,7 +174,7 @@ class JobCreateView(LoginRequiredMixin, UserPassesTestMixin, CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
+        context['categories'] = cached_categories()
         return context
 
 
@@ -139,36 +193,26 @@ class JobUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = Category.objects.all()
+        context['categories'] = cached_categories()
         return context
 
 
 def search_result_view(request):
-    job_list = Job.objects.filter(is_published=True, is_closed=False).order_by('-created_at')
-
-    job_title = request.GET.get('job_title_or_company_name')
-    location = request.GET.get('location')
-    job_type = request.GET.get('job_type')
-    experience_level = request.GET.get('experience_level')
-    work_arrangement = request.GET.get('work_arrangement')
-
-    if job_title:
-        job_list = job_list.filter(Q(title__icontains=job_title) | Q(company_name__icontains=job_title))
-    if location:
-        job_list = job_list.filter(location__icontains=location)
-    if job_type:
-        job_list = job_list.filter(job_type__iexact=job_type)
-    if experience_level:
-        job_list = job_list.filter(experience_level=experience_level)
-    if work_arrangement:
-        job_list = job_list.filter(work_arrangement=work_arrangement)
-
-    paginator = Paginator(job_list, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
+    job_list = search_jobs(Job.objects.filter(is_published=True, is_closed=False), request.GET)
+
+    if 'search_rank' in job_list.query.annotations:
+        ordering = get_search_backend().rank_ordering
+    else:
+        ordering = JOB_SORT_ORDERINGS['newest_first']
+    filters = sorted((key, value) for key, value in request.GET.items() if key not in ('after', 'before', 'page'))
+    paginator = CursorPaginator(
+        job_list, 10, ordering, count_cap=1000, cache_key=('search', tuple(filters)), cache_namespaces=('jobs', 'tags'),
+    )
+    page_obj = paginator.get_page(request)
+
     context = {
         'page_obj': page_obj,
+        'saved_search_form': SavedSearchForm(initial={field: request.GET.get(field, '') for field in SavedSearchForm.Meta.fields}),
         'job_type_choices': JobType.choices,
         'experience_level_choices': ExperienceLevel.choices,
         'work_arrangement_choices': WorkArrangement.choices,
@@ -176,33 +220,95 @@ def search_result_view(request):
     return render(request, 'jobapp/result.html', context)
 
 
+SAVED_SEARCHES_LIMIT = 20
+
+
+@login_required(login_url=reverse_lazy('account:login'))
+@user_is_employee
+def save_search_view(request):
+    if request.method != 'POST':
+        return redirect('jobapp:saved-searches')
+    form = SavedSearchForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, 'This search cannot be saved.')
+    elif SavedSearch.objects.filter(user=request.user, **form.cleaned_data).exists():
+        messages.info(request, 'You have already saved this search.')
+    elif SavedSearch.objects.filter(user=request.user).count() >= SAVED_SEARCHES_LIMIT:
+        messages.error(request, f'You can save at most {SAVED_SEARCHES_LIMIT} searches.')
+    else:
+        SavedSearch.objects.create(user=request.user, **form.cleaned_data)
+        messages.success(request, 'Search saved! We will email you when new jobs match it.')
+    query = QueryDict(mutable=True)
+    query.update({field: value for field, value in form.data.items() if field in SavedSearchForm.Meta.fields})
+    return HttpResponseRedirect(f"{reverse('jobapp:search_result')}?{query.urlencode()}")
+
+
+@login_required(login_url=reverse_lazy('account:login'))
+@user_is_employee
+def saved_searches_view(request):
+    context = {'saved_searches': SavedSearch.objects.filter(user=request.user).order_by('-created_at', '-id')}
+    return render(request, 'jobapp/saved-searches.html', context)
+
+
+class SavedSearchDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+    model = SavedSearch
+    success_url = reverse_lazy('jobapp:saved-searches')
+    pk_url_kwarg = 'id'
+
+    def test_func(self):
+        return self.request.user == self.get_object().user
+
+    def delete(self, request, *args, **kwargs):
+        messages.success(self.request, 'Saved search was successfully deleted!')
+        return super().delete(request, *args, **kwargs)
+
+
 @login_required(login_url=reverse_lazy('account:login'))
 @user_is_employee
 def apply_job_view(request, id):
-    try:
-        job = get_object_or_404(Job, id=id)
-    except Http404:
+    if add_user_job(Applicant, request.user.pk, id):
+        messages.success(request, 'You have successfully applied for this job!')
+    elif Job.objects.filter(id=id).exists():
+        messages.error(request, 'You have already applied for this job!')
+    else:
         messages.error(request, 'Job posting not found.')
         return redirect('jobapp:job-list')
-    
-    if Applicant.objects.filter(user=request.user, job=job).exists():
-        messages.error(request, 'You have already applied for this job!')
-        return redirect('jobapp:single-job', id=id)
-
-    Applicant.objects.create(user=request.user, job=job)
-    messages.success(request, 'You have successfully applied for this job!')
     return redirect('jobapp:single-job', id=id)
 
 
+# Employee dashboard tabs: each is paginated on its own and, after the
+# first render, loaded over AJAX only when it is opened.
+DASHBOARD_TABS = {
+    'saved': BookmarkJob,
+    'applied': Applicant,
+}
+DASHBOARD_PAGE_SIZE = 10
+
+
+def dashboard_tab_page(request, tab):
+    rows = (
+        DASHBOARD_TABS[tab].objects.filter(user=request.user)
+        .select_related('job')
+        .only('id', 'created_at', 'job__id', 'job__title', 'job__last_date')
+        .order_by('-created_at', '-id')
+    )
+    return Paginator(rows, DASHBOARD_PAGE_SIZE).get_page(request.GET.get('page'))
+
+
 @login_required(login_url=reverse_lazy('account:login'))
 def dashboard_view(request):
     context = {}
     if request.user.role == 'employer':
         context['jobs'] = Job.objects.filter(user=request.user).annotate(applicant_count=Count('applicant'))
     elif request.user.role == 'employee':
-        context['savedjobs'] = BookmarkJob.objects.filter(user=request.user)
-        context['appliedjobs'] = Applicant.objects.filter(user=request.user)
-    
+        tab = request.GET.get('tab')
+        if tab not in DASHBOARD_TABS:
+            tab = 'saved'
+        context['tab'] = tab
+        context['page_obj'] = dashboard_tab_page(request, tab)
+        if is_ajax(request):
+            return render(request, 'jobapp/dashboard_tab.html', context)
+
     return render(request, 'jobapp/dashboard.html', context)
 
 
@@ -230,16 +336,75 @@ def make_complete_job_view(request, id):
     return redirect('jobapp:dashboard')
 
 
+APPLICANT_SORT_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'oldest': ('created_at', 'id'),
+    'most_experienced': (F('user__years_of_experience').desc(nulls_last=True), '-created_at', '-id'),
+    'least_experienced': (F('user__years_of_experience').asc(nulls_last=True), '-created_at', '-id'),
+}
+APPLICANTS_PAGE_SIZE = 25
+
+
+def applicant_sort_by(request):
+    sort_by = request.GET.get('sort_by')
+    return sort_by if sort_by in APPLICANT_SORT_ORDERINGS else 'newest'
+
+
 @login_required(login_url=reverse_lazy('account:login'))
 @user_is_employer
 def all_applicants_view(request, id):
-    all_applicants = Applicant.objects.filter(job_id=id)
+    job = get_object_or_404(Job.objects.only('id', 'title'), id=id, user=request.user)
+    sort_by = applicant_sort_by(request)
+    all_applicants = (
+        Applicant.objects.filter(job=job)
+        .select_related('user')
+        .only(
+            'id', 'created_at', 'user__id', 'user__first_name', 'user__last_name', 'user__email',
+            'user__phone_number', 'user__preferred_job_title', 'user__years_of_experience',
+        )
+        .order_by(*APPLICANT_SORT_ORDERINGS[sort_by])
+    )
+    paginator = Paginator(all_applicants, APPLICANTS_PAGE_SIZE)
     context = {
-        'all_applicants': all_applicants,
+        'job': job,
+        'current_sort_by': sort_by,
+        'page_obj': paginator.get_page(request.GET.get('page')),
     }
     return render(request, 'jobapp/all-applicants.html', context)
 
 
+@login_required(login_url=reverse_lazy('account:login'))
+@user_is_employer
+def candidate_search_view(request):
+    form = CandidateSearchForm(request.GET)
+    page_obj = None
+    if form.is_valid():
+        criteria = form.cleaned_data
+        sort_by = criteria['sort_by'] or 'newest'
+        candidates = search_candidates(
+            skills=criteria['skills'], location=criteria['location'], job_title=criteria['job_title'],
+            min_years=criteria['min_years'], max_years=criteria['max_years'], sort_by=sort_by,
+        ).only(
+            'id', 'first_name', 'last_name', 'email', 'skills', 'location',
+            'preferred_job_title', 'years_of_experience',
+        )
+        paginator = CursorPaginator(
+            candidates, CANDIDATES_PAGE_SIZE, CANDIDATE_SORT_ORDERINGS[sort_by], count_cap=CANDIDATES_COUNT_CAP,
+        )
+        page_obj = paginator.get_page(request)
+    return render(request, 'jobapp/candidate-search.html', {'form': form, 'page_obj': page_obj})
+
+
+@login_required(login_url=reverse_lazy('account:login'))
+@user_is_employer
+def export_applicants_view(request, id, export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise Http404
+    job = get_object_or_404(Job.objects.only('id'), id=id, user=request.user)
+    applicants = Applicant.objects.filter(job=job).order_by(*APPLICANT_SORT_ORDERINGS[applicant_sort_by(request)])
+    return applicants_export_response(applicants, export_format, f'job-{job.id}-applicants')
+
+
 class BookmarkDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
     model = BookmarkJob
     success_url = reverse_lazy('jobapp:dashboard')
@@ -269,15 +434,21 @@ def applicant_details_view(request, id):
 @login_required(login_url=reverse_lazy('account:login'))
 @user_is_employee
 def job_bookmark_view(request, id):
-    job = get_object_or_404(Job, id=id)
-    if BookmarkJob.objects.filter(user=request.user, job=job).exists():
+    if add_user_job(BookmarkJob, request.user.pk, id):
+        messages.success(request, 'You have successfully saved this job!')
+    elif Job.objects.filter(id=id).exists():
         messages.error(request, 'You have already saved this job!')
     else:
-        BookmarkJob.objects.create(user=request.user, job=job)
-        messages.success(request, 'You have successfully saved this job!')
+        raise Http404
     return redirect('jobapp:single-job', id=id)
 
 
+@staff_member_required
+def cache_stats_view(request):
+    """Hit/miss counters of this worker's listing cache, per namespace."""
+    return JsonResponse(job_cache.stats())
+
+
 def contact_view(request):
     if request.method == 'POST':
         form = ContactForm(request.POST)
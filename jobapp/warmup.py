@@ -0,0 +1,78 @@
+"""
+Work a new process would otherwise do on its first requests: compiling
+templates into the cached loader, building the URL resolvers and filling
+the reference caches. Run by the warmup command and by gunicorn's
+post_worker_init hook (see gunicorn.conf.py).
+"""
+import logging
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, connection
+from django.template import TemplateSyntaxError
+from django.template.loader import get_template
+from django.urls import URLResolver, get_resolver
+
+from jobapp.models import SiteStats
+from jobapp.views import cached_categories
+
+logger = logging.getLogger(__name__)
+
+
+def template_names():
+    """Every .html template in the project template directories (jobapp/, account/ and the shared partials)."""
+    for template_dir in settings.TEMPLATES[0]['DIRS']:
+        for root, _, files in os.walk(template_dir):
+            for name in sorted(files):
+                if name.endswith('.html'):
+                    yield os.path.relpath(os.path.join(root, name), template_dir).replace(os.sep, '/')
+
+
+def compile_templates():
+    compiled = 0
+    for name in template_names():
+        try:
+            get_template(name)
+        except TemplateSyntaxError:
+            logger.warning('Template %s does not compile', name, exc_info=True)
+        else:
+            compiled += 1
+    return compiled
+
+
+def populate_urls(resolver=None):
+    """Build the reverse lookup tables of every (namespaced) resolver; returns the number of patterns."""
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict
+    count = 0
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            count += populate_urls(pattern)
+        else:
+            count += 1
+    return count
+
+
+def prime_caches():
+    try:
+        connection.ensure_connection()
+        ContentType.objects.get_for_models(*apps.get_models())
+        SiteStats.load()
+        cached_categories()
+    except DatabaseError:
+        # A worker must still start when the database is briefly unavailable
+        logger.warning('Could not prime the reference caches', exc_info=True)
+        return False
+    return True
+
+
+def warm_up():
+    """Warm this process up; returns {step: (result, seconds)}."""
+    timings = {}
+    for step, function in (('templates', compile_templates), ('urls', populate_urls), ('caches', prime_caches)):
+        start = time.perf_counter()
+        timings[step] = (function(), time.perf_counter() - start)
+    return timings